@@ -0,0 +1,622 @@
+# ------------------------------- binary_task_store.py ----------------------------------
+
+"""
+This module stores the tasks of the Task Manager (see task_manager.py) in a memory-mapped
+binary task file ("tasks.bin"), rather than in the "tasks.txt" file. The users are still
+stored in "users.txt".
+
+The program uses the binary task file once the tasks have been copied into it with
+
+    python task_manager.py convert-binary
+"""
+
+
+
+
+
+
+
+# -------------------------------- Importing libraries. ---------------------------------
+
+import os
+import mmap
+import struct
+
+from datetime import datetime, date
+
+from task_manager import (BINARY_FILE, DATETIME_STRING_FORMAT, FileLock, Task, TaskStore, parse_date,
+                          replace_file)
+
+
+
+
+
+
+
+# ------------------------------ Defining the binary task store. ------------------------
+
+class BinaryTaskList:
+    """
+    This class is a list of tasks stored in a binary task file, which is memory-mapped
+    so that any task can be read straight from the file without parsing any other task.
+
+    The binary task file ("tasks.bin") is made up of:
+        - a header: the file type and version, the size of each task record, the
+          number of tasks and the number of changes made to the file (which shows other
+          processes that the file has changed - see changed_elsewhere()),
+        - one fixed-size record for each task: the user id, the assigned, due and
+          updated dates as day ordinals (0 if the task has never been updated), a flags
+          byte (1 if the task is complete) and the position of the task's text in the
+          string heap.
+
+    The titles and descriptions are stored in a separate string heap file
+    ("tasks.bin.heap") and the username of each user id in a users file
+    ("tasks.bin.users", one username per line).
+
+    Opening the list only reads the header and the usernames. Because every record has
+    the same size, storing an edited task overwrites its record in place. New tasks are
+    added to the end of the files, and are only counted in the header once they have
+    been completely written.
+    """
+
+    # The file type and version written at the start of the file.
+    FILE_TYPE = b"TASKBIN\0"
+    FILE_VERSION = 2
+
+    # The header: file type, version, record size, number of tasks and number of changes.
+    _header = struct.Struct("<8sIIQQ")
+
+    # A task record: user id, assigned, due and updated day ordinals, flags, the position
+    # of the text in the string heap, and the number of bytes of the title and of the
+    # description.
+    _record = struct.Struct("<IiiiB3xQII")
+
+    # The flag set in the flags byte of a completed task.
+    COMPLETED_FLAG = 1
+
+    def __init__(self, file_name):
+
+        self.file_name = file_name
+        self.heap_file = file_name + ".heap"
+        self.users_file = file_name + ".users"
+
+        # Create empty files if the binary task file does not exist yet.
+        if not os.path.exists(file_name):
+            self.create(file_name)
+
+        self._file = open(file_name, 'r+b')
+        self._heap = open(self.heap_file, 'r+b')
+
+        # The memory maps of the task file and the string heap.
+        self._mapped = None
+        self._mapped_heap = None
+        self._map_files()
+
+        file_type, version, record_size, self._length, self._changes = self._header.unpack_from(self._mapped, 0)
+        if file_type != self.FILE_TYPE or version != self.FILE_VERSION or record_size != self._record.size:
+            self.close()
+            raise ValueError(f"'{file_name}' is not a binary task file of version {self.FILE_VERSION}.")
+
+        # The username of each user id, and the user id of each username.
+        with open(self.users_file, 'r', encoding="utf-8") as users:
+            self._usernames = users.read().split("\n")[:-1]
+        self._user_ids = {username: user_id for user_id, username in enumerate(self._usernames)}
+
+    @classmethod
+    def create(cls, file_name, records=b"", heap=b"", usernames=(), num_tasks=0):
+        """
+        This method writes a new binary task file (and its string heap and users files),
+        containing "num_tasks" task "records".
+        """
+
+        with open(file_name + ".heap", 'wb') as heap_file:
+            heap_file.write(heap)
+
+        with open(file_name + ".users", 'w', encoding="utf-8") as users_file:
+            users_file.write("".join(username + "\n" for username in usernames))
+
+        # The task file is written last, so that it only exists once the other files do.
+        with open(file_name, 'wb') as task_file:
+            task_file.write(cls._header.pack(cls.FILE_TYPE, cls.FILE_VERSION, cls._record.size, num_tasks, 0))
+            task_file.write(records)
+
+    def _map_files(self):
+        """
+        This method (re)maps the task file and the string heap into memory, e.g. after
+        they have grown.
+        """
+
+        if self._mapped is not None:
+            self._mapped.close()
+        if self._mapped_heap is not None:
+            self._mapped_heap.close()
+
+        self._mapped = mmap.mmap(self._file.fileno(), 0)
+
+        # An empty file cannot be memory-mapped.
+        heap_size = os.fstat(self._heap.fileno()).st_size
+        self._mapped_heap = mmap.mmap(self._heap.fileno(), 0) if heap_size else None
+
+    def close(self):
+        """
+        This method writes any changes back to the files, and closes them.
+        """
+
+        if self._mapped_heap is not None:
+            self._mapped_heap.close()
+        self._mapped.flush()
+        self._mapped.close()
+        self._heap.close()
+        self._file.close()
+
+    def __len__(self):
+        return self._length
+
+    def _write_header(self):
+        """
+        This method writes the number of tasks to the header, and counts one more change
+        to the file.
+        """
+
+        self._changes += 1
+        self._header.pack_into(self._mapped, 0, self.FILE_TYPE, self.FILE_VERSION, self._record.size,
+                               self._length, self._changes)
+
+    def changed_elsewhere(self):
+        """
+        This method returns True if another process has added or edited tasks since the
+        file was opened. (The header is read from the memory map, which shows the changes
+        made by other processes.)
+        """
+
+        return self._header.unpack_from(self._mapped, 0)[3:] != (self._length, self._changes)
+
+    def _record_offset(self, index):
+        return self._header.size + index * self._record.size
+
+    def _user_id(self, username):
+        """
+        This method returns the user id of "username", adding a new username to the
+        users file.
+
+        The users file is replaced safely (see replace_file()), so that a username which
+        was only partly written can never be joined to the next one.
+        """
+
+        user_id = self._user_ids.get(username)
+        if user_id is None:
+            replace_file(self.users_file, "".join(name + "\n" for name in self._usernames + [username]))
+            user_id = self._user_ids[username] = len(self._usernames)
+            self._usernames.append(username)
+        return user_id
+
+    def _text(self, text_start, title_length, description_length):
+        """
+        This method reads a title and description from the string heap.
+        """
+
+        description_start = text_start + title_length
+        description_end = description_start + description_length
+
+        if self._mapped_heap is None:
+            return "", ""
+
+        return (self._mapped_heap[text_start:description_start].decode("utf-8"),
+                self._mapped_heap[description_start:description_end].decode("utf-8"))
+
+    def _add_text(self, title, description):
+        """
+        This method appends a title and description to the end of the string heap, and
+        returns their position and their lengths in bytes.
+        """
+
+        title = title.encode("utf-8")
+        description = description.encode("utf-8")
+
+        text_start = self._heap.seek(0, os.SEEK_END)
+        self._heap.write(title + description)
+        self._heap.flush()
+
+        return text_start, len(title), len(description)
+
+    def __getitem__(self, index):
+
+        # Slices return a plain list of the selected tasks.
+        if isinstance(index, slice):
+            return [self[pos] for pos in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+
+        if index not in range(len(self)):
+            raise IndexError("task index out of range")
+
+        (user_id, assigned_ordinal, due_ordinal, updated_ordinal, flags, text_start,
+         title_length, description_length) = self._record.unpack_from(self._mapped, self._record_offset(index))
+
+        title, description = self._text(text_start, title_length, description_length)
+
+        return Task(
+            self._usernames[user_id],
+            title,
+            description,
+            datetime.fromordinal(assigned_ordinal),
+            datetime.fromordinal(due_ordinal),
+            bool(flags & self.COMPLETED_FLAG),
+            date.fromordinal(updated_ordinal).strftime(DATETIME_STRING_FORMAT) if updated_ordinal else None,
+        )
+
+    def _pack_record(self, task, text_position):
+        """
+        This method returns the record of a task, with its text at "text_position" (the
+        position and lengths of the text in the string heap).
+        """
+
+        return self._record.pack(
+            self._user_id(task.username),
+            task.assigned_date.toordinal(),
+            task.due_date.toordinal(),
+            parse_date(task.updated_date).toordinal() if task.updated_date else 0,
+            self.COMPLETED_FLAG if task.completed else 0,
+            *text_position,
+        )
+
+    def __setitem__(self, index, task):
+
+        if index < 0:
+            index += len(self)
+
+        offset = self._record_offset(index)
+
+        # The text is only added to the heap again if it has changed.
+        text_position = self._record.unpack_from(self._mapped, offset)[5:]
+        if self._text(*text_position) != (task.title, task.description):
+            text_position = self._add_text(task.title, task.description)
+            self._map_files()
+
+        # Overwrite the task's record in place.
+        self._mapped[offset:offset + self._record.size] = self._pack_record(task, text_position)
+        self._write_header()
+
+    def __iter__(self):
+        for pos in range(len(self)):
+            yield self[pos]
+
+    def append(self, task):
+
+        # Write the text and the record of the new task to the end of the files.
+        record = self._pack_record(task, self._add_text(task.title, task.description))
+        self._file.seek(self._record_offset(self._length))
+        self._file.write(record)
+        self._file.flush()
+        self._map_files()
+
+        # Count the new task in the header once it has been written.
+        self._length += 1
+        self._write_header()
+
+    def extend(self, tasks):
+
+        # Pack the text and the record of every new task, so that each file is written
+        # only once.
+        text_start = self._heap.seek(0, os.SEEK_END)
+        texts = bytearray()
+        records = bytearray()
+
+        for task in tasks:
+            title = task.title.encode("utf-8")
+            description = task.description.encode("utf-8")
+            records += self._pack_record(task, (text_start + len(texts), len(title), len(description)))
+            texts += title
+            texts += description
+
+        self._heap.write(texts)
+        self._heap.flush()
+        self._file.seek(self._record_offset(self._length))
+        self._file.write(records)
+        self._file.flush()
+        self._map_files()
+
+        # Count the new tasks in the header once they have been written.
+        self._length += len(records) // self._record.size
+        self._write_header()
+
+    def index(self, task):
+        for pos, each_task in enumerate(self):
+            if each_task == task:
+                return pos
+        raise ValueError("task is not in list")
+
+    def _records(self):
+        """
+        This method yields the fields of every task record, straight from the memory map.
+        """
+
+        with memoryview(self._mapped) as mapped_view:
+            with mapped_view[self._header.size:self._record_offset(self._length)] as records:
+                yield from self._record.iter_unpack(records)
+
+    def usernames(self):
+        """
+        This method yields the username of each task, from the task records.
+        """
+
+        for record in self._records():
+            yield self._usernames[record[0]]
+
+    def summaries(self):
+        """
+        This method yields the username, due date and completion status of each task,
+        from the task records.
+        """
+
+        for user_id, assigned_ordinal, due_ordinal, updated_ordinal, flags, *text_position in self._records():
+            yield (self._usernames[user_id], datetime.fromordinal(due_ordinal),
+                   bool(flags & self.COMPLETED_FLAG))
+
+    def summary_counts(self):
+        """
+        This method yields each combination of username, due date and completion status
+        found among the tasks, with the number of tasks which have that combination.
+        """
+
+        group_counts = {}
+
+        for user_id, assigned_ordinal, due_ordinal, updated_ordinal, flags, *text_position in self._records():
+            key = (user_id, due_ordinal, flags & self.COMPLETED_FLAG)
+            group_counts[key] = group_counts.get(key, 0) + 1
+
+        for (user_id, due_ordinal, completed), count in group_counts.items():
+            yield self._usernames[user_id], datetime.fromordinal(due_ordinal), bool(completed), count
+
+    def texts(self):
+        """
+        This method yields the title and description of each task, from the string heap.
+        """
+
+        for record in self._records():
+            yield self._text(*record[5:])
+
+
+
+
+class BinaryTaskStore(TaskStore):
+    """
+    This class is a TaskStore which stores the tasks in a memory-mapped binary task file
+    (see BinaryTaskList), rather than in "tasks.txt". The users are still stored in
+    "users.txt".
+
+    Loading the store does not read or parse the tasks, so it takes the same (very short)
+    time for any number of tasks. Each edited task is written in place, over its own
+    fixed-size record.
+
+    Parameters:
+
+        "binary_file" =     the binary task file (default: "tasks.bin")
+
+        "users_file" =      the file storing all users (default: "users.txt")
+
+        "numpy_reports" =   if True, reports are built with NumPy (see TaskStore)
+
+    A binary task file can be created from the "tasks.txt" file with
+    convert_to_binary().
+    """
+
+    def __init__(self, binary_file=BINARY_FILE, users_file="users.txt", numpy_reports=False):
+
+        self.binary_file = binary_file
+
+        super().__init__(users_file=users_file, numpy_reports=numpy_reports, snapshot=False)
+
+        # The search index is saved next to the binary task file.
+        self.search_file = binary_file + ".search"
+
+        # The lock which is held while the binary task file or "users.txt" is changed
+        # (see TaskStore).
+        self.lock_file = binary_file + ".lock"
+        self._file_lock = FileLock(self.lock_file)
+
+
+
+    def close(self):
+        """
+        This method writes any changes back to the binary task file, and closes it and
+        the lock file.
+        """
+
+        self.master_task_list.close()
+        self._file_lock.close()
+
+
+
+    def refresh(self):
+        """
+        This method applies any changes made by other processes since the files were
+        loaded, or since refresh() was last called (see TaskStore.refresh()).
+
+        If another process has added or edited tasks (see
+        BinaryTaskList.changed_elsewhere()) or rewritten "users.txt", the header of the
+        binary task file and the users are read again, and the user index, task counts
+        and date indexes are rebuilt when they are next needed.
+
+        Returns True if anything was changed.
+        """
+
+        if not self.master_task_list.changed_elsewhere() and self._files_state() == self._loaded_files_state:
+            return False
+
+        self.load()
+
+        return True
+
+
+
+    """ -------------------------- Storage methods. --------------------------------- """
+
+    def _load_tasks(self):
+        """
+        This method opens the binary task file as the "master_task_list". Only the header
+        of the file is read.
+        """
+
+        if isinstance(self.master_task_list, BinaryTaskList):
+            self.master_task_list.close()
+
+        self.master_task_list = BinaryTaskList(self.binary_file)
+
+
+
+    def _store_new_user(self, new_username, new_password):
+        """
+        This method rewrites the "users.txt" file with the newly registered user.
+
+        The binary task store does not use the journal (each task change is written
+        straight to the binary task file), so the users file is replaced as a whole, in
+        the same safe way as when the journal is folded (see replace_file()). It is never
+        left partly written, and there are usually few enough users for this to be quick.
+        """
+
+        self._write_users_file()
+
+
+
+    def _store_new_task(self, new_task):
+        # The BinaryTaskList has already written the new task to the end of the file.
+        pass
+
+    def _store_new_tasks(self, new_tasks, first_task_number):
+        # The BinaryTaskList has already written the new tasks to the end of the file.
+        pass
+
+
+
+    def _store_edited_task(self, task_number, edited_task):
+        """
+        This method overwrites the record of an edited task in place.
+        """
+
+        self.master_task_list[task_number - 1] = edited_task
+
+
+
+    def _store_edited_tasks(self, edited_tasks):
+        """
+        This method overwrites the records of several edited tasks in place.
+        """
+
+        for task_number, edited_task in edited_tasks:
+            self.master_task_list[task_number - 1] = edited_task
+
+
+
+    def compact(self):
+        """
+        This method removes any empty lines from the "users.txt" file. (The binary task
+        file never needs to be compacted.)
+
+        Returns True if the file was rewritten.
+        """
+
+        if self._blank_user_lines:
+            self._write_users_file()
+            return True
+
+        return False
+
+
+
+    """ ----------------------- Reading the stored tasks. --------------------------- """
+
+    def _task_usernames(self):
+        return self.master_task_list.usernames()
+
+    def _task_summaries(self):
+        return self.master_task_list.summaries()
+
+    def _task_summary_counts(self):
+        return self.master_task_list.summary_counts()
+
+    def _task_texts(self):
+        return self.master_task_list.texts()
+
+
+
+    def _tasks_file_state(self):
+        """
+        This method returns the state of the binary task file that a saved search index
+        must match: the identity (inode) of the file and the number of tasks. (The titles
+        and descriptions of tasks are never changed.)
+        """
+
+        return [os.stat(self.binary_file).st_ino, len(self.master_task_list)]
+
+
+
+
+def convert_to_binary(binary_file=BINARY_FILE, tasks_file="tasks.txt", users_file="users.txt"):
+    """
+    This function copies all tasks from the "tasks.txt" file (including any changes in
+    the journal) into a new binary task file, for use with the BinaryTaskStore. The
+    tasks keep their task numbers. The journal is folded back into "tasks.txt" and
+    "users.txt" first, as the BinaryTaskStore reads the users from "users.txt".
+
+    Note that this compacts the text files as a side effect (see TaskStore.compact()):
+    "tasks.txt" (and "users.txt", if users were registered in the journal) is rewritten
+    without empty lines, and the journal is removed.
+
+    A "FileExistsError" is raised if the binary task file already exists. It returns
+    the number of tasks copied.
+    """
+
+    if os.path.exists(binary_file):
+        raise FileExistsError(f"The binary task file '{binary_file}' already exists.")
+
+    # Load the text files. Tasks are copied from their lines without being stored, and no
+    # snapshot is saved for the text files.
+    text_store = TaskStore(tasks_file, users_file, lazy=True, snapshot=False)
+
+    # Close the files kept open by the text store, even if the copy fails.
+    try:
+        text_store.compact()
+
+        # Number the registered users first, then any other usernames as they are found.
+        user_ids = {username: user_id for user_id, username in enumerate(text_store.username_password)}
+
+        records = bytearray()
+        heap = bytearray()
+        pack_record = BinaryTaskList._record.pack
+
+        for task_line in text_store.master_task_list.task_lines():
+
+            task_components = task_line.split(';')
+
+            user_id = user_ids.setdefault(task_components[0], len(user_ids))
+            title = task_components[1].encode("utf-8")
+            description = task_components[2].encode("utf-8")
+
+            records += pack_record(
+                user_id,
+                parse_date(task_components[3]).toordinal(),
+                parse_date(task_components[4]).toordinal(),
+                parse_date(task_components[6]).toordinal() if len(task_components) >= 7 else 0,
+                BinaryTaskList.COMPLETED_FLAG if task_components[5] == "Yes" else 0,
+                len(heap),
+                len(title),
+                len(description),
+            )
+            heap += title
+            heap += description
+
+        num_tasks = len(text_store.master_task_list)
+
+    finally:
+        text_store.close()
+
+    BinaryTaskList.create(binary_file, records, heap, user_ids, num_tasks)
+
+    # Any search index saved for an earlier binary task file with the same name is out of
+    # date.
+    if os.path.exists(binary_file + ".search"):
+        os.remove(binary_file + ".search")
+
+    return num_tasks
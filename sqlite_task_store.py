@@ -0,0 +1,635 @@
+# ------------------------------- sqlite_task_store.py ----------------------------------
+
+"""
+This module stores the tasks and users of the Task Manager (see task_manager.py) in an
+SQLite database ("tasks.db"), rather than in the "tasks.txt" and "users.txt" files.
+
+The program uses the database once the tasks and users have been copied into it with
+
+    python task_manager.py migrate
+"""
+
+
+
+
+
+
+
+# -------------------------------- Importing libraries. ---------------------------------
+
+import os
+import sqlite3
+
+from datetime import date
+
+from task_manager import DATABASE_FILE, FileLock, Task, TaskSelection, TaskStore, parse_date
+
+
+
+
+
+
+
+# ----------------------------- Defining the SQLite task store. -------------------------
+
+def sql_date(date_value):
+    """
+    This function converts a date (or datetime) into a "YYYY-MM-DD" string, as stored in
+    the SQLite database. (The strings sort in the same order as the dates.)
+    """
+
+    return f"{date_value.year:04d}-{date_value.month:02d}-{date_value.day:02d}"
+
+
+
+
+def open_task_database(database_file):
+    """
+    This function opens (or creates) the SQLite database of the SQLite task store, and
+    returns the connection.
+
+    The database uses write-ahead logging (WAL mode), so that each change only needs a
+    short write to the log. The tasks table is indexed by username, due date and
+    completion status.
+    """
+
+    connection = sqlite3.connect(database_file)
+
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+
+    with connection:
+
+        # The users, in order of registration (the order of their rowid).
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS users ("
+            "username TEXT PRIMARY KEY, password TEXT NOT NULL)"
+        )
+
+        # The tasks. The id of each task is its task number.
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "id INTEGER PRIMARY KEY, username TEXT NOT NULL, title TEXT NOT NULL, "
+            "description TEXT NOT NULL, assigned_date TEXT NOT NULL, due_date TEXT NOT NULL, "
+            "completed INTEGER NOT NULL DEFAULT 0, updated_date TEXT)"
+        )
+
+        connection.execute("CREATE INDEX IF NOT EXISTS tasks_username ON tasks (username)")
+        connection.execute("CREATE INDEX IF NOT EXISTS tasks_due_date ON tasks (due_date)")
+        connection.execute("CREATE INDEX IF NOT EXISTS tasks_completed ON tasks (completed, due_date)")
+
+    return connection
+
+
+
+
+class SQLiteTaskList:
+    """
+    This class is a list of tasks stored in the tasks table of an SQLite database.
+
+    It is used as the "master_task_list" of the SQLiteTaskStore. Only the tasks which are
+    accessed are read from the database, and each change is written straight to the
+    database in its own transaction:
+        - appending a task inserts a single row,
+        - storing a task (e.g. "task_list[pos] = task") updates a single row.
+
+    Position "pos" in the list is the task with id (task number) "pos + 1".
+    """
+
+    # The task columns, in the order of the Task fields.
+    _columns = "username, title, description, assigned_date, due_date, completed, updated_date"
+
+    def __init__(self, connection):
+
+        self._connection = connection
+
+        # The number of tasks. (The task numbers run from 1 to the number of tasks.)
+        self._length = self._count_tasks()
+
+    def __len__(self):
+        return self._length
+
+    def _count_tasks(self):
+        """
+        This method reads the number of tasks from the database. (Tasks are never removed,
+        so this is the highest task number.)
+        """
+
+        return self._connection.execute("SELECT COALESCE(MAX(id), 0) FROM tasks").fetchone()[0]
+
+    @staticmethod
+    def _row_to_task(row):
+        """
+        This method converts a row of the tasks table into a Task.
+        """
+
+        username, title, description, assigned_date, due_date, completed, updated_date = row
+
+        return Task(username, title, description, parse_date(assigned_date),
+                    parse_date(due_date), bool(completed), updated_date)
+
+    @staticmethod
+    def _task_to_row(task):
+        """
+        This method converts a Task into the values of a row of the tasks table.
+        """
+
+        return (task.username, task.title, task.description, sql_date(task.assigned_date),
+                sql_date(task.due_date), int(task.completed), task.updated_date)
+
+    def __getitem__(self, index):
+
+        # Slices return a plain list of the selected tasks.
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+
+            # Read a continuous range of tasks with a single query.
+            if step == 1:
+                rows = self._connection.execute(
+                    f"SELECT {self._columns} FROM tasks WHERE id > ? AND id <= ? ORDER BY id",
+                    (start, stop),
+                )
+                return [self._row_to_task(row) for row in rows]
+
+            return [self[pos] for pos in range(start, stop, step)]
+
+        if index < 0:
+            index += len(self)
+
+        if index not in range(len(self)):
+            raise IndexError("task index out of range")
+
+        row = self._connection.execute(
+            f"SELECT {self._columns} FROM tasks WHERE id = ?", (index + 1,)
+        ).fetchone()
+
+        return self._row_to_task(row)
+
+    def __setitem__(self, index, task):
+
+        if index < 0:
+            index += len(self)
+
+        # Update the single row of the task in its own transaction.
+        with self._connection:
+            self._connection.execute(
+                "UPDATE tasks SET username = ?, title = ?, description = ?, assigned_date = ?, "
+                "due_date = ?, completed = ?, updated_date = ? WHERE id = ?",
+                self._task_to_row(task) + (index + 1,),
+            )
+
+    def update_many(self, numbered_tasks):
+        """
+        This method updates the rows of several tasks, given as (task number, task)
+        pairs, in a single transaction.
+        """
+
+        with self._connection:
+            self._connection.executemany(
+                "UPDATE tasks SET username = ?, title = ?, description = ?, assigned_date = ?, "
+                "due_date = ?, completed = ?, updated_date = ? WHERE id = ?",
+                [self._task_to_row(task) + (task_number,) for task_number, task in numbered_tasks],
+            )
+
+    def __iter__(self):
+        for row in self._connection.execute(f"SELECT {self._columns} FROM tasks ORDER BY id"):
+            yield self._row_to_task(row)
+
+    def append(self, task):
+
+        # Insert the new task as a single row in its own transaction. SQLite gives it the
+        # next free id, even if another process has added tasks since the number of tasks
+        # was read, and the number of tasks is read again within the same transaction.
+        with self._connection:
+            self._connection.execute(
+                f"INSERT INTO tasks ({self._columns}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self._task_to_row(task),
+            )
+            self._length = self._count_tasks()
+
+    def extend(self, tasks):
+
+        # Insert all of the new tasks in a single transaction, with the next free ids (see
+        # append()).
+        with self._connection:
+            self._connection.executemany(
+                f"INSERT INTO tasks ({self._columns}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [self._task_to_row(task) for task in tasks],
+            )
+            self._length = self._count_tasks()
+
+    def index(self, task):
+        for pos, each_task in enumerate(self):
+            if each_task == task:
+                return pos
+        raise ValueError("task is not in list")
+
+    def usernames(self):
+        """
+        This method yields the username of each task.
+        """
+
+        for (username,) in self._connection.execute("SELECT username FROM tasks ORDER BY id"):
+            yield username
+
+    def summaries(self):
+        """
+        This method yields the username, due date and completion status of each task.
+        """
+
+        for username, due_date, completed in self._connection.execute(
+                "SELECT username, due_date, completed FROM tasks ORDER BY id"):
+            yield username, parse_date(due_date), bool(completed)
+
+    def summary_counts(self):
+        """
+        This method yields each combination of username, due date and completion status
+        found among the tasks, with the number of tasks which have that combination. The
+        tasks are grouped by the database.
+        """
+
+        for username, due_date, completed, count in self._connection.execute(
+                "SELECT username, due_date, completed, COUNT(*) FROM tasks "
+                "GROUP BY username, due_date, completed"):
+            yield username, parse_date(due_date), bool(completed), count
+
+    def texts(self):
+        """
+        This method yields the title and description of each task.
+        """
+
+        yield from self._connection.execute("SELECT title, description FROM tasks ORDER BY id")
+
+
+
+
+class SQLiteTaskStore(TaskStore):
+    """
+    This class is a TaskStore which stores the tasks and users in an SQLite database,
+    rather than in the "tasks.txt" and "users.txt" files.
+
+    The "master_task_list" is an SQLiteTaskList, so only the tasks which are used are
+    read into memory. Each new task, edited task and new user is written to the database
+    in a single transaction. The users' task lists, the tasks due soon and the filtered
+    task views are found with queries on the indexes of the tasks table, rather than with
+    indexes built in memory.
+
+    Parameters:
+
+        "database_file" =   the SQLite database file (default: "tasks.db")
+
+        "numpy_reports" =   if True, reports are built with NumPy (see TaskStore)
+
+    A database can be created from the "tasks.txt" and "users.txt" files with
+    migrate_to_sqlite().
+    """
+
+    def __init__(self, database_file=DATABASE_FILE, numpy_reports=False):
+
+        self.database_file = database_file
+        self._connection = open_task_database(database_file)
+
+        super().__init__(numpy_reports=numpy_reports, snapshot=False)
+
+        # The search index is saved next to the database.
+        self.search_file = database_file + ".search"
+
+        # The lock which is held while the database is changed (see TaskStore). SQLite
+        # only locks the database while each change is written, not while it is prepared.
+        self.lock_file = database_file + ".lock"
+        self._file_lock = FileLock(self.lock_file)
+
+
+
+    def close(self):
+        """
+        This method closes the database and the lock file.
+        """
+
+        self._connection.close()
+        self._file_lock.close()
+
+
+
+    def load(self, save_snapshot=True):
+        """
+        This method (re)loads the users and the number of tasks from the database (see
+        TaskStore.load()).
+        """
+
+        # Remember the version of the database before it is read (see refresh()).
+        self._data_version = self._connection.execute("PRAGMA data_version").fetchone()[0]
+
+        super().load(save_snapshot)
+
+
+
+    def refresh(self):
+        """
+        This method applies any changes made to the database by other processes since it
+        was loaded, or since refresh() was last called (see TaskStore.refresh()).
+
+        SQLite changes the "data_version" of the connection whenever another connection
+        changes the database. The users and the number of tasks are then read again, and
+        the user index, task counts and date indexes are rebuilt when they are next needed.
+        (The tasks themselves are always read from the database.)
+
+        Returns True if anything was changed.
+        """
+
+        if self._connection.execute("PRAGMA data_version").fetchone()[0] == self._data_version:
+            return False
+
+        self.load()
+
+        return True
+
+
+
+    """ -------------------------- Storage methods. --------------------------------- """
+
+    def _load_tasks(self):
+        """
+        This method opens the tasks table as the "master_task_list". No tasks are read
+        until they are needed.
+        """
+
+        self.master_task_list = SQLiteTaskList(self._connection)
+
+
+
+    def _load_users(self):
+        """
+        This method reads all users from the users table into the "username_password"
+        dictionary, in order of registration.
+
+        If there are no users yet, a default "admin" account is added.
+        """
+
+        users = self._connection.execute("SELECT username, password FROM users ORDER BY rowid").fetchall()
+
+        if not users:
+            users = [("admin", "password")]
+            with self._connection:
+                self._connection.executemany("INSERT INTO users (username, password) VALUES (?, ?)", users)
+
+        self.username_password = dict(users)
+
+
+
+    def _store_new_user(self, new_username, new_password):
+        """
+        This method inserts a newly registered user into the users table.
+        """
+
+        with self._connection:
+            self._connection.execute(
+                "INSERT INTO users (username, password) VALUES (?, ?)", (new_username, new_password)
+            )
+
+
+
+    def _store_new_task(self, new_task):
+        # The SQLiteTaskList has already inserted the new task into the database.
+        pass
+
+    def _store_new_tasks(self, new_tasks, first_task_number):
+        # The SQLiteTaskList has already inserted the new tasks into the database.
+        pass
+
+
+
+    def _store_edited_task(self, task_number, edited_task):
+        """
+        This method updates the single row of an edited task, in its own transaction.
+        """
+
+        self.master_task_list[task_number - 1] = edited_task
+
+
+
+    def _store_edited_tasks(self, edited_tasks):
+        """
+        This method updates the rows of several edited tasks in a single transaction.
+        """
+
+        self.master_task_list.update_many(edited_tasks)
+
+
+
+    def compact(self):
+        """
+        This method copies the changes in the write-ahead log back into the database.
+
+        The database does not contain empty lines or a journal, so nothing needs
+        to be rewritten. It returns False.
+        """
+
+        self._connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        return False
+
+
+
+    """ ----------------------- Reading the stored tasks. --------------------------- """
+
+    def _task_usernames(self):
+        return self.master_task_list.usernames()
+
+    def _task_summaries(self):
+        return self.master_task_list.summaries()
+
+    def _task_summary_counts(self):
+        return self.master_task_list.summary_counts()
+
+    def _task_texts(self):
+        return self.master_task_list.texts()
+
+
+
+    def _tasks_file_state(self):
+        """
+        This method returns the state of the database that a saved search index must
+        match: the identity (inode) of the database file and the number of tasks. (The
+        titles and descriptions of tasks are never changed.)
+        """
+
+        return [os.stat(self.database_file).st_ino, len(self.master_task_list)]
+
+
+
+    def _select_task_numbers(self, where_clause, parameters, order="id"):
+        """
+        This method returns the task numbers of the tasks matching an SQL "where_clause".
+        """
+
+        rows = self._connection.execute(
+            f"SELECT id FROM tasks WHERE {where_clause} ORDER BY {order}", parameters
+        )
+
+        return [task_number for (task_number,) in rows]
+
+
+
+    def get_user_task_numbers(self, user):
+        """
+        This method returns the sorted list of the task numbers of all tasks assigned to
+        a user, using the username index of the tasks table.
+        """
+
+        return self._select_task_numbers("username = ?", (user,))
+
+
+
+    def get_tasks_due(self, first_due_date, last_due_date):
+        """
+        This method returns the incomplete tasks due between "first_due_date" and
+        "last_due_date" (inclusive), in order of due date, using the completion and due
+        date index of the tasks table.
+
+        It returns the list of tasks and the list of corresponding task numbers.
+        """
+
+        task_numbers = self._select_task_numbers(
+            "completed = 0 AND due_date BETWEEN ? AND ?",
+            (sql_date(first_due_date), sql_date(last_due_date)),
+            order="due_date, id",
+        )
+        due_tasks = [self.master_task_list[number - 1] for number in task_numbers]
+
+        return due_tasks, task_numbers
+
+
+
+    def count_overdue_tasks(self):
+        """
+        This method returns the number of incomplete tasks which are overdue.
+        """
+
+        return self._connection.execute(
+            "SELECT COUNT(*) FROM tasks WHERE completed = 0 AND due_date < ?", (sql_date(date.today()),)
+        ).fetchone()[0]
+
+
+
+    def filter_tasks(self, completed=None, assignee=None, due_from=None, due_to=None,
+                     assigned_from=None, assigned_to=None, updated_since=None):
+        """
+        This method returns the tasks which match all of the given filters, in order of
+        task number (see TaskStore.filter_tasks()), with a single query on the tasks
+        table.
+        """
+
+        # The conditions of the query, and the values used in them.
+        conditions = []
+        parameters = []
+
+        if completed is not None:
+            conditions.append("completed = ?")
+            parameters.append(int(completed))
+
+        if assignee is not None:
+            conditions.append("username = ?")
+            parameters.append(assignee)
+
+        # The date columns and the comparisons used for each date filter.
+        for column, comparison, date_value in [
+                ("due_date", ">=", due_from),
+                ("due_date", "<=", due_to),
+                ("assigned_date", ">=", assigned_from),
+                ("assigned_date", "<=", assigned_to),
+                ("updated_date", ">=", updated_since)]:
+            if date_value is not None:
+                conditions.append(f"{column} {comparison} ?")
+                parameters.append(sql_date(date_value))
+
+        task_numbers = self._select_task_numbers(" AND ".join(conditions) or "1", parameters)
+
+        return TaskSelection(self.master_task_list, task_numbers), task_numbers
+
+
+
+
+def remove_database(database_file):
+    """
+    This function removes an SQLite database, along with its write-ahead log and shared
+    memory files, if they exist.
+    """
+
+    for file_name in (database_file, database_file + "-wal", database_file + "-shm"):
+        if os.path.exists(file_name):
+            os.remove(file_name)
+
+
+
+
+def migrate_to_sqlite(database_file=DATABASE_FILE, tasks_file="tasks.txt", users_file="users.txt"):
+    """
+    This function copies all tasks and users from the "tasks.txt" and "users.txt" files
+    into a new SQLite database, for use with the SQLiteTaskStore.
+
+    Any changes in the journal are included. The tasks keep their task numbers. The
+    database is built in a temporary file, which only replaces "database_file" once
+    every row has been copied. If the copy fails (e.g. a task has an invalid date), no
+    database is left behind, so the program keeps using the text files.
+
+    A "FileExistsError" is raised if the database already exists. It returns the number
+    of users and the number of tasks copied, as a tuple.
+    """
+
+    if os.path.exists(database_file):
+        raise FileExistsError(f"The database '{database_file}' already exists.")
+
+    # Load the text files. Tasks are copied from their lines without being stored, and no
+    # snapshot is saved for the text files.
+    text_store = TaskStore(tasks_file, users_file, lazy=True, snapshot=False)
+
+    def task_rows():
+        for task_number, task_line in enumerate(text_store.master_task_list.task_lines(), 1):
+            task_components = task_line.split(';')
+            yield (
+                task_number,
+                task_components[0],
+                task_components[1],
+                task_components[2],
+                sql_date(parse_date(task_components[3])),
+                sql_date(parse_date(task_components[4])),
+                1 if task_components[5] == "Yes" else 0,
+                task_components[6] if len(task_components) >= 7 else None,
+            )
+
+    # The database is built under a temporary name (removing any left by an earlier
+    # migration which failed).
+    temp_file = database_file + ".tmp"
+    remove_database(temp_file)
+
+    try:
+        connection = open_task_database(temp_file)
+        try:
+            with connection:
+                connection.executemany(
+                    "INSERT INTO users (username, password) VALUES (?, ?)", text_store.username_password.items()
+                )
+                connection.executemany(
+                    f"INSERT INTO tasks (id, {SQLiteTaskList._columns}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    task_rows(),
+                )
+        finally:
+            connection.close()
+
+        num_users, num_tasks = len(text_store.username_password), len(text_store.master_task_list)
+
+        # The complete database replaces "database_file" in a single step.
+        os.replace(temp_file, database_file)
+
+    # Close the files kept open by the text store, and remove the unfinished database,
+    # even if the copy failed.
+    finally:
+        text_store.close()
+        remove_database(temp_file)
+
+    # Any search index saved for an earlier database with the same name is out of date.
+    if os.path.exists(database_file + ".search"):
+        os.remove(database_file + ".search")
+
+    return num_users, num_tasks
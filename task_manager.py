@@ -10,6 +10,9 @@ The key functions offered within the program are:
     - adding new tasks (and assigning these to team members)
     - viewing all tasks
     - viewing the user's tasks
+    - viewing the tasks due soon
+    - viewing tasks filtered by status, assigned person and dates
+    - searching tasks by keyword
     - generating reports (i.e. detailed information regarding current task management
       status)
     - displaying statistics (e.g. current number of users, current number of tasks).
@@ -24,6 +27,47 @@ All tasks managed by the program are stored in "tasks.txt", which the program wi
 if the file does not already exist.
 All registered users are listed in "users.txt", which the program will create if the file
 does not already exist.
+Changes are first recorded in a journal ("tasks.txt.journal"), which is folded back into
+"tasks.txt" and "users.txt" from time to time, so the files are never left partly written.
+
+The tasks and users can instead be stored in an SQLite database ("tasks.db", see
+sqlite_task_store.py). Running
+
+    python task_manager.py migrate
+
+copies the tasks and users from "tasks.txt" and "users.txt" into a new database, which
+the program then uses instead of the text files.
+
+The tasks can also be stored in a memory-mapped binary task file ("tasks.bin", see
+binary_task_store.py), which opens in the same short time for any number of tasks.
+Running
+
+    python task_manager.py convert-binary
+
+copies the tasks from "tasks.txt" into a new binary task file, which the program then
+uses instead of "tasks.txt". (The users are still stored in "users.txt".)
+
+The program can also be run by scripts (e.g. scheduled jobs), without the interactive
+login and menu, with one of the commands "add", "list", "complete", "reassign",
+"report", "stats" and "import". For example:
+
+    TASK_MANAGER_USERNAME=admin TASK_MANAGER_PASSWORD=password \
+        python task_manager.py list --status incomplete --json
+
+lists the incomplete tasks as JSON, and
+
+    python task_manager.py --username admin --password password import new_tasks.csv
+
+adds every task listed in a CSV or JSONL file, and reports any rows which could not be
+added. Run "python task_manager.py --help" for the full list of commands.
+
+The task and user data is managed by the "TaskStore" class. The store does not request
+any input from the user, so it can be imported and used without the interactive menu:
+
+    from task_manager import TaskStore
+
+    store = TaskStore()
+    store.add_task("admin", "Title", "Description", datetime(2030, 1, 1))
 """
 
 
@@ -35,10 +79,39 @@ does not already exist.
 # -------------------------------- Importing libraries. ---------------------------------
 
 import os
-
-from datetime import datetime, date
+import re
+import argparse
+import csv
+import json
+import mmap
+import marshal
+import hashlib
+import gc
+import sys
+import time
+import zlib
+
+from array import array
+from bisect import bisect_left, insort
+from datetime import datetime, date, timedelta
 DATETIME_STRING_FORMAT = "%Y-%m-%d"
 
+from functools import lru_cache
+from contextlib import contextmanager
+
+# NumPy is optional. It is only needed for the vectorised report mode (see TaskStore).
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# fcntl is only available on Unix-like systems. Without it, the files are not locked
+# (see FileLock).
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 
 
 
@@ -73,7 +146,7 @@ class NotInListError(Exception):
 
         elif self.error_type == "out_of_range":
             self.message = ("\n\t** That choice is not recognised. **")
-    
+
     def __str__(self):
         return self.message
 
@@ -89,552 +162,5120 @@ class TaskAlreadyComplete(Exception):
 
     def __init__(self):
         self.message = ("\n\t** Error: This task has already been marked as complete and can no longer be edited. **\n")
-    
+
     def __str__(self):
         return self.message
 
 
 
+class UserNotRecognised(Exception):
+    """
+    This exception is raised if a task is assigned to a username that is not registered
+    in the Task Manager.
+    """
 
+    def __init__(self, username):
+        self.username = username
+        self.message = (f"\n\t** User \"{username}\" not recognised. **")
 
+    def __str__(self):
+        return self.message
 
 
-# ---------------------------------- Defining functions. --------------------------------
-
 
-def reg_user():
+class UsernameTaken(Exception):
     """
-    This function registers a new user to the Task Manager.
-    
-    The function is called when the user selects 'r' at the Main Menu.
-
-    The new user is added to the "users.txt" file.
-    The new user is also added to the "username_password" dictionary which stores all
-    current users.
+    This exception is raised if a new user is registered with a username that is already
+    registered in the Task Manager.
     """
 
-    """ ------------------------ Display section title. ----------------------------- """
+    def __init__(self, username):
+        self.username = username
+        self.message = (f"\n\t** Sorry, the username \"{username}\" is already taken. **")
 
-    print("-"*100)
-    print("REGISTER A NEW USER\n")
+    def __str__(self):
+        return self.message
 
 
-    """ ---------------------------- Get username. ---------------------------------- """
 
-    # Request input of a username for the new user.
-    new_username = input("Enter a username:\t\t")
 
-    # If the chosen username is already registered, show an error message.
-    while new_username in username_password:
-        print("\n\t** Sorry, that username is already taken. **\n")
-        # Ask the user to choose another username.
-        new_username = input("Choose another username:\t")
+class InvalidText(Exception):
+    """
+    This exception is raised if a task title, task description or username contains a
+    ';' or a new line character. These characters separate the fields and lines of the
+    "tasks.txt" and "users.txt" files (and the records of the journal), so they cannot be
+    stored within a field.
 
+    It takes the "field_name" (e.g. "title") as a parameter.
+    """
 
-    """ ---------------------------- Get password. ---------------------------------- """
+    def __init__(self, field_name):
+        self.field_name = field_name
+        self.message = (f"\n\t** The {field_name} may not contain ';' or a new line. **")
 
-    # Request input of a password for the new user.
-    new_password = input("\nChoose your password:\t\t")
+    def __str__(self):
+        return self.message
 
-    # Request input of the password again to confirm.
-    confirm_password = input("Confirm password:\t\t")       
 
-    # While the "new_password" and "confirm_password" inputs don't match:
-    while new_password != confirm_password:
 
-        # Show an error message.
-        print("\n\t **Passwords do not match. Please try again. **\n")
 
-        # Request input of a password for the new user.
-        new_password = input("Choose your password:\t\t")
+class InvalidDueDate(Exception):
+    """
+    This exception is raised if moving the due date of a task by a number of days would
+    give a date outside of the dates the program can store (after the year 9999, or
+    before the year 1).
 
-        # Request input of the password again to confirm.
-        confirm_password = input("Confirm password:\t\t")
+    It takes the "task_number" of the task as a parameter.
+    """
 
+    def __init__(self, task_number):
+        self.task_number = task_number
+        self.message = (f"\n\t** The Due Date of task {task_number} cannot be moved that far. **")
 
-    """ ------------------------------ Add user.  ----------------------------------- """
+    def __str__(self):
+        return self.message
 
-    # Add the new user to the "username_password" dictionary.
-    username_password[new_username] = new_password
-    
-    # Add the new user to the "users.txt" file.
-    with open("users.txt", 'w', encoding="utf-8") as file_to_update:
 
-        # Declare "temp_user_list" to store user data in the correct format for writing.
-        temp_user_list = []
 
-        # For each user in the "username_password" dictionary:
-        for name, passw in username_password.items():
-            # Concatenate a string of username, ';', and password.
-            user_str = name + ';' + passw
-            # Append the formatted string to the "temp_user_list".
-            temp_user_list.append(user_str)
 
-        # Write the users in "temp_user_list" to the "users.txt" file.
-        file_to_update.write("\n".join(temp_user_list))
+class JournalDamaged(Exception):
+    """
+    This exception is raised if a record in the middle of the journal is damaged (e.g.
+    its checksum does not match), with valid records after it.
 
-    # Display a confirmation message for the user.
-    print(f"\nNew user \"{new_username}\" added successfully.")
+    (Only the last record of the journal can be left incomplete by a program which
+    stopped while writing it. That record is removed before the next record is written.
+    A damaged record anywhere else means that the journal has been changed in some other
+    way, so the journal is left as it is, rather than losing the records after it.)
 
+    It takes the "journal_file" and the "position" of the damaged record as parameters.
+    """
 
+    def __init__(self, journal_file, position):
+        self.journal_file = journal_file
+        self.position = position
+        self.message = (f"\n\t** The journal \"{journal_file}\" is damaged at byte {position}. "
+                        "It has been left unchanged, so that it can be repaired. **")
 
+    def __str__(self):
+        return self.message
 
-def add_task():
-    """
-    This function adds a new task to the Task Manager.
 
-    The function is called when the user selects 'a' at the Main Menu.
 
-    To add a task, a user must enter:
-        - the name of the person assigned to the task,
-        - a task title,
-        - a task description,
-        - a task due date.
-    
-    The function also automatically records the date the task was assigned, and sets a
-    completion status for the new task. (All new tasks are initially set to incomplete.)
-    
-    The new task is added to the "tasks.txt" file.
-    The new task is also added to the "master_task_list" which stores all current tasks.
+
+class InvalidImportRow(Exception):
     """
+    This exception describes a row of a task import file which could not be imported
+    (see TaskStore.import_tasks()).
 
-    """ ------------------------ Display section title. ----------------------------- """
+    It takes the "row_number" of the row within the file and the "reason" it could not
+    be imported as parameters.
+    """
 
-    print("-"*100)
-    print("ADD A NEW TASK\n")
+    def __init__(self, row_number, reason):
+        self.row_number = row_number
+        self.reason = reason
+        self.message = (f"\t** Row {row_number}: {reason} **")
 
+    def __str__(self):
+        return self.message
 
 
-    """ ----------------- Gather information about the new task. -------------------- """
 
 
-    """ Assigned user.
-    """
-    # Request input of the "assigned_user" for the new task.
-    assigned_user = input("Please enter the username of person assigned to this task:\t\t")
-    
-    # While the input for "assigned_user" is not a registered username:
-    while assigned_user not in username_password.keys():
-        # Show an error message.
-        print("\n\t**User not recognised. **\n")
-        # Ask the user to input another username until a registered user is chosen.
-        assigned_user = input("Please enter the username of person assigned to this task:\t\t")
 
 
-    """ Task title.
-    """
-    # Request input of the "task_title" for the new task.
-    task_title = input("\nPlease enter a Task Title:\t\t\t\t\t\t")
 
+# ---------------------------------- Parsing task data. ---------------------------------
 
-    """ Task decription.
+def check_text(field_name, text):
+    """
+    This function raises an "InvalidText" exception if the "text" of a field (e.g. a
+    task title) contains a ';' or a new line character, which cannot be stored within a
+    field of "tasks.txt" or "users.txt".
     """
-    # Request input of the "task_description" for the new task.
-    task_description = input("\nPlease enter a Task Description:\t\t\t\t\t")
+
+    if ';' in text or '\n' in text or '\r' in text:
+        raise InvalidText(field_name)
+
 
 
-    """ Date assigned.
+
+@lru_cache(maxsize=4096)
+def parse_date(date_string):
+    """
+    This function converts a "YYYY-MM-DD" date string into a datetime.
+
+    The same date strings repeat many times within "tasks.txt", so the results are
+    memoized. Strings in the usual "YYYY-MM-DD" layout are converted directly, without
+    the overhead of datetime.strptime(). Any other string is passed to strptime(), which
+    raises a ValueError if the string is not a valid date.
     """
-    # Store the current date, which is the date the task was assigned.
-    date_assigned = date.today()
 
+    # Fast path for the usual "YYYY-MM-DD" layout.
+    if (len(date_string) == 10 and date_string[4] == '-' and date_string[7] == '-'
+            and date_string[:4].isdigit() and date_string[5:7].isdigit()
+            and date_string[8:].isdigit()):
+        return datetime(int(date_string[:4]), int(date_string[5:7]), int(date_string[8:]))
 
-    """ Due date.
+    # Any other layout is validated by strptime().
+    return datetime.strptime(date_string, DATETIME_STRING_FORMAT)
+
+
+
+
+def read_import_file(file_name):
     """
-    # Request input of the "due_date" for the new task.
-    while True:
-        # Perform input validation with try-except block.
-        try:
-            input_date = input("\nPlease enter the Due Date of the task (Format: YYYY-MM-DD):\t\t")
+    This function reads the rows of a task import file, one row at a time, and yields
+    the "row_number" and the dictionary of "fields" of each row.
 
-            # Store the date in the correct format in "due_date".
-            due_date = datetime.strptime(input_date, DATETIME_STRING_FORMAT)
+    A ".jsonl" (or ".json") file holds one JSON object per line. Any other file is read
+    as a CSV file, with a header row naming the fields. The fields of each task are
+    "username", "title", "description", "due_date" and (optionally) "assigned_date".
 
-            # Break the parent while-loop when a valid date is entered.
-            break
+    The "fields" are None for a JSONL line which is not a JSON object.
+    """
 
-        # If a date is entered in an incorrect format, show an error message.
-        except ValueError:
-            print("\n\t** Invalid date-time format. Please use the format specified. **")
+    with open(file_name, 'r', encoding="utf-8", newline='') as import_file:
 
+        # Read one JSON object from each (non-empty) line.
+        if file_name.lower().endswith((".jsonl", ".json")):
+            for row_number, line in enumerate(import_file, 1):
+                if line.strip():
+                    try:
+                        fields = json.loads(line)
+                    except ValueError:
+                        fields = None
+                    yield row_number, fields if isinstance(fields, dict) else None
+
+        # Read each row of the CSV file as a dictionary, using the header row. (The row
+        # number is the line on which the row ends, as a quoted field may span lines.)
+        else:
+            reader = csv.DictReader(import_file)
+            for fields in reader:
+                yield reader.line_num, fields
 
 
-    """ ----------------- Store task information for the new task. ------------------ """
 
-    # Create an "add_task" dictionary and store the new task information gathered above.
-    add_task = {
-        "username": assigned_user,
-        "title": task_title,
-        "description": task_description,
-        "assigned_date": date_assigned,
-        "due_date": due_date,
-        # New tasks are automatically set to incomplete upon creation.
-        "completed": False,
-        "new_line": "\n"
-    }
 
-    # Update the "master_task_list" with the new task.
-    master_task_list.append(add_task)
+class Task:
+    """
+    This class stores the details of a single task.
 
+    Tasks are stored as compact records: the class uses "__slots__", so each task only
+    stores its seven fields rather than a dictionary of field names and values. With
+    a large number of tasks this uses much less memory than a dictionary per task.
 
-    """ ---------------- Write the new task to the "tasks.txt" file. ---------------- """
+    Fields:
 
-    # Convert the new task information into a string in the correct format.
-    task_string = "\n"
-    task_string += add_task["username"] + ';'
-    task_string += add_task["title"] + ';'
-    task_string += add_task["description"] + ';'
-    task_string += add_task["assigned_date"].strftime(DATETIME_STRING_FORMAT) + ';'
-    task_string += add_task["due_date"].strftime(DATETIME_STRING_FORMAT) + ';'
-    task_string += "No"
-    task_string += "\n"
+        "username" =        the username of the person assigned to the task
 
-    # Append the "task_string" to the "tasks.txt" file.
-    with open("tasks.txt", 'a', encoding="utf-8") as file:
-        file.write(task_string)
+        "title" =           the task title
 
-    # Display a confirmation message for the user.
-    print(f"\nTask \"{task_title}\" successfully added.")
+        "description" =     the task description
 
+        "assigned_date" =   the date the task was assigned
 
+        "due_date" =        the due date of the task
 
+        "completed" =       True if the task has been marked as complete
 
-def write_tasks_to_file(updated_list):
+        "updated_date" =    the date the task was last updated, as a "YYYY-MM-DD"
+                            string (None if the task has never been updated)
     """
-    This function overwrites an updated list of tasks to the "tasks.txt" file.
 
-    The function is called within the program whenever a list of tasks has been updated
-    so the updated version of the list can be viewed immediately in the "tasks.txt" file.
+    __slots__ = ("username", "title", "description", "assigned_date", "due_date",
+                 "completed", "updated_date")
 
-    """
+    def __init__(self, username, title, description, assigned_date, due_date,
+                 completed=False, updated_date=None):
 
-    """ -------------- Create a starting task list from "tasks.txt". ---------------- """
+        self.username = username
+        self.title = title
+        self.description = description
+        self.assigned_date = assigned_date
+        self.due_date = due_date
+        self.completed = completed
+        self.updated_date = updated_date
 
-    # Read the current list of tasks from the data in "tasks.txt".
-    with open("tasks.txt", 'r', encoding="utf-8") as file:
+    def __eq__(self, other):
+        if not isinstance(other, Task):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
 
-        # Store this in new list variable called "overwrite_list".
-        overwrite_list = file.read().split("\n")
+    # Tasks can be changed, so they cannot be used as dictionary keys.
+    __hash__ = None
 
+    def __repr__(self):
+        fields = ", ".join(f"{field}={getattr(self, field)!r}" for field in self.__slots__)
+        return f"Task({fields})"
 
-        """ ----- Check for any updates, and replace these in "overwrite_list". ----- """
 
-        # For each task in the "updated_list" of tasks:
-        for pos, task in enumerate(updated_list):
 
-            # If the task has been marked "updated" since last writing:
-            if "updated" in task.keys():
-                if task["updated"] == True:
-                    # Store the updated task values in an "updated_task" list.
-                    updated_task = [
-                        task["username"],
-                        task["title"],
-                        task["description"],
-                        task["assigned_date"].strftime(DATETIME_STRING_FORMAT),
-                        task["due_date"].strftime(DATETIME_STRING_FORMAT),
-                        "Yes" if task["completed"] else "No",
-                        task["updated_date"],
-                    ]
-                
-                    # Replace the "updated_task" at the correct position in "overwrite_list".
-                    overwrite_list[pos] = (";".join(updated_task))
 
+def parse_task_line(task_line):
+    """
+    This function converts a single line of the "tasks.txt" file into a Task.
+    """
+
+    # Split "task_line" by ';' into a list of "task_components".
+    task_components = task_line.split(';')
 
-                    """ -------- Reset the "updated" status. ------------------------ """
+    return Task(
+        task_components[0],
+        task_components[1],
+        task_components[2],
+        parse_date(task_components[3]),
+        parse_date(task_components[4]),
+        True if task_components[5] == "Yes" else False,
+        # If a task has been previously updated, this date is another task component.
+        task_components[6] if len(task_components) >= 7 else None,
+    )
 
-                    # When processing of updates is complete, delete the ["updated"] key.
-                    del updated_list[pos]["updated"]
-                
 
-            """ ------ Format the "overwrite_list" prior to writing to file. -------- """
-            
-            # Remove any empty lines from "overwrite_list".
-            overwrite_list = [task_entry for task_entry in overwrite_list if task_entry != '']
 
 
-        """ ------------- Overwrite "overwrite_list" to "tasks.txt". ---------------- """
+def format_task_line(task):
+    """
+    This function converts a Task into a single line in the format of the "tasks.txt"
+    file.
+    """
+
+    # Store the task values in a "task_components" list.
+    task_components = [
+        task.username,
+        task.title,
+        task.description,
+        task.assigned_date.strftime(DATETIME_STRING_FORMAT),
+        task.due_date.strftime(DATETIME_STRING_FORMAT),
+        "Yes" if task.completed else "No",
+    ]
 
-        # Write all of the tasks in "overwrite_list" to the "tasks.txt" file.
-        with open("tasks.txt", 'w', encoding="utf-8") as overwrite_file:
+    # The updated date is only present if the task has been updated.
+    if task.updated_date is not None:
+        task_components.append(task.updated_date)
 
-            # Separate each string in the "overwrite_list" with a new line.
-            overwrite_file.write("\n".join(overwrite_list))
+    return ";".join(task_components)
 
 
 
 
-def view_all(master_list):
+def tasks_to_rows(tasks):
+    """
+    This function converts a list of Tasks into a list of rows of task fields, which
+    can be saved with marshal (see tasks_from_rows()). The dates are stored as day
+    ordinals.
     """
-    This function displays all of the tasks listed in the "tasks.txt" file.
 
-    The function is called when the user selects "va" at the Main Menu.
+    return [
+        (task.username, task.title, task.description, task.assigned_date.toordinal(),
+         task.due_date.toordinal(), task.completed, task.updated_date)
+        for task in tasks
+    ]
 
-    All tasks are printed to the console in a readable format.
-    Each task is displayed with a corresponding number to identify the task.
+
+
+
+def tasks_from_rows(rows):
+    """
+    This function converts a list of rows made by tasks_to_rows() back into a list of
+    Tasks. Tasks with the same dates share the same datetime objects.
     """
 
-    """ ------------------------ Display section title. ----------------------------- """
+    # The datetime of each day ordinal.
+    ordinals = {row[3] for row in rows} | {row[4] for row in rows}
+    dates = {ordinal: datetime.fromordinal(ordinal) for ordinal in ordinals}
+
+    return [
+        Task(username, title, description, dates[assigned_ordinal], dates[due_ordinal],
+             completed, updated_date)
+        for username, title, description, assigned_ordinal, due_ordinal, completed, updated_date in rows
+    ]
 
-    print("-"*100)
-    print("VIEW ALL TASKS\n")
 
 
-    """ ---------------------------- Display tasks. --------------------------------- """
 
-    display_task_list("va", master_list, "number sublist not required")
+def read_file_changes(file_name, saved_state=None, hash_file=True):
+    """
+    This function compares a file with its "saved_state" when it was last read, to find
+    out how much of the file needs to be read (and parsed) again.
+
+    A file state is a list of the size, modification time and SHA-256 hash of a file.
+
+    It returns a tuple of:
+        - the current state of the file,
+        - the number of bytes at the start of the file which are unchanged since the
+          "saved_state" (the saved size if the file is unchanged, or has only been
+          appended to, otherwise 0),
+        - the contents of the file as bytes (or None if the file has not changed).
+
+    If the size and modification time have not changed, the file is not read at all.
+    If "hash_file" is False, only the saved part of the file is hashed (to check that it
+    has not changed), and the hash in the returned state is None. (The hash of the whole
+    file is only needed if the state is saved.)
+    """
 
+    file_stats = os.stat(file_name)
 
-    """ -------- Allow the "admin" user to edit all tasks from this view. ----------- """
+    if saved_state is not None and saved_state[:2] == [file_stats.st_size, file_stats.st_mtime_ns]:
+        return saved_state, saved_state[0], None
 
-    if login_username == "admin":
-        # Create a list of task numbers to give as argument to the edit_task() function.
-        task_numbers = [pos+1 for pos,value in enumerate(master_task_list)]
-        # Allow the user to edit tasks if desired.
-        edit_task(master_task_list, master_task_list, task_numbers)
+    with open(file_name, 'rb') as changed_file:
+        file_data = changed_file.read()
 
+    # Hash the saved part of the file first, to check that it has not changed.
+    file_hash = hashlib.sha256()
+    unchanged_size = 0
 
+    with memoryview(file_data) as data_view:
 
+        if saved_state is not None and saved_state[0] <= len(file_data):
+            file_hash.update(data_view[:saved_state[0]])
+            if file_hash.hexdigest() == saved_state[2]:
+                unchanged_size = saved_state[0]
+            else:
+                file_hash = hashlib.sha256()
 
-def view_mine():
-    """
-    This function displays all of the tasks assigned to the user who is currently logged
-    in to the program.
+        # Hash the rest of the file.
+        if hash_file:
+            file_hash.update(data_view[unchanged_size:])
 
-    The function is called when the user selects "vm" at the Main Menu.
+    file_hash = file_hash.hexdigest() if hash_file else None
 
-    Each task is displayed with a corresponding number to identify the task.
-    The specific task numbers for each of the user's tasks are drawn directly from the
-    "master_task_list" for better organisation and display of tasks. This avoids changing
-    task numbers in different list displays which may result in user confusion when
-    selecting task numbers to edit.
+    return [len(file_data), file_stats.st_mtime_ns, file_hash], unchanged_size, file_data
 
-    The user can choose to edit their tasks if they wish.
 
-    """
 
-    """ ------------------------ Display section title. ----------------------------- """
 
-    print("-"*100)
-    print("VIEW MY TASKS\n")
+def replace_file(file_name, text):
+    """
+    This function replaces the contents of a file with "text", so that the file is never
+    left partly written, even if the program or the computer stops part-way through.
 
+    The text is written to a temporary file, which is synced to disk and then replaces
+    the file.
+    """
 
-    """ ------------------ Create a sublist of the user's tasks. -------------------- """
+    temp_file = file_name + ".tmp"
 
-    # Store a list of the current user's tasks and store the corresponding "task_numbers".
-    user_task_list, task_numbers = get_user_list(login_username)
+    with open(temp_file, 'w', encoding="utf-8") as new_file:
+        new_file.write(text)
+        new_file.flush()
+        os.fsync(new_file.fileno())
 
+    os.replace(temp_file, file_name)
 
-    """ ------------------- For users without any assigned tasks. ------------------- """
-    
-    # Display a message to inform the user that they do not have any assigned tasks.
-    if not user_task_list:
-        print("\nYou do not currently have any assigned tasks.")
-        
-        # Exit the function, return to Main Menu.
+    # Sync the directory too, so that the replacement itself is on disk. (A directory
+    # cannot be opened on some systems, e.g. Windows.)
+    try:
+        directory = os.open(os.path.dirname(os.path.abspath(file_name)), os.O_RDONLY)
+    except OSError:
         return
-    
 
-        """ ------------------ For users with assigned tasks. ----------------------- """
+    try:
+        os.fsync(directory)
+    except OSError:
+        pass
+    finally:
+        os.close(directory)
 
-    else:
-        # Display a list of the user's tasks for the user to review.
-        display_task_list("vm", user_task_list, task_numbers)
 
-        # Allow the user to edit their tasks if desired.
-        edit_task(master_task_list, user_task_list, task_numbers)
 
 
+# The pattern of a checksummed journal record: the CRC-32 checksum (as 8 hexadecimal
+# digits), the type of record, and the contents of the record.
+_JOURNAL_RECORD_PATTERN = re.compile(r"([0-9a-f]{8});([AEU]);(.*)")
 
+# The pattern of an edit record written by older versions of the program (the task
+# number and the task line, without a checksum).
+_OLD_JOURNAL_RECORD_PATTERN = re.compile(r"\d+;.*")
 
-def get_user_list(user):
-    """
-    This function generates a list of all tasks assigned to a user.
 
-    The list retains the corresponding task numbers from the "master_task_list".
 
-    The logic contained in the below for-loop ensures that the index of each task in the
-    "user_task_list" and the index of the corresponding task number in "task_numbers" are
-    the same index.
+
+def format_journal_record(record_type, key, value):
     """
+    This function converts a change into a single record of the journal (see
+    TaskStore), ending with a new line character.
 
-    # Initialise a list to store the user's tasks.
-    user_task_list = []
-    # Initialise a list to store the corresponding task numbers of the user's tasks.
-    task_numbers = []
+    Parameters:
 
-    # Iterate through the "master_task_list".
-    for pos, task in enumerate(master_task_list):
+        "record_type" =     'A' for an added task, 'E' for an edited task, or 'U' for a
+                            registered user
 
-        # If a task belongs to the user:
-        if task["username"] == user:
-            # Append the task item to the "user_task_list".
-            user_task_list.append(task)
-            # Append the task number to the "task_numbers" list.
-            task_numbers.append(pos+1)
+        "key" =             the task number of the task, or the username of the user
 
-    return user_task_list, task_numbers
+        "value" =           the task line of the task (in the format of "tasks.txt"), or
+                            the password of the user
 
+    A "ValueError" is raised if the record could not be read back as it was written:
+    if the key or value contains a new line character, the key (or a password) contains
+    a ';', or the task line does not have the fields of a task.
+    """
 
+    key = str(key)
 
+    if any(character in key + value for character in "\r\n") or ';' in key:
+        raise ValueError(f"journal records may not contain new lines, or ';' in their key: {key!r}")
+    if value.count(';') not in ([0] if record_type == 'U' else [5, 6]):
+        raise ValueError(f"not a valid value for a '{record_type}' journal record: {value!r}")
 
-def display_task_list(mode, list_to_display, corresponding_numbers):
-    """
-    This function displays a given list of tasks in a readable format.
+    record = f"{record_type};{key};{value}"
+    checksum = zlib.crc32(record.encode("utf-8"))
 
-    The function is called within the view_all() and view_mine() functions.
+    return f"{checksum:08x};{record}\n"
 
-    Parameters:
 
-        "mode" =                    the function calling display_task_list():
-                                        - "va" = view_all()
-                                        - "vm" = view_mine()
 
-        "list_to_display" =         the list of tasks to be displayed
 
-        "corresponding_numbers" =   the list of task numbers corresponding to the tasks
-                                    within the "list_to_display"
+def parse_journal_record(record):
     """
+    This function converts a single record of the journal (as bytes, without its new
+    line character) back into a tuple of "record_type", "key" and "value" (see
+    format_journal_record()).
 
+    It returns None if the record is damaged, i.e. its checksum does not match.
+    """
 
-    """ -------------------- Mode "va" - VIEW ALL TASKS. ---------------------------- """
+    try:
+        record = record.decode("utf-8").rstrip("\r")
+    except UnicodeDecodeError:
+        return None
 
-    # The "list_to_display" takes the "master_task_list" as an argument.
-    # The "corresponding_numbers" are sourced by enumerating "master_task_list".
+    match = _JOURNAL_RECORD_PATTERN.fullmatch(record)
 
-    if mode == "va":
+    if match is not None:
+        checksum, record_type, contents = match.groups()
+        if int(checksum, 16) != zlib.crc32(f"{record_type};{contents}".encode("utf-8")):
+            return None
 
-        # Iterate through each task in the "list_to_display" ("master_task_list").
-        for task_num, task in enumerate(list_to_display, 1):
+    # A record written by older versions of the program is an edit record.
+    elif _OLD_JOURNAL_RECORD_PATTERN.fullmatch(record) is not None:
+        record_type, contents = 'E', record
 
-            # Display the task and corresponding task number.
-            display_task(task_num, task)
+    else:
+        return None
 
+    if ';' not in contents:
+        return None
 
-        """ ------------------ Mode "vm" - VIEW MY TASKS. --------------------------- """
+    key, value = contents.split(';', 1)
 
-        # The "list_to_display" takes the "user_task_list" as an argument.
-        # The "corresponding_numbers" list receives the "task_numbers" list which contains
-        # only the corresponding task numbers for the "user_task_list".
-        # (The "task_numbers" list is generated by the get_user_list() function called
-        # by the view_mine() function.)
-        
-    elif mode == "vm":
-    
-        # Declare a temporary dictionary to link task numbers as keys and tasks as items.
-        temp_dictionary = {}
-    
-        # For each task in the "user_task_list":
-        for pos, task in enumerate(list_to_display):
-            # Store the task item as the value, and the corresponding task number as the key.
-            temp_dictionary[f"{corresponding_numbers[pos]}"] = task
+    # The key of a task record is its task number.
+    if record_type != 'U':
+        if not key.isdigit():
+            return None
+        key = int(key)
 
-        # Display each task along with its corresponding task number.
-        for task_number, task in temp_dictionary.items():
-            display_task(task_number, task)
+    return record_type, key, value
 
 
 
 
-def display_task(task_number, task_to_display):
+class TaskFileIndex:
     """
-    This function displays a single task in a readable format.
+    This class is an index of the position of each task line within the "tasks.txt"
+    file.
 
-    The function is called within the display_task_list() function to display each task
-    in a given list.
+    The index is built with a single scan of the memory-mapped file, and stores the
+    start and end byte offset of every non-empty line. Any task line, or any range of
+    task lines, can then be read straight from the file by its position, without reading
+    or parsing the rest of the file.
 
-    Each "task_to_display" is printed with the corresponding "task_number".
+    The index keeps "tasks.txt" open for reading until close() is called.
+
+    An index saved with to_snapshot() can be passed as "snapshot" if the start of the
+    file has not changed since it was saved. Only the part of the file after the saved
+    part is then scanned.
     """
 
-    """ ------------ Display a divider before the task for readability. ------------- """
-    print("-"*40)
+    # A task line is any line which is not empty (a "\r" before the "\n" is ignored).
+    _task_line_pattern = re.compile(rb"[^\r\n][^\n]*")
 
+    def __init__(self, file_name, snapshot=None):
 
-    """ -------------- Generate a string containing the task details. --------------- """
+        self.file_name = file_name
 
-    # Task title.
-    task_details = f"Task {task_number}: \t\t {task_to_display["title"]}\n"
+        # The start and end byte offsets of each task line.
+        self._starts = array('q')
+        self._ends = array('q')
 
-    # Assigned person.
-    task_details += f"Assigned to: \t\t {task_to_display["username"]}\n"
+        # The number of new line characters in the file.
+        self.num_newlines = 0
 
-    # Date assigned.
-    task_details += f"Date assigned: \t\t {task_to_display["assigned_date"].strftime(DATETIME_STRING_FORMAT)}\n"
+        # The position in the file from which task lines are found, and from which new
+        # line characters are counted.
+        scan_start = newlines_start = 0
 
-    # Due date.
-    task_details += f"Due Date: \t\t {task_to_display["due_date"].strftime(DATETIME_STRING_FORMAT)}\n"
+        # Start from the saved index, if there is one.
+        if snapshot is not None:
+            newlines_start, starts, ends, self.num_newlines, ends_with_newline = snapshot
+            self._starts.frombytes(starts)
+            self._ends.frombytes(ends)
+            scan_start = newlines_start
 
-    # Updated date - may not be present for all tasks.
-    if "updated_date" in task_to_display.keys():
-        task_details += f"Last updated: \t\t {task_to_display["updated_date"]}\n"
-    else:
-        pass
+            # If the saved part did not end with a new line, its last line may continue
+            # into the rest of the file, so it is found again.
+            if not ends_with_newline and self._starts and self._ends[-1] == newlines_start:
+                scan_start = self._starts.pop()
+                self._ends.pop()
 
-    # Current status.
-    if task_to_display["completed"] == True:
-        task_details += "Current status: \t Completed\n"
-    elif task_to_display["completed"] == False:
-        task_details += "Current status: \t Incomplete\n"
+        self._file = open(file_name, 'rb')
+        self.size = os.fstat(self._file.fileno()).st_size
 
-    # Task description.
-    task_details += f"Task Description: \n {task_to_display["description"]}"
+        # An empty file cannot be memory-mapped, and contains no tasks.
+        if not self.size:
+            self.ends_with_newline = True
+            self.blank_lines = 0
+            return
 
+        with mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
 
-    """ ----------------------- Display the task details. --------------------------- """
-    
-    print(task_details)
+            # Record the offsets of every task line in a single scan of the file.
+            for match in self._task_line_pattern.finditer(mapped_file, scan_start):
+                self._starts.append(match.start())
+                self._ends.append(match.end())
 
+            # Count the new line characters, one block of the file at a time.
+            for block_start in range(newlines_start, self.size, 1 << 20):
+                self.num_newlines += mapped_file[block_start:block_start + (1 << 20)].count(b"\n")
 
-    """ ------------ Display a divider after the task for readability. -------------- """
-    print("-"*40)
+            self.ends_with_newline = mapped_file[self.size - 1] == ord("\n")
 
+        # Count the empty lines (other than the final new line) in the file.
+        self.blank_lines = self.num_newlines + 1 - len(self._starts) - self.ends_with_newline
 
+    def to_snapshot(self):
+        """
+        This method returns a copy of the index as a tuple of numbers and bytes, which
+        can be saved with marshal and passed back to a new TaskFileIndex as "snapshot".
+        """
 
+        return (self.size, self._starts.tobytes(), self._ends.tobytes(), self.num_newlines,
+                self.ends_with_newline)
 
-def edit_task(full_list, display_list, task_numbers):
-    """
-    This function allows the user to edit the tasks that are assigned to them if desired.
-    The user may select "-1" from within the Edit Task Menu to return to the Main Menu.
+    def __len__(self):
+        return len(self._starts)
 
-    When the user chooses to edit a task, they can choose to:
-        - mark the task as complete,
-        - amend the task (e.g. update assigned person, update due date).
-    """
+    def __getitem__(self, index):
 
-    # Allow the user to edit tasks until they choose to exit.
-    while True:
+        # A slice of lines is read from the file in one go.
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            return self.read_lines(start, stop)[::step]
 
-        # Print a divider for ease-of-reading.
-        print("-"*100)
+        if index < 0:
+            index += len(self)
 
+        self._file.seek(self._starts[index])
+        line = self._file.read(self._ends[index] - self._starts[index])
+        return line.decode("utf-8").rstrip("\r")
 
-        """ ------------- Ask the user if they wish to edit a task. ----------------- """
+    def __iter__(self):
+        # Read the lines in blocks, rather than one at a time.
+        for block_start in range(0, len(self), 4096):
+            yield from self.read_lines(block_start, block_start + 4096)
 
-        # Until the user enters their choice, "awaiting_choice" remains True.
-        awaiting_choice = True
-        while awaiting_choice:
+    def read_lines(self, start, stop):
+        """
+        This method returns the task lines from position "start" up to (but not
+        including) position "stop", reading them from the file in a single read.
+        """
 
-            # Request user input of choice to edit a task or to exit.
-            continue_choice = input("Would you like to edit a task? (Enter 'y' or 'n'):\n\n").lower()
+        stop = min(stop, len(self))
+        if start >= stop:
+            return []
 
-            # If the user selects a valid option, break while-loop.
-            if continue_choice == 'y' or continue_choice == 'n':
-                awaiting_choice = False
-                break
+        # Read the part of the file containing all of the requested lines.
+        first_offset = self._starts[start]
+        self._file.seek(first_offset)
+        data = self._file.read(self._ends[stop - 1] - first_offset)
 
-            # If the user does not select a valid option, show an error message.
-            print("\n\t** That choice is not a recognised option. **\n")
+        # Split the data into the individual lines.
+        return [
+            data[line_start - first_offset:line_end - first_offset].decode("utf-8").rstrip("\r")
+            for line_start, line_end in zip(self._starts[start:stop], self._ends[start:stop])
+        ]
 
+    def close(self):
+        self._file.close()
 
-        """ --------------- If user does not wish to edit tasks. -------------------- """
 
-        if continue_choice == 'n':
-            # Return from the edit_task() function to the Main Menu.
-            return
-        
 
-        """ ------------------ If user chooses to edit tasks. ----------------------- """
 
-        # Only incomplete tasks within the user's task list may be edited by the user.
+class LazyTaskList:
+    """
+    This class is a list of tasks which only parses a task from its raw "tasks.txt" line
+    when the task is first accessed.
+
+    It is used as the "master_task_list" when the task store is loaded in lazy mode, so
+    that a large "tasks.txt" file can be loaded without splitting every line and parsing
+    every date at startup. Once a task has been parsed, the same Task is
+    returned on every later access, so changes made to the task are kept.
+
+    The raw lines are given as a list of lines, or as a TaskFileIndex which reads each
+    line from "tasks.txt" only when it is needed.
+    """
+
+    def __init__(self, task_lines):
+
+        # The raw "tasks.txt" lines. New tasks added to the list have no raw line.
+        self._lines = task_lines
+
+        # Raw lines which replace the original lines (e.g. edits from the journal).
+        self._replaced_lines = {}
+
+        # The parsed tasks. Tasks which have not been accessed are None.
+        self._tasks = [None] * len(task_lines)
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def __getitem__(self, index):
+
+        # Slices return a plain list of the selected tasks.
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            # Read the raw lines of a continuous range of tasks together.
+            if step == 1:
+                self._parse_range(start, stop)
+            return [self[pos] for pos in range(start, stop, step)]
+
+        if index < 0:
+            index += len(self)
+
+        task = self._tasks[index]
+
+        # Parse the task the first time it is accessed.
+        if task is None:
+            task = parse_task_line(self._raw_line(index))
+            self._tasks[index] = task
+
+        return task
+
+    def __setitem__(self, index, task):
+        self._tasks[index] = task
+
+    def __iter__(self):
+        for pos in range(len(self)):
+            yield self[pos]
+
+    def _raw_line(self, index):
+        """
+        This method returns the raw line of the task at position "index".
+        """
+
+        line = self._replaced_lines.get(index)
+        return line if line is not None else self._lines[index]
+
+    def _parse_range(self, start, stop):
+        """
+        This method parses any tasks from position "start" up to (but not including)
+        position "stop" which have not been accessed yet.
+        """
+
+        # Only tasks with a raw line may still need to be parsed.
+        stop = min(stop, len(self._lines))
+        if None not in self._tasks[start:stop]:
+            return
+
+        # Read all of the raw lines in the range together.
+        for pos, line in enumerate(self._lines[start:stop], start):
+            if self._tasks[pos] is None:
+                self._tasks[pos] = parse_task_line(self._replaced_lines.get(pos, line))
+
+    def append(self, task):
+        self._tasks.append(task)
+
+    def extend(self, tasks):
+        self._tasks.extend(tasks)
+
+    def index(self, task):
+        for pos, each_task in enumerate(self):
+            if each_task == task:
+                return pos
+        raise ValueError("task is not in list")
+
+    def usernames(self):
+        """
+        This method yields the username of each task, without parsing the tasks that
+        have not been accessed yet.
+        """
+
+        for pos, line in enumerate(self._lines):
+            task = self._tasks[pos]
+            if task is not None:
+                yield task.username
+            else:
+                yield self._replaced_lines.get(pos, line).split(';', 1)[0]
+
+        # New tasks have always been parsed.
+        for task in self._tasks[len(self._lines):]:
+            yield task.username
+
+    def summaries(self):
+        """
+        This method yields the username, due date and completion status of each task,
+        without storing the tasks that have not been accessed yet.
+        """
+
+        for pos, line in enumerate(self._lines):
+            task = self._tasks[pos]
+            if task is not None:
+                yield task.username, task.due_date, task.completed
+            else:
+                task_components = self._replaced_lines.get(pos, line).split(';')
+                yield task_components[0], parse_date(task_components[4]), task_components[5] == "Yes"
+
+        # New tasks have always been parsed.
+        for task in self._tasks[len(self._lines):]:
+            yield task.username, task.due_date, task.completed
+
+    def texts(self):
+        """
+        This method yields the title and description of each task, without storing the
+        tasks that have not been accessed yet.
+        """
+
+        for pos, line in enumerate(self._lines):
+            task = self._tasks[pos]
+            if task is not None:
+                yield task.title, task.description
+            else:
+                task_components = self._replaced_lines.get(pos, line).split(';', 3)
+                yield task_components[1], task_components[2]
+
+        # New tasks have always been parsed.
+        for task in self._tasks[len(self._lines):]:
+            yield task.title, task.description
+
+    def replace_line(self, index, task_line):
+        """
+        This method replaces the raw line of a task. The task is parsed from the new line
+        when it is next accessed.
+        """
+
+        self._replaced_lines[index] = task_line
+        self._tasks[index] = None
+
+    def replace_source(self, task_lines):
+        """
+        This method replaces all of the raw lines, e.g. once "tasks.txt" has been
+        rewritten. The new lines must contain the same tasks in the same order.
+        """
+
+        self._lines = task_lines
+        self._replaced_lines = {}
+
+    def task_lines(self):
+        """
+        This method yields each task as a line in the format of the "tasks.txt" file.
+
+        Tasks which have not been accessed are returned as their raw line.
+        """
+
+        for pos, line in enumerate(self._lines):
+            task = self._tasks[pos]
+            yield format_task_line(task) if task is not None else self._replaced_lines.get(pos, line)
+
+        # New tasks have always been parsed.
+        for task in self._tasks[len(self._lines):]:
+            yield format_task_line(task)
+
+
+
+
+class ColumnarTaskList:
+    """
+    This class is a list of tasks which stores each task field in its own packed column,
+    rather than storing a Task for every task.
+
+    It is used as the "master_task_list" when the task store is loaded in columnar mode,
+    for very large numbers of tasks:
+
+        - usernames are stored as small user codes, numbered in order of registration
+          (the order of "username_password"), with any other usernames numbered after
+          them as they are found,
+        - the assigned, due and updated dates are stored as day ordinals (see
+          date.toordinal()) in arrays of integers,
+        - the completion status of every task is stored as a single bit,
+        - the titles and descriptions are stored one after another in a single UTF-8
+          text pool.
+
+    A Task is built from the columns each time a task is accessed, so changes made to
+    that Task are only kept once it is stored back into the list (e.g.
+    "task_list[pos] = task"). Reading a single field of every task (e.g. to count the
+    tasks of each user) only scans the packed column of that field.
+    """
+
+    def __init__(self, usernames=()):
+
+        # The username of each user code, and the user code of each username.
+        self._usernames = []
+        self._user_codes = {}
+        for username in usernames:
+            self._user_code(username)
+
+        # The user code and the assigned, due and updated day ordinals of each task. An
+        # updated ordinal of 0 means that the task has never been updated.
+        self._user_ids = array('i')
+        self._assigned = array('i')
+        self._due = array('i')
+        self._updated = array('i')
+
+        # One bit for each task, set if the task is complete.
+        self._completed = bytearray()
+
+        # The start of each task's text within the text pool, and the number of bytes of
+        # its title and of its description.
+        self._text_pool = bytearray()
+        self._text_starts = array('q')
+        self._title_lengths = array('i')
+        self._description_lengths = array('i')
+
+    def __len__(self):
+        return len(self._user_ids)
+
+    def __getitem__(self, index):
+
+        # Slices return a plain list of the selected tasks.
+        if isinstance(index, slice):
+            return [self[pos] for pos in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+
+        # Find the title and description within the text pool.
+        title_start = self._text_starts[index]
+        description_start = title_start + self._title_lengths[index]
+        description_end = description_start + self._description_lengths[index]
+
+        updated = self._updated[index]
+
+        return Task(
+            self._usernames[self._user_ids[index]],
+            self._text_pool[title_start:description_start].decode("utf-8"),
+            self._text_pool[description_start:description_end].decode("utf-8"),
+            datetime.fromordinal(self._assigned[index]),
+            datetime.fromordinal(self._due[index]),
+            self._is_completed(index),
+            date.fromordinal(updated).strftime(DATETIME_STRING_FORMAT) if updated else None,
+        )
+
+    def __setitem__(self, index, task):
+
+        if index < 0:
+            index += len(self)
+
+        self._user_ids[index] = self._user_code(task.username)
+        self._assigned[index] = task.assigned_date.toordinal()
+        self._due[index] = task.due_date.toordinal()
+        self._updated[index] = parse_date(task.updated_date).toordinal() if task.updated_date else 0
+
+        if task.completed:
+            self._completed[index >> 3] |= 1 << (index & 7)
+        else:
+            self._completed[index >> 3] &= ~(1 << (index & 7))
+
+        # The text is only added to the pool again if it has changed. (The old text is
+        # left unused in the pool.)
+        title_start = self._text_starts[index]
+        description_start = title_start + self._title_lengths[index]
+        description_end = description_start + self._description_lengths[index]
+        if (self._text_pool[title_start:description_start] != task.title.encode("utf-8")
+                or self._text_pool[description_start:description_end] != task.description.encode("utf-8")):
+            self._text_starts[index], self._title_lengths[index], self._description_lengths[index] = \
+                self._add_text(task.title, task.description)
+
+    def __iter__(self):
+        for pos in range(len(self)):
+            yield self[pos]
+
+    def _user_code(self, username):
+        """
+        This method returns the user code of "username", numbering a new username with
+        the next unused code.
+        """
+
+        code = self._user_codes.get(username)
+        if code is None:
+            code = len(self._usernames)
+            self._user_codes[username] = code
+            self._usernames.append(username)
+        return code
+
+    def _is_completed(self, index):
+        return bool(self._completed[index >> 3] >> (index & 7) & 1)
+
+    def _add_text(self, title, description):
+        """
+        This method adds the title and description of a task to the end of the text pool,
+        and returns their start and their lengths in bytes.
+        """
+
+        title = title.encode("utf-8")
+        description = description.encode("utf-8")
+
+        text_start = len(self._text_pool)
+        self._text_pool += title
+        self._text_pool += description
+
+        return text_start, len(title), len(description)
+
+    def append(self, task):
+        self._append_fields(
+            task.username, task.title, task.description,
+            task.assigned_date.toordinal(), task.due_date.toordinal(), task.completed,
+            parse_date(task.updated_date).toordinal() if task.updated_date else 0,
+        )
+
+    def extend(self, tasks):
+        for task in tasks:
+            self.append(task)
+
+    def append_line(self, task_line):
+        """
+        This method adds a task from its line in the "tasks.txt" file, without creating
+        a Task.
+        """
+
+        task_components = task_line.split(';')
+
+        self._append_fields(
+            task_components[0], task_components[1], task_components[2],
+            parse_date(task_components[3]).toordinal(),
+            parse_date(task_components[4]).toordinal(),
+            task_components[5] == "Yes",
+            parse_date(task_components[6]).toordinal() if len(task_components) >= 7 else 0,
+        )
+
+    def _append_fields(self, username, title, description, assigned_ordinal, due_ordinal,
+                       completed, updated_ordinal):
+
+        index = len(self)
+
+        self._user_ids.append(self._user_code(username))
+        self._assigned.append(assigned_ordinal)
+        self._due.append(due_ordinal)
+        self._updated.append(updated_ordinal)
+
+        # Start a new byte of the completion bitmap every eight tasks.
+        if not index & 7:
+            self._completed.append(0)
+        if completed:
+            self._completed[index >> 3] |= 1 << (index & 7)
+
+        text_start, title_length, description_length = self._add_text(title, description)
+        self._text_starts.append(text_start)
+        self._title_lengths.append(title_length)
+        self._description_lengths.append(description_length)
+
+    def index(self, task):
+        for pos, each_task in enumerate(self):
+            if each_task == task:
+                return pos
+        raise ValueError("task is not in list")
+
+    def usernames(self):
+        """
+        This method yields the username of each task, from the packed user codes.
+        """
+
+        usernames = self._usernames
+        for code in self._user_ids:
+            yield usernames[code]
+
+    def summaries(self):
+        """
+        This method yields the username, due date and completion status of each task,
+        from the packed columns.
+        """
+
+        usernames, completed_bits = self._usernames, self._completed
+        for pos, (code, due_ordinal) in enumerate(zip(self._user_ids, self._due)):
+            yield (usernames[code], datetime.fromordinal(due_ordinal),
+                   bool(completed_bits[pos >> 3] >> (pos & 7) & 1))
+
+    def texts(self):
+        """
+        This method yields the title and description of each task, from the text pool.
+        """
+
+        text_pool = self._text_pool
+        for text_start, title_length, description_length in zip(
+                self._text_starts, self._title_lengths, self._description_lengths):
+            description_start = text_start + title_length
+            yield (text_pool[text_start:description_start].decode("utf-8"),
+                   text_pool[description_start:description_start + description_length].decode("utf-8"))
+
+    def summary_counts(self):
+        """
+        This method yields each combination of username, due date and completion status
+        found among the tasks, with the number of tasks which have that combination.
+
+        The tasks are grouped with a single scan over the packed user code, due date and
+        completion columns.
+        """
+
+        group_counts = {}
+
+        completed_bits = self._completed
+        for pos, (code, due_ordinal) in enumerate(zip(self._user_ids, self._due)):
+            key = (code, due_ordinal, completed_bits[pos >> 3] >> (pos & 7) & 1)
+            group_counts[key] = group_counts.get(key, 0) + 1
+
+        for (code, due_ordinal, completed), count in group_counts.items():
+            yield self._usernames[code], datetime.fromordinal(due_ordinal), bool(completed), count
+
+    def columns(self):
+        """
+        This method returns the username of each user code, and the packed user code,
+        due date and completion columns (e.g. to be read as NumPy arrays).
+        """
+
+        return self._usernames, self._user_ids, self._due, self._completed
+
+    def to_snapshot(self):
+        """
+        This method returns a copy of the packed columns as a tuple of strings and bytes,
+        which can be saved with marshal (see from_snapshot()).
+        """
+
+        return (
+            self._usernames, self._user_ids.tobytes(), self._assigned.tobytes(),
+            self._due.tobytes(), self._updated.tobytes(), bytes(self._completed),
+            bytes(self._text_pool), self._text_starts.tobytes(), self._title_lengths.tobytes(),
+            self._description_lengths.tobytes(),
+        )
+
+    @classmethod
+    def from_snapshot(cls, snapshot, usernames=()):
+        """
+        This method returns a ColumnarTaskList with the packed columns saved by
+        to_snapshot().
+
+        The registered "usernames" must have the first user codes, in order of
+        registration. It returns None if the saved user codes are numbered in a
+        different order.
+        """
+
+        (saved_usernames, user_ids, assigned, due, updated, completed, text_pool, text_starts,
+         title_lengths, description_lengths) = snapshot
+
+        usernames = list(usernames)
+        num_shared = min(len(usernames), len(saved_usernames))
+        if usernames[:num_shared] != saved_usernames[:num_shared]:
+            return None
+
+        # Number any users registered since the snapshot was saved after the saved users.
+        task_list = cls(saved_usernames + usernames[num_shared:])
+
+        task_list._user_ids.frombytes(user_ids)
+        task_list._assigned.frombytes(assigned)
+        task_list._due.frombytes(due)
+        task_list._updated.frombytes(updated)
+        task_list._completed = bytearray(completed)
+        task_list._text_pool = bytearray(text_pool)
+        task_list._text_starts.frombytes(text_starts)
+        task_list._title_lengths.frombytes(title_lengths)
+        task_list._description_lengths.frombytes(description_lengths)
+
+        return task_list
+
+    def count_occurrences(self, key, condition):
+        """
+        This method counts the tasks whose "key" field is equal to "condition" (see
+        count_occurrences()). Usernames, dates and completion statuses are counted from
+        their packed columns.
+        """
+
+        if key == "username":
+            code = self._user_codes.get(condition)
+            return self._user_ids.count(code) if code is not None else 0
+
+        if key == "completed":
+            num_completed = int.from_bytes(self._completed, "little").bit_count()
+            return num_completed if condition else len(self) - num_completed
+
+        if key in ("assigned_date", "due_date") and isinstance(condition, datetime):
+            column = self._assigned if key == "assigned_date" else self._due
+            if condition != datetime.fromordinal(condition.toordinal()):
+                return 0
+            return column.count(condition.toordinal())
+
+        # Any other field is compared one task at a time.
+        return sum(1 for task in self if getattr(task, key) == condition)
+
+
+
+
+
+
+
+class TaskSelection:
+    """
+    This class is a read-only list of the tasks with the given task numbers.
+
+    Each task is only read from the "task_list" when it is accessed, so a long selection
+    (e.g. all of a user's tasks) can be displayed one page at a time without reading
+    every task in it first.
+    """
+
+    def __init__(self, task_list, task_numbers):
+
+        self._task_list = task_list
+        self.task_numbers = task_numbers
+
+    def __len__(self):
+        return len(self.task_numbers)
+
+    def __getitem__(self, index):
+
+        # Slices return a plain list of the selected tasks.
+        if isinstance(index, slice):
+            return [self._task_list[number - 1] for number in self.task_numbers[index]]
+
+        return self._task_list[self.task_numbers[index] - 1]
+
+    def __iter__(self):
+        for number in self.task_numbers:
+            yield self._task_list[number - 1]
+
+
+
+
+
+
+
+# ---------------------------------- Defining reports. ----------------------------------
+
+def percentage(part, whole):
+    """
+    This function returns "part" as a percentage of "whole", rounded to two decimal
+    places. If "whole" is zero, it returns 0 to avoid zero division errors.
+    """
+
+    if not whole:
+        return 0
+
+    return round((part / whole)*100, 2)
+
+
+
+
+# The ranges of the aging histogram: the number of days that incomplete tasks are
+# overdue by. The last range has no upper limit.
+AGING_RANGES = ((0, 7), (8, 30), (31, 90), (91, None))
+
+
+
+
+def aging_range(days_overdue):
+    """
+    This function returns the position within "AGING_RANGES" of the range containing
+    "days_overdue".
+    """
+
+    for pos, (lowest, highest) in enumerate(AGING_RANGES):
+        if highest is None or days_overdue <= highest:
+            return pos
+
+
+
+
+def aging_label(pos):
+    """
+    This function returns the label of the range at position "pos" within
+    "AGING_RANGES" (e.g. "8-30 days" or "90+ days").
+    """
+
+    lowest, highest = AGING_RANGES[pos]
+
+    if highest is None:
+        return f"{lowest - 1}+ days"
+
+    return f"{lowest}-{highest} days"
+
+
+
+
+class UserReport:
+    """
+    This class stores the task statistics for a single user, for the User Overview.
+    """
+
+    def __init__(self, username):
+
+        self.username = username
+
+        # The number of tasks assigned to the user.
+        self.assigned = 0
+
+        # The number of the user's tasks that are complete, overdue, or both incomplete
+        # and overdue.
+        self.completed = 0
+        self.overdue = 0
+        self.incomplete_overdue = 0
+
+        # The number of the user's incomplete, overdue tasks within each of the
+        # "AGING_RANGES".
+        self.aging = [0] * len(AGING_RANGES)
+
+    @property
+    def incomplete(self):
+        return self.assigned - self.completed
+
+
+
+
+class TaskReport:
+    """
+    This class stores the task statistics for the Task Overview and User Overview
+    reports.
+
+    It is created by TaskStore.build_report(), and is used both to display the reports
+    and to write them to file.
+    """
+
+    def __init__(self, report_date, total_users):
+
+        # The date on which overdue tasks were checked.
+        self.report_date = report_date
+
+        # The number of registered users.
+        self.total_users = total_users
+
+        # The total number of tasks, and the number that are complete, overdue, or both
+        # incomplete and overdue.
+        self.total_tasks = 0
+        self.completed = 0
+        self.overdue = 0
+        self.incomplete_overdue = 0
+
+        # The number of incomplete, overdue tasks within each of the "AGING_RANGES".
+        self.aging = [0] * len(AGING_RANGES)
+
+        # A UserReport for each registered user, in order of registration.
+        self.user_reports = {}
+
+    @property
+    def incomplete(self):
+        return self.total_tasks - self.completed
+
+
+
+
+
+
+
+# -------------------------------- Defining task counters. ------------------------------
+
+class DueDateCounter:
+    """
+    This class counts tasks by due date, and keeps a running count of the tasks which
+    are overdue.
+
+    Tasks are counted by the ordinal of their due date (see date.toordinal()). Adding or
+    removing a task takes constant time. The overdue count is only recalculated when the
+    day changes: the counts for the days which have passed since it was last checked are
+    added to it.
+    """
+
+    def __init__(self):
+
+        # The number of tasks due on each day.
+        self._counts = {}
+
+        # The day (as an ordinal) on which "_overdue" was last checked, and the number of
+        # tasks that were overdue on that day.
+        self._checked_day = None
+        self._overdue = 0
+
+    def add(self, due_ordinal, amount=1):
+        """
+        This method counts "amount" tasks due on the day "due_ordinal". A negative amount
+        removes tasks.
+        """
+
+        count = self._counts.get(due_ordinal, 0) + amount
+        if count:
+            self._counts[due_ordinal] = count
+        else:
+            del self._counts[due_ordinal]
+
+        # Keep the overdue count up to date for the day it was last checked.
+        if self._checked_day is not None and due_ordinal < self._checked_day:
+            self._overdue += amount
+
+    def overdue(self, today_ordinal):
+        """
+        This method returns the number of tasks due before the day "today_ordinal".
+        """
+
+        if today_ordinal != self._checked_day:
+
+            # If a few days have passed, add the tasks due on each of those days.
+            if (self._checked_day is not None and self._checked_day < today_ordinal
+                    and today_ordinal - self._checked_day <= len(self._counts)):
+                for day in range(self._checked_day, today_ordinal):
+                    self._overdue += self._counts.get(day, 0)
+
+            # Otherwise, count the overdue tasks from scratch.
+            else:
+                self._overdue = sum(count for day, count in self._counts.items() if day < today_ordinal)
+
+            self._checked_day = today_ordinal
+
+        return self._overdue
+
+    def aging(self, today_ordinal):
+        """
+        This method returns the number of overdue tasks within each of the
+        "AGING_RANGES", counted from the number of tasks due on each day.
+        """
+
+        aging = [0] * len(AGING_RANGES)
+
+        for due_ordinal, count in self._counts.items():
+            if due_ordinal < today_ordinal:
+                aging[aging_range(today_ordinal - due_ordinal)] += count
+
+        return aging
+
+    def items(self):
+        """
+        This method yields the ordinal of each due date and the number of tasks due on
+        that date.
+        """
+
+        return self._counts.items()
+
+
+
+
+class TaskCounters:
+    """
+    This class keeps live counts of the tasks in the Task Manager, for the reports.
+
+    It counts the total number of tasks and the number of completed tasks, overall and
+    for each user. Overdue tasks are counted by due date (see DueDateCounter).
+
+    The counts are updated in constant time whenever a task is added or edited, so
+    reports can be generated without reading every task.
+    """
+
+    def __init__(self):
+
+        # The overall number of tasks, and of completed tasks.
+        self.total = 0
+        self.completed = 0
+
+        # The number of tasks, and of completed tasks, assigned to each user.
+        self.user_assigned = {}
+        self.user_completed = {}
+
+        # All tasks, and incomplete tasks, counted by due date.
+        self.due = DueDateCounter()
+        self.incomplete_due = DueDateCounter()
+
+        # All tasks, and incomplete tasks, of each user counted by due date.
+        self.user_due = {}
+        self.user_incomplete_due = {}
+
+    def add_user(self, username):
+        """
+        This method adds empty counts for a user.
+        """
+
+        if username not in self.user_assigned:
+            self.user_assigned[username] = 0
+            self.user_completed[username] = 0
+            self.user_due[username] = DueDateCounter()
+            self.user_incomplete_due[username] = DueDateCounter()
+
+    def add_task(self, username, due_date, completed, amount=1):
+        """
+        This method counts a task. A negative "amount" removes the task from the counts.
+        """
+
+        self.add_user(username)
+        due_ordinal = due_date.toordinal()
+
+        self.total += amount
+        self.user_assigned[username] += amount
+        self.due.add(due_ordinal, amount)
+        self.user_due[username].add(due_ordinal, amount)
+
+        if completed:
+            self.completed += amount
+            self.user_completed[username] += amount
+        else:
+            self.incomplete_due.add(due_ordinal, amount)
+            self.user_incomplete_due[username].add(due_ordinal, amount)
+
+    def remove_task(self, username, due_date, completed):
+        """
+        This method removes a task from the counts.
+        """
+
+        self.add_task(username, due_date, completed, amount=-1)
+
+
+
+
+
+
+
+# -------------------------------- Defining task indexes. -------------------------------
+
+def remove_sorted(sorted_list, item):
+    """
+    This function removes "item" from the sorted list "sorted_list" with a binary
+    search. Nothing is removed if "item" is not in the list.
+
+    (The item found by the binary search is checked first, so that a different item is
+    never removed instead.)
+    """
+
+    position = bisect_left(sorted_list, item)
+
+    if position < len(sorted_list) and sorted_list[position] == item:
+        del sorted_list[position]
+
+
+
+
+class DateIndex:
+    """
+    This class is an index of tasks sorted by a date (e.g. the due date).
+
+    It stores a sorted list of (day ordinal, task number) pairs (see date.toordinal()),
+    so the tasks within a range of dates can be found with a binary search, in time
+    proportional to the log of the number of tasks plus the number of tasks found.
+    """
+
+    def __init__(self, entries=()):
+
+        # The sorted (day ordinal, task number) pairs.
+        self._entries = sorted(entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, day_ordinal, task_number):
+        """
+        This method adds a task to the index.
+        """
+
+        insort(self._entries, (day_ordinal, task_number))
+
+    def add_many(self, entries):
+        """
+        This method adds many (day ordinal, task number) pairs to the index at once.
+
+        The new pairs are sorted and merged with the existing pairs in a single sort,
+        rather than being inserted one at a time.
+        """
+
+        self._entries += entries
+        self._entries.sort()
+
+    def remove(self, day_ordinal, task_number):
+        """
+        This method removes a task from the index. Nothing is removed if the task is not
+        in the index under the day "day_ordinal".
+        """
+
+        remove_sorted(self._entries, (day_ordinal, task_number))
+
+    def remove_many(self, entries):
+        """
+        This method removes many (day ordinal, task number) pairs from the index at once,
+        with a single pass over the index.
+        """
+
+        removed_entries = set(entries)
+        self._entries = [entry for entry in self._entries if entry not in removed_entries]
+
+    def _position(self, day_ordinal):
+        # Task numbers start at 1, so (day, 0) comes before every task on that day.
+        return bisect_left(self._entries, (day_ordinal, 0))
+
+    def task_numbers(self, first_ordinal=None, last_ordinal=None):
+        """
+        This method returns the task numbers of the tasks from the day "first_ordinal"
+        up to and including the day "last_ordinal", in order of date. Either limit may
+        be None to leave that end of the range open.
+        """
+
+        start = self._position(first_ordinal) if first_ordinal is not None else 0
+        stop = self._position(last_ordinal + 1) if last_ordinal is not None else len(self._entries)
+
+        return [task_number for day_ordinal, task_number in self._entries[start:stop]]
+
+    def count_before(self, day_ordinal):
+        """
+        This method returns the number of tasks before the day "day_ordinal".
+        """
+
+        return self._position(day_ordinal)
+
+
+
+
+
+
+
+class SearchIndex:
+    """
+    This class is an inverted index of the words in the task titles and descriptions,
+    for searching the tasks by keyword.
+
+    It links each word (in lower case) to the sorted task numbers of the tasks containing
+    that word, so a search only reads the task numbers of the words searched for. The
+    words are also kept in alphabetical order, so that all words starting with a prefix
+    can be found with a binary search.
+
+    The index can be saved to and loaded from a file (see save() and load()).
+    """
+
+    # A word is any run of letters, digits and underscores.
+    _word_pattern = re.compile(r"\w+")
+
+    # The version of the layout of saved index files.
+    FILE_VERSION = 1
+
+    def __init__(self):
+
+        # The task numbers of the tasks containing each word, as arrays of integers.
+        self._postings = {}
+
+        # All of the words in the index, in alphabetical order.
+        self._sorted_words = []
+
+        # The number of tasks which have been indexed.
+        self.num_tasks = 0
+
+    @classmethod
+    def words(cls, text):
+        """
+        This method returns the set of words in "text", in lower case.
+        """
+
+        return set(cls._word_pattern.findall(text.lower()))
+
+    def add_task(self, task_number, title, description, keep_sorted=True):
+        """
+        This method adds the words of a task's "title" and "description" to the index.
+
+        Tasks must be added in order of task number. If "keep_sorted" is False, the
+        alphabetical list of words is not updated (see sort_words()).
+        """
+
+        postings = self._postings
+
+        for word in self.words(title + " " + description):
+            task_numbers = postings.get(word)
+            if task_numbers is None:
+                task_numbers = postings[word] = array('i')
+                if keep_sorted:
+                    insort(self._sorted_words, word)
+            task_numbers.append(task_number)
+
+        self.num_tasks = max(self.num_tasks, task_number)
+
+    def sort_words(self):
+        """
+        This method rebuilds the alphabetical list of words, e.g. after many tasks have
+        been added with "keep_sorted" set to False.
+        """
+
+        self._sorted_words = sorted(self._postings)
+
+    def _prefix_matches(self, prefix):
+        """
+        This method returns the set of task numbers of the tasks containing any word
+        which starts with "prefix".
+        """
+
+        matches = set()
+
+        # The words starting with "prefix" are together in the alphabetical list.
+        pos = bisect_left(self._sorted_words, prefix)
+        while pos < len(self._sorted_words) and self._sorted_words[pos].startswith(prefix):
+            matches.update(self._postings[self._sorted_words[pos]])
+            pos += 1
+
+        return matches
+
+    def search(self, query):
+        """
+        This method returns the sorted task numbers of the tasks which contain every word
+        in the "query".
+
+        A word ending with '*' matches any word starting with the rest of it (e.g. "rep*"
+        matches "report" and "repair"). Searches are not case sensitive.
+        """
+
+        # The task numbers matching each word of the query.
+        matches = []
+
+        for term in query.split():
+
+            # A prefix search.
+            if term.endswith('*'):
+                words = self._word_pattern.findall(term[:-1].lower())
+                if not words:
+                    continue
+                # Any other words joined to the prefix (e.g. "to-do*") must match fully.
+                for word in words[:-1]:
+                    matches.append(self._postings.get(word, ()))
+                matches.append(self._prefix_matches(words[-1]))
+
+            else:
+                for word in self.words(term):
+                    matches.append(self._postings.get(word, ()))
+
+        if not matches:
+            return []
+
+        # Keep the task numbers found for every word, starting with the fewest matches.
+        matches.sort(key=len)
+        matching_numbers = sorted(matches[0])
+        for other_matches in matches[1:]:
+
+            # Prefix matches are sets, so each task number can be looked up directly.
+            if isinstance(other_matches, set):
+                matching_numbers = [number for number in matching_numbers if number in other_matches]
+
+            # The task numbers of a single word are sorted, so each task number is found
+            # with a binary search rather than by reading all of them.
+            else:
+                matching_numbers = [
+                    number for number in matching_numbers
+                    if (pos := bisect_left(other_matches, number)) < len(other_matches)
+                    and other_matches[pos] == number
+                ]
+
+        return matching_numbers
+
+    def save(self, file_name, tasks_file_state):
+        """
+        This method saves the index to "file_name", along with the "tasks_file_state"
+        (the size and modification time of "tasks.txt") that it matches.
+
+        The index is written to a temporary file which then replaces "file_name". (Each
+        process uses its own temporary file, as the index may be saved by more than one
+        process at once.)
+        """
+
+        index_data = {
+            "version": self.FILE_VERSION,
+            "tasks_file_state": tasks_file_state,
+            "num_tasks": self.num_tasks,
+            # The words are saved in alphabetical order, so they do not need to be sorted
+            # again when the index is loaded.
+            "postings": {word: self._postings[word].tobytes() for word in self._sorted_words},
+        }
+
+        temp_file = f"{file_name}.{os.getpid()}.tmp"
+        with open(temp_file, 'wb') as index_file:
+            marshal.dump(index_data, index_file)
+        os.replace(temp_file, file_name)
+
+    @classmethod
+    def load(cls, file_name, tasks_file_state):
+        """
+        This method loads an index saved by save().
+
+        It returns None if there is no saved index, or if the saved index does not match
+        the "tasks_file_state" (e.g. "tasks.txt" has been changed since it was saved).
+        """
+
+        try:
+            with open(file_name, 'rb') as index_file:
+                index_data = marshal.load(index_file)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+        if (not isinstance(index_data, dict) or index_data.get("version") != cls.FILE_VERSION
+                or index_data.get("tasks_file_state") != tasks_file_state):
+            return None
+
+        search_index = cls()
+        search_index.num_tasks = index_data["num_tasks"]
+        for word, task_numbers in index_data["postings"].items():
+            search_index._postings[word] = array('i', task_numbers)
+        search_index._sorted_words = list(search_index._postings)
+
+        return search_index
+
+
+
+
+
+
+
+# -------------------------------- Defining the task store. -----------------------------
+
+class FileLock:
+    """
+    This class is an advisory lock on a lock file (e.g. "tasks.txt.lock"). It stops more
+    than one process from changing the stored tasks and users at the same time.
+
+    The lock is taken with a "with" statement. A process which already holds the lock
+    can take it again (e.g. in a method called by another method which holds the lock).
+    The lock is only released when the outermost "with" statement ends.
+
+    The lock uses fcntl.flock(), so it only works on systems which provide fcntl (e.g.
+    Linux and macOS). Elsewhere, or if "file_name" is None, the lock does nothing.
+    """
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+
+        # The open lock file, and the number of "with" statements holding the lock.
+        self._file = None
+        self._depth = 0
+
+    def __enter__(self):
+
+        if self._depth == 0 and self.file_name is not None and fcntl is not None:
+            if self._file is None:
+                self._file = open(self.file_name, 'a')
+            # Wait until no other process holds the lock.
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        self._depth -= 1
+
+        if self._depth == 0 and self._file is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+        return False
+
+    def close(self):
+        """
+        This method closes the lock file.
+        """
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+
+
+class TaskStore:
+    """
+    This class stores all of the tasks and users of the Task Manager.
+
+    It owns the "master_task_list", which stores all current tasks, and the
+    "username_password" dictionary, which stores all current users. It also provides the
+    loading, task editing and reporting logic of the program.
+
+    None of the methods request input from the user or print to the console, so the
+    store can be used by batch jobs, benchmarks or services as well as by the Main Menu.
+
+    Parameters:
+
+        "tasks_file" =      the file storing all tasks (default: "tasks.txt")
+
+        "users_file" =      the file storing all users (default: "users.txt")
+
+        "lazy" =            if True, tasks are only parsed when they are first accessed
+                            (see LazyTaskList), which makes loading a large "tasks.txt"
+                            file much faster
+
+        "columnar" =        if True, tasks are stored in packed columns (see
+                            ColumnarTaskList), which uses much less memory for a very
+                            large number of tasks (ignored in lazy mode)
+
+        "numpy_reports" =   if True, reports are built with vectorised NumPy operations
+                            over all of the tasks, rather than from the live task counts
+                            (requires NumPy)
+
+        "compact_threshold" =   the number of empty lines which may be left in the
+                                "tasks.txt" file before it is compacted (see compact())
+
+        "journal_threshold" =   the number of changes which may be recorded in the
+                                journal before it is folded back into "tasks.txt" and
+                                "users.txt"
+
+        "sync_interval" =   the time (in seconds) after the journal was last synced to
+                            disk before a new record is synced. Records written within
+                            the interval are synced together, with the next record after
+                            it or by sync_journal(). (default: 0.1; 0 syncs every record)
+
+        "snapshot" =        if True, the parsed tasks and users are saved in a snapshot
+                            file ("tasks.txt.snapshot" in lazy mode, otherwise
+                            "tasks.txt.columns.snapshot" or "tasks.txt.rows.snapshot"),
+                            so that unchanged files do not need to be parsed again when
+                            they are next loaded in the same mode (default: True)
+
+    Changes are not written to "tasks.txt" or "users.txt" straight away. Each new task,
+    edited task and new user appends a single record to a write-ahead journal
+    ("tasks.txt.journal"), which is replayed over "tasks.txt" and "users.txt" whenever
+    they are loaded. Each record has a CRC-32 checksum, so a damaged record is detected.
+    If the last record was only partly written (e.g. if the computer stopped), it is
+    ignored, and removed before the next record is written. A damaged record with valid
+    records after it stops loading with a "JournalDamaged" exception, and the journal is
+    left as it is, so that none of the later records are lost. Replaying a record more
+    than once has no further effect, since each record stores the whole task (by task
+    number) or user (by username).
+
+    Once "journal_threshold" records have been written, or when the store is compacted,
+    the journal is folded back into the files: new "tasks.txt" and "users.txt" files are
+    written and synced to disk, and replace the old files, before the journal is removed.
+
+    More than one process (e.g. several copies of the program) may use the same files at
+    the same time. Only one process may change the tasks and users at a time: each
+    change (registering a user, adding, importing or editing tasks, and writing or
+    compacting the files) is made while holding an advisory lock on a lock file
+    ("tasks.txt.lock", see FileLock), after first applying any changes made by other
+    processes (see refresh() and _changing()). So each change is made to the latest
+    tasks and users, new tasks always get the next free task number, a username
+    registered by another process is rejected, and no change is lost. The other storage
+    backends keep to the same rules, with their own lock file and refresh().
+
+    Whenever "tasks.txt" or "users.txt" has to be parsed, the parsed tasks and users are
+    saved in the snapshot file, along with the size, modification time and SHA-256 hash
+    of each file. If a file has not changed when it is next loaded, it is not parsed (or
+    even read) again. If tasks have only been appended to "tasks.txt" (e.g. by another
+    program), only the appended tasks are parsed and added to the saved tasks.
+
+    Each task is identified by its task number, which is its position among the tasks
+    in "tasks.txt" (starting at 1). Task numbers never change: tasks are never removed,
+    compacting the files only removes empty lines, and new tasks always get the next
+    free task number (even when several processes add tasks). The journal, the user
+    index, the date indexes and the search index all refer to tasks by task number, and
+    a task is found from its task number straight away (see get_task()).
+
+    The TaskStore stores the tasks and users in the "tasks.txt" and "users.txt" text
+    files. All reading and writing of the stored data is done by the storage methods,
+    which another storage backend can replace (see SQLiteTaskStore in
+    sqlite_task_store.py, and BinaryTaskStore in binary_task_store.py):
+
+        - _load_tasks() and _load_users() load the tasks and users,
+        - _store_new_user(), _store_new_task(), _store_new_tasks(), _store_edited_task()
+          and _store_edited_tasks() store each change,
+        - compact() tidies up the stored data.
+    """
+
+    # The version of the layout of saved snapshot files.
+    SNAPSHOT_VERSION = 1
+
+    def __init__(self, tasks_file="tasks.txt", users_file="users.txt", lazy=False,
+                 compact_threshold=1000, journal_threshold=1000, columnar=False,
+                 numpy_reports=False, snapshot=True, sync_interval=0.1):
+
+        # The vectorised report mode can only be used if NumPy is installed.
+        if numpy_reports and numpy is None:
+            raise ImportError("NumPy is required for numpy_reports=True")
+
+        self.tasks_file = tasks_file
+        self.users_file = users_file
+        self.journal_file = tasks_file + ".journal"
+        self.lock_file = tasks_file + ".lock"
+        self.search_file = tasks_file + ".search"
+        self.snapshot = snapshot
+        self.lazy = lazy
+        self.columnar = columnar and not lazy
+
+        # Each mode saves its own snapshot, so that loading the files in one mode (e.g.
+        # by a command - see run_command()) does not replace the snapshot of another.
+        self.snapshot_file = tasks_file + (
+            ".snapshot" if self.lazy else ".columns.snapshot" if self.columnar else ".rows.snapshot"
+        )
+        self.numpy_reports = numpy_reports
+        self.compact_threshold = compact_threshold
+        self.journal_threshold = journal_threshold
+        self.sync_interval = sync_interval
+
+        # The number of records in the journal, and the number of those which are user
+        # records.
+        self._journal_records = 0
+        self._journal_user_records = 0
+
+        # The journal file, once it has been opened for writing. "_journal_synced_at" is
+        # the time it was last synced to disk, and "_journal_unsynced" is True if records
+        # have been written since then.
+        self._journal = None
+        self._journal_synced_at = 0.0
+        self._journal_unsynced = False
+
+        # The lock which is held while the stored tasks and users are changed.
+        self._file_lock = FileLock(self.lock_file)
+
+        # The size of the part of the journal which has been read and applied, or written.
+        self._journal_position = 0
+
+        # The state of "tasks.txt" and "users.txt" when they were loaded (see
+        # _files_state()). If either file has changed since then, another process has
+        # rewritten it.
+        self._loaded_files_state = None
+
+        # In lazy mode, the index of the position of each task within "tasks.txt".
+        self._task_index = None
+
+        # An index of the sorted task numbers of each user's tasks. It is built the
+        # first time it is needed (see _get_user_index()).
+        self._user_task_numbers = None
+
+        # The live task counts for the reports. They are counted the first time they are
+        # needed (see _get_counters()).
+        self._counters = None
+
+        # Indexes of the incomplete and of the completed tasks, sorted by due date. They
+        # are built the first time they are needed (see _get_status_indexes()).
+        self._status_indexes = None
+
+        # Indexes of the tasks sorted by assigned date, and of the updated tasks sorted
+        # by updated date. They are built the first time they are needed (see
+        # _get_date_indexes()).
+        self._date_indexes = None
+
+        # The search index of the words in the task titles and descriptions. It is loaded
+        # (or built) the first time it is needed (see _get_search_index()). It has changed
+        # since it was last saved if "_search_index_changed" is True.
+        self._search_index = None
+        self._search_index_changed = False
+
+        # If the journal ends with an incomplete record, the size of the journal without
+        # that record. The incomplete record is removed before the next edit is recorded.
+        self._journal_truncate_to = None
+
+        # The number of empty lines in "tasks.txt" and "users.txt". Files containing empty
+        # lines are only rewritten when they are compacted.
+        self._blank_task_lines = 0
+        self._blank_user_lines = 0
+
+        # Whether "tasks.txt" currently ends with a new line character.
+        self._tasks_end_with_newline = False
+
+        # While the files are being loaded, the snapshot of the parsed files (see
+        # load()). It has changed since it was loaded if "_snapshot_changed" is True.
+        self._snapshot = None
+        self._snapshot_changed = False
+
+        # Whether the snapshot is saved again once the files have been loaded (see load()).
+        self._saving_snapshot = snapshot
+
+        # The current, complete list of tasks.
+        self.master_task_list = []
+
+        # The current list of all users and passwords.
+        self.username_password = {}
+
+        # Read the tasks and users from file.
+        self.load()
+
+
+
+    def load(self, save_snapshot=True):
+        """
+        This method (re)loads all tasks and users from the "tasks.txt" and "users.txt"
+        files.
+
+        Loading only reads the files, and (if a file had to be parsed) writes the snapshot
+        file. (The files are only written to if they do not exist yet.)
+
+        Parameters:
+
+            "save_snapshot" =   if False, the snapshot is still used, but it is not saved
+                                again (and the new parts of the files are not hashed for
+                                it - see read_file_changes()), e.g. when the files are
+                                reloaded by refresh()
+        """
+
+        self._saving_snapshot = self.snapshot and save_snapshot
+
+        # Close the journal, which may have been removed by another process.
+        if self._journal is not None:
+            self.sync_journal()
+            self._journal.close()
+            self._journal = None
+
+        # Remember the state of the files before they are read. (If another process
+        # rewrites them while they are being read, they are loaded again by refresh().)
+        self._loaded_files_state = self._files_state()
+
+        # The user index, task counts and date indexes are rebuilt from the reloaded tasks
+        # when they are next needed.
+        self._user_task_numbers = None
+        self._counters = None
+        self._status_indexes = None
+        self._date_indexes = None
+        self._search_index = None
+        self._search_index_changed = False
+
+        # Read the snapshot of the files as they were last parsed.
+        self._snapshot = self._load_snapshot() if self.snapshot else {}
+        self._snapshot_changed = False
+
+        # Pause the cyclic garbage collector while the files are loaded. (Loading millions
+        # of tasks would otherwise start many full collections, which cannot free any of
+        # the new tasks.)
+        collector_was_enabled = gc.isenabled()
+        gc.disable()
+
+        try:
+            # The users are loaded first, so that a columnar task list can number the
+            # users in order of registration.
+            self._load_users()
+            self._load_tasks()
+
+            # Save the snapshot again if either file had to be parsed.
+            if self._saving_snapshot and self._snapshot_changed:
+                self._save_snapshot()
+
+        finally:
+            if collector_was_enabled:
+                gc.enable()
+
+        # The snapshot is not needed once the files have been loaded.
+        self._snapshot = None
+
+
+
+    def _load_snapshot(self):
+        """
+        This method reads the snapshot saved by _save_snapshot().
+
+        It returns a dictionary with a "users" entry for the "users.txt" file and a
+        "tasks" entry for the "tasks.txt" file. Each entry holds the "file_state" (see
+        read_file_changes()) of the file when it was parsed, and the parsed data. An
+        empty dictionary is returned if there is no saved snapshot.
+        """
+
+        try:
+            # (Reading the whole file first is much faster than marshal.load().)
+            with open(self.snapshot_file, 'rb') as snapshot_file:
+                snapshot = marshal.loads(snapshot_file.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return {}
+
+        if not isinstance(snapshot, dict) or snapshot.get("version") != self.SNAPSHOT_VERSION:
+            return {}
+
+        return snapshot
+
+
+
+    def _save_snapshot(self):
+        """
+        This method saves the snapshot of the parsed files to the "tasks.txt.snapshot"
+        file.
+
+        The snapshot is written to a temporary file which then replaces the snapshot file.
+        """
+
+        self._snapshot["version"] = self.SNAPSHOT_VERSION
+
+        # Each process uses its own temporary file, as the snapshot is saved without
+        # holding the lock (and so may be saved by more than one process at once).
+        temp_file = f"{self.snapshot_file}.{os.getpid()}.tmp"
+        with open(temp_file, 'wb') as snapshot_file:
+            marshal.dump(self._snapshot, snapshot_file)
+        os.replace(temp_file, self.snapshot_file)
+
+
+
+    def _load_tasks(self):
+        """
+        This method initialises the task storage.
+
+        The "tasks.txt" file stores all of the task-related information for the program.
+        It is structured similarly to a .csv file.
+
+        If the file does not exist already from a previous use of the program, a new,
+        empty "tasks.txt" file is created. An existing "tasks.txt" file can be reopened
+        by the program.
+
+        The current, complete list of tasks is stored within "master_task_list", which
+        is used by the program to display tasks, add tasks, modify tasks, and generate
+        reports on current task status.
+
+        In lazy mode, the "master_task_list" is a LazyTaskList which parses each task
+        when it is first accessed. Rather than reading the whole file, a TaskFileIndex of
+        the position of each task in "tasks.txt" is built, and each task is read from
+        the file when it is needed.
+
+        In columnar mode, the "master_task_list" is a ColumnarTaskList, and each line is
+        stored straight into its packed columns.
+
+        If the snapshot is used, the tasks saved in the snapshot (the TaskFileIndex in
+        lazy mode, the packed columns in columnar mode, otherwise the fields of each task)
+        are used if the start of "tasks.txt" has not changed since they were saved. Only
+        the tasks added to the file after them are then parsed.
+        """
+
+        # Create "tasks.txt" if it doesn't already exist.
+        if not os.path.exists(self.tasks_file):
+            with open(self.tasks_file, 'w', encoding="utf-8") as default_file:
+                pass
+
+        # Close the index of any previously loaded "tasks.txt" file.
+        if self._task_index is not None:
+            self._task_index.close()
+            self._task_index = None
+
+
+        """ ------------------- Compare the file with the snapshot. ------------------- """
+
+        # The tasks saved in the snapshot: a TaskFileIndex in lazy mode, the packed
+        # columns of a ColumnarTaskList in columnar mode, otherwise a row of fields for
+        # each task. A snapshot saved in another mode is not used.
+        snapshot_mode = "index" if self.lazy else "columns" if self.columnar else "rows"
+        saved_tasks = self._snapshot.get("tasks")
+        if saved_tasks is not None and saved_tasks["mode"] != snapshot_mode:
+            saved_tasks = None
+
+        # Find out how much of the start of "tasks.txt" is unchanged since the snapshot
+        # was saved. ("task_bytes" is None if the file has not changed at all.)
+        if self.snapshot:
+            file_state, unchanged_size, task_bytes = read_file_changes(
+                self.tasks_file, saved_tasks["file_state"] if saved_tasks is not None else None,
+                hash_file=self._saving_snapshot,
+            )
+        else:
+            file_state, unchanged_size, task_bytes = None, 0, None
+
+        # The saved tasks can only be used if the saved part of the file is unchanged.
+        if saved_tasks is not None and unchanged_size != saved_tasks["file_state"][0]:
+            saved_tasks = None
+
+
+        """ ---------------------------- Lazy mode. --------------------------------- """
+
+        # In lazy mode, index the position of each task line in "tasks.txt". Only the
+        # lines after the saved part of the file are indexed.
+        if self.lazy:
+            self._task_index = TaskFileIndex(
+                self.tasks_file, saved_tasks["index"] if saved_tasks is not None else None
+            )
+            self._tasks_end_with_newline = self._task_index.ends_with_newline
+            self._blank_task_lines = self._task_index.blank_lines
+
+            # Save the new index in the snapshot (unless the file was changed while it
+            # was being indexed).
+            if (self.snapshot and file_state != (saved_tasks and saved_tasks["file_state"])
+                    and self._task_index.size == file_state[0]):
+                self._snapshot["tasks"] = {"file_state": file_state, "mode": snapshot_mode,
+                                           "index": self._task_index.to_snapshot()}
+                self._snapshot_changed = True
+
+            # Each task is read and parsed from "tasks.txt" when it is first accessed.
+            self.master_task_list = LazyTaskList(self._task_index)
+
+            # Apply any changes recorded in the journal.
+            self._replay_journal()
+            return
+
+
+        """ ------------------------ Restore the saved tasks. ----------------------- """
+
+        # The tasks parsed from "tasks.txt" (a ColumnarTaskList in columnar mode).
+        parsed_tasks = None
+
+        if saved_tasks is not None:
+
+            # Only the data appended to the file since the snapshot was saved is parsed.
+            new_data = task_bytes[unchanged_size:] if task_bytes is not None else b""
+            new_data = new_data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+            ends_with_newline = saved_tasks["ends_with_newline"]
+
+            # If the saved part did not end with a new line, the appended data must start
+            # with one (as it does when it is written by older versions of the program).
+            if not ends_with_newline and new_data.startswith("\n"):
+                new_data = new_data[1:]
+                ends_with_newline = True
+
+            if ends_with_newline or not new_data:
+                if self.columnar:
+                    parsed_tasks = ColumnarTaskList.from_snapshot(saved_tasks["columns"], self.username_password)
+                else:
+                    parsed_tasks = tasks_from_rows(saved_tasks["rows"])
+
+            if parsed_tasks is not None:
+                self._tasks_end_with_newline = ends_with_newline
+                self._blank_task_lines = saved_tasks["blank_lines"]
+                task_data = new_data
+            else:
+                saved_tasks = None
+
+        # Otherwise, the whole of "tasks.txt" is parsed.
+        if parsed_tasks is None:
+
+            # Read the "task_data" from the "tasks.txt" file for later use in the program.
+            if task_bytes is None:
+                with open(self.tasks_file, 'r', encoding="utf-8") as task_file:
+                    task_data = task_file.read()
+            else:
+                task_data = task_bytes.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+            # An empty file counts as ending with a new line.
+            self._tasks_end_with_newline = True
+            self._blank_task_lines = 0
+
+
+        """ --------------------------- Parse the tasks. ---------------------------- """
+
+        # Store the "task_data" for all (new) tasks as a list. Remove "\n".
+        task_data = task_data.split("\n")
+
+        # If the data ends with a new line, the last item in the list is empty. (If there
+        # is no data, the file ends in the same way as before.)
+        data_ends_with_newline = task_data[-1] == ''
+        if task_data != ['']:
+            self._tasks_end_with_newline = data_ends_with_newline
+        num_lines = len(task_data)
+
+        # Remove any empty lines from the list.
+        task_data = [line for line in task_data if line != '']
+
+        # Count the empty lines (other than the final new line) left in the file. These
+        # are removed when the file is compacted.
+        self._blank_task_lines += num_lines - len(task_data) - data_ends_with_newline
+
+
+        # In columnar mode, parse every line straight into the packed columns.
+        if self.columnar:
+            if parsed_tasks is None:
+                parsed_tasks = ColumnarTaskList(self.username_password)
+            for each_task in task_data:
+                parsed_tasks.append_line(each_task)
+
+        # Otherwise, parse every line into a Task.
+        else:
+            new_tasks = [parse_task_line(each_task) for each_task in task_data]
+            if parsed_tasks is None:
+                parsed_tasks = new_tasks
+            else:
+                parsed_tasks += new_tasks
+
+        self.master_task_list = parsed_tasks
+
+
+        # Save the parsed tasks in the snapshot if the file has changed.
+        if self.snapshot and file_state != (saved_tasks and saved_tasks["file_state"]):
+
+            saved_parse = {"file_state": file_state, "mode": snapshot_mode,
+                           "ends_with_newline": self._tasks_end_with_newline,
+                           "blank_lines": self._blank_task_lines}
+
+            if self.columnar:
+                saved_parse["columns"] = parsed_tasks.to_snapshot()
+            elif saved_tasks is not None:
+                saved_parse["rows"] = saved_tasks["rows"] + tasks_to_rows(new_tasks)
+            else:
+                saved_parse["rows"] = tasks_to_rows(parsed_tasks)
+
+            self._snapshot["tasks"] = saved_parse
+            self._snapshot_changed = True
+
+        # Apply any changes recorded in the journal since "tasks.txt" was last written.
+        self._replay_journal()
+
+
+
+    def _replay_journal(self):
+        """
+        This method applies the records in the journal to the "master_task_list" and
+        the "username_password" dictionary.
+
+        Each record is a single line (see format_journal_record()). Later records for the
+        same task replace earlier ones. If the last record is incomplete or damaged (e.g.
+        if the program stopped while it was being written), it is ignored, and removed
+        before the next record is written. A "JournalDamaged" exception is raised if any
+        other record is damaged.
+        """
+
+        self._journal_records = 0
+        self._journal_user_records = 0
+        self._journal_truncate_to = None
+        self._journal_position = 0
+
+        self._read_journal()
+
+
+
+    def _read_journal(self):
+        """
+        This method reads and applies the records added to the journal since it was last
+        read (from "_journal_position" onwards).
+
+        Returns True if any records were applied.
+        """
+
+        # There is nothing to read if no changes have been recorded.
+        try:
+            with open(self.journal_file, 'rb') as journal:
+                journal.seek(self._journal_position)
+                journal_data = journal.read()
+        except FileNotFoundError:
+            return False
+
+        # The position of the next record in "journal_data".
+        position = 0
+
+        while position < len(journal_data):
+
+            # A final record without a new line character is incomplete.
+            record_end = journal_data.find(b"\n", position)
+            if record_end == -1:
+                break
+
+            journal_record = parse_journal_record(journal_data[position:record_end])
+            if journal_record is None:
+
+                # Only the last record may have been left incomplete. Any other damaged
+                # record is not removed, so that the records after it are not lost.
+                if record_end + 1 < len(journal_data):
+                    raise JournalDamaged(self.journal_file, self._journal_position + position)
+                break
+
+            self._apply_journal_record(*journal_record)
+            position = record_end + 1
+
+        self._journal_position += position
+
+        # Remove the incomplete or damaged last record before the next record is written.
+        # (Another process may still be writing it, so this is checked again while
+        # holding the lock, before anything is written.)
+        if position != len(journal_data):
+            self._journal_truncate_to = self._journal_position
+        else:
+            self._journal_truncate_to = None
+
+        return position > 0
+
+
+
+    def _apply_journal_record(self, record_type, key, value):
+        """
+        This method applies a single journal record (see parse_journal_record()).
+
+        A task record replaces the task with the same task number, or adds the task if
+        it is the next new task. Any other task record is ignored.
+
+        When records written by another process are applied (see refresh()), the user
+        index, task counts, date indexes and search index are updated if they have been
+        built.
+        """
+
+        # Register a user.
+        if record_type == 'U':
+            self.username_password[key] = value
+            if self._counters is not None:
+                self._counters.add_user(key)
+            self._journal_records += 1
+            self._journal_user_records += 1
+            return
+
+        pos = key - 1
+
+        # Add a new task.
+        if record_type == 'A' and pos == len(self.master_task_list):
+            self.master_task_list.append(parse_task_line(value))
+
+            if self._search_index is not None:
+                new_task = self.master_task_list[pos]
+                self._search_index.add_task(key, new_task.title, new_task.description)
+                self._search_index_changed = True
+
+        # Ignore any record for a task that is not in "tasks.txt" (or the journal).
+        elif pos not in range(len(self.master_task_list)):
+            return
+
+        else:
+            # Remove the old version of the task from the indexes and counts.
+            self._unindex_task(key)
+
+            # In lazy mode, a task from "tasks.txt" is parsed from its journal line when
+            # it is accessed.
+            if self.lazy and pos < len(self._task_index):
+                self.master_task_list.replace_line(pos, value)
+            else:
+                self.master_task_list[pos] = parse_task_line(value)
+
+        self._index_task(key)
+
+        self._journal_records += 1
+
+
+
+    def _index_task(self, task_number):
+        """
+        This method adds a task to the user index, task counts and date indexes, if they
+        have been built. (add_task() and edit_task() update them directly. This method is
+        used for the tasks changed by other processes.)
+        """
+
+        if self._indexes_built():
+            task = self.master_task_list[task_number - 1]
+
+            if self._user_task_numbers is not None:
+                insort(self._user_task_numbers.setdefault(task.username, []), task_number)
+            if self._counters is not None:
+                self._counters.add_task(task.username, task.due_date, task.completed)
+            for date_index, day in self._date_index_entries(task):
+                date_index.add(day, task_number)
+
+
+
+    def _unindex_task(self, task_number):
+        """
+        This method removes a task from the user index, task counts and date indexes, if
+        they have been built (see _index_task()).
+        """
+
+        if self._indexes_built():
+            task = self.master_task_list[task_number - 1]
+
+            if self._user_task_numbers is not None:
+                remove_sorted(self._user_task_numbers.get(task.username, []), task_number)
+            if self._counters is not None:
+                self._counters.remove_task(task.username, task.due_date, task.completed)
+            for date_index, day in self._date_index_entries(task):
+                date_index.remove(day, task_number)
+
+
+
+    def _indexes_built(self):
+        """
+        This method returns True if any of the user index, task counts or date indexes
+        have been built.
+        """
+
+        return (self._user_task_numbers is not None or self._counters is not None
+                or self._status_indexes is not None or self._date_indexes is not None)
+
+
+
+    def _date_index_entries(self, task):
+        """
+        This method returns a list of the date indexes (which have been built) that
+        contain the "task", each paired with the day ordinal the task is indexed by.
+        """
+
+        entries = []
+
+        if self._status_indexes is not None:
+            incomplete_index, completed_index = self._status_indexes
+            status_index = completed_index if task.completed else incomplete_index
+            entries.append((status_index, task.due_date.toordinal()))
+
+        if self._date_indexes is not None:
+            assigned_index, updated_index = self._date_indexes
+            entries.append((assigned_index, task.assigned_date.toordinal()))
+            if task.updated_date is not None:
+                entries.append((updated_index, parse_date(task.updated_date).toordinal()))
+
+        return entries
+
+
+
+    def refresh(self):
+        """
+        This method applies any changes made by other processes since the files were
+        loaded, or since refresh() was last called.
+
+        If another process has folded the journal back into "tasks.txt" and "users.txt"
+        (so either file has been rewritten), everything is loaded again. Otherwise, only
+        the records added to the end of the journal are read and applied, which takes
+        almost no time if nothing has changed.
+
+        Only the sizes and modification times of the files are checked until a reload is
+        actually needed. The files are then reloaded without saving the snapshot again, so
+        only the part of "tasks.txt" saved in the snapshot is hashed (see load()).
+
+        Returns True if anything was changed.
+        """
+
+        # Compare the size of the journal with the part which has been read first.
+        try:
+            journal_size = os.stat(self.journal_file).st_size
+        except FileNotFoundError:
+            journal_size = 0
+
+        # Load everything again if the journal has been removed or replaced (so it is
+        # shorter than the part which has been read), or the files have been rewritten.
+        if journal_size < self._journal_position or self._files_state() != self._loaded_files_state:
+            self.load(save_snapshot=False)
+            return True
+
+        # Otherwise, only read the records added since the journal was last read.
+        if journal_size > self._journal_position:
+            return self._read_journal()
+
+        return False
+
+
+
+    @contextmanager
+    def _changing(self):
+        """
+        This context manager is used around every change to the stored tasks and users.
+        It holds the lock on the lock file, and applies any changes made by other
+        processes (see refresh()) before the change is made (see TaskStore).
+        """
+
+        with self._file_lock:
+            self.refresh()
+            yield
+
+
+
+    def _files_state(self):
+        """
+        This method returns the identity (inode), size and modification time of the
+        "tasks.txt" and "users.txt" files (or None for a file that does not exist).
+        These change whenever either file is rewritten.
+        """
+
+        files_state = []
+
+        for file_name in (self.tasks_file, self.users_file):
+            try:
+                file_stat = os.stat(file_name)
+            except FileNotFoundError:
+                files_state.append(None)
+            else:
+                files_state.append((file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns))
+
+        return files_state
+
+
+
+    def _load_users(self):
+        """
+        This method initialises the user storage.
+
+        If the file does not exist already from a previous use of the program, a new
+        "users.txt" file is created containing a default admin account.
+        An existing "users.txt" file can be reopened by the program.
+
+        The "username_password" dictionary stores a current list of all users and
+        passwords.
+
+        If the snapshot is used and "users.txt" has not changed since the users were
+        saved in the snapshot, the saved users are used instead.
+        """
+
+        # If no "users.txt" file currently exists, write one with a default "admin" account.
+        if not os.path.exists(self.users_file):
+            with open(self.users_file, 'w', encoding="utf-8") as default_file:
+                default_file.write("admin;password")
+
+
+        # Use the users saved in the snapshot if "users.txt" has not changed.
+        if self.snapshot:
+            saved_users = self._snapshot.get("users")
+            file_state, unchanged_size, user_bytes = read_file_changes(
+                self.users_file, saved_users["file_state"] if saved_users is not None else None,
+                hash_file=self._saving_snapshot,
+            )
+
+            if saved_users is not None and file_state == saved_users["file_state"]:
+                self.username_password = dict(saved_users["username_password"])
+                self._blank_user_lines = saved_users["blank_lines"]
+                return
+
+            # Store "user_data" as a list containing linked usernames and passwords as strings.
+            user_data = user_bytes.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n").split("\n")
+
+        # Read a list of "user_data" from the "users.txt" file for later use within the program.
+        else:
+            with open(self.users_file, 'r', encoding="utf-8") as user_file:
+
+                # Store "user_data" as a list containing linked usernames and passwords as strings.
+                user_data = user_file.read().split("\n")
+
+        # If the file ends with a new line, the last item in the list is empty.
+        users_end_with_newline = user_data[-1] == ''
+        num_lines = len(user_data)
+
+        # Remove any empty lines from the list.
+        user_data = [user for user in user_data if user != '']
+
+        # Count the empty lines (other than the final new line) left in the file. These
+        # are removed when the file is compacted.
+        self._blank_user_lines = num_lines - len(user_data) - users_end_with_newline
+
+
+        # Initialise a "username_password" dictionary to store paired usernames and passwords.
+        self.username_password = {}
+
+        # Populate the "username_password" dictionary by iterating through the "user_data" items.
+        for each_user in user_data:
+            # Split "each_user" by ';' into "username" and "password".
+            username, password = each_user.split(';')
+            # Store the "username" and "password" as a key:value pair within "username_password".
+            self.username_password[username] = password
+
+        # Save the parsed users in the snapshot.
+        if self.snapshot:
+            self._snapshot["users"] = {"file_state": file_state, "blank_lines": self._blank_user_lines,
+                                       "username_password": dict(self.username_password)}
+            self._snapshot_changed = True
+
+
+
+    def check_password(self, username, password):
+        """
+        This method returns True if the "username" is registered and the "password"
+        matches the registered password for that user.
+        """
+
+        return username in self.username_password and self.username_password[username] == password
+
+
+
+    def register_user(self, new_username, new_password):
+        """
+        This method registers a new user to the Task Manager.
+
+        The new user is added to the "username_password" dictionary and to the
+        "users.txt" file.
+
+        A "UsernameTaken" exception is raised if the username is already registered, and
+        an "InvalidText" exception is raised if the username or password contains a ';'
+        or a new line.
+        """
+
+        # The username and password are stored as fields of "users.txt".
+        check_text("username", new_username)
+        check_text("password", new_password)
+
+        with self._changing():
+
+            # If the chosen username is already registered, raise an exception.
+            if new_username in self.username_password:
+                raise UsernameTaken(new_username)
+
+            # Add the new user to the "username_password" dictionary.
+            self.username_password[new_username] = new_password
+
+            # Add empty task counts for the new user.
+            if self._counters is not None:
+                self._counters.add_user(new_username)
+
+            # Add the new user to storage.
+            self._store_new_user(new_username, new_password)
+
+
+
+    def _store_new_user(self, new_username, new_password):
+        """
+        This method stores a newly registered user.
+
+        A single record for the new user is written to the journal.
+        """
+
+        self._write_journal_record('U', new_username, new_password)
+        self._journal_user_records += 1
+
+        self._fold_full_journal()
+
+
+
+    def _write_users_file(self):
+        """
+        This method overwrites the "users.txt" file with all users in the
+        "username_password" dictionary.
+
+        The file is replaced safely (see replace_file()), so it is never left partly
+        written.
+        """
+
+        # Declare "temp_user_list" to store user data in the correct format for writing.
+        temp_user_list = []
+
+        # For each user in the "username_password" dictionary:
+        for name, passw in self.username_password.items():
+            # Concatenate a string of username, ';', and password.
+            user_str = name + ';' + passw
+            # Append the formatted string to the "temp_user_list".
+            temp_user_list.append(user_str)
+
+        # Write the users in "temp_user_list" to the "users.txt" file.
+        replace_file(self.users_file, "\n".join(temp_user_list))
+
+        # The rewritten file does not contain any empty lines.
+        self._blank_user_lines = 0
+
+        # The file has been rewritten by this process, so it does not need to be loaded
+        # again.
+        self._loaded_files_state = self._files_state()
+
+
+
+    def add_task(self, assigned_user, task_title, task_description, due_date, date_assigned=None):
+        """
+        This method adds a new task to the Task Manager and returns the new task.
+
+        Parameters:
+
+            "assigned_user" =       the username of the person assigned to the task
+
+            "task_title" =          the task title
+
+            "task_description" =    the task description
+
+            "due_date" =            the due date of the task (a datetime)
+
+            "date_assigned" =       the date the task was assigned (default: today)
+
+        All new tasks are initially set to incomplete.
+
+        The new task is added to the "tasks.txt" file and to the "master_task_list".
+        A "UserNotRecognised" exception is raised if "assigned_user" is not registered,
+        and an "InvalidText" exception is raised if the title or description contains a
+        ';' or a new line.
+        """
+
+        # The title and description are stored as fields of the task's line.
+        check_text("title", task_title)
+        check_text("description", task_description)
+
+        with self._changing():
+
+            # Only registered users may be assigned to a task.
+            if assigned_user not in self.username_password:
+                raise UserNotRecognised(assigned_user)
+
+            # Tasks are assigned today unless another date is given.
+            if date_assigned is None:
+                date_assigned = date.today()
+
+
+            """ ----------------- Store task information for the new task. -------------- """
+
+            # Create an "add_task" Task and store the new task information. New tasks are
+            # automatically set to incomplete upon creation.
+            add_task = Task(assigned_user, task_title, task_description, date_assigned, due_date)
+
+            # Update the "master_task_list" with the new task.
+            self.master_task_list.append(add_task)
+
+            # The new task has the highest task number, so it goes at the end of the user's
+            # list of task numbers.
+            if self._user_task_numbers is not None:
+                self._user_task_numbers.setdefault(assigned_user, []).append(len(self.master_task_list))
+
+            # Count the new task.
+            if self._counters is not None:
+                self._counters.add_task(assigned_user, due_date, False)
+
+            # Add the new (incomplete) task to the date indexes.
+            if self._status_indexes is not None:
+                incomplete_index, completed_index = self._status_indexes
+                incomplete_index.add(due_date.toordinal(), len(self.master_task_list))
+            if self._date_indexes is not None:
+                assigned_index, updated_index = self._date_indexes
+                assigned_index.add(date_assigned.toordinal(), len(self.master_task_list))
+            if self._search_index is not None:
+                self._search_index.add_task(len(self.master_task_list), task_title, task_description)
+                self._search_index_changed = True
+
+
+            # Add the new task to storage.
+            self._store_new_task(add_task)
+
+            return add_task
+
+
+
+    def _store_new_task(self, new_task):
+        """
+        This method stores a newly added task, which has already been appended to the
+        "master_task_list".
+
+        A single record for the new task is written to the journal.
+        """
+
+        self._write_journal_record('A', len(self.master_task_list), format_task_line(new_task))
+
+        # Compact "tasks.txt" once too many empty lines have built up in it (e.g. by
+        # older versions of the program).
+        if self._blank_task_lines >= self.compact_threshold:
+            self.compact()
+        else:
+            self._fold_full_journal()
+
+
+
+    def import_tasks(self, import_file):
+        """
+        This method adds all of the tasks listed in a CSV or JSONL "import_file" (see
+        read_import_file()) to the Task Manager.
+
+        The file is read one row at a time. Each row is checked before any task is added:
+        the "username" must be registered, the "title" and "due_date" must be given, the
+        dates must be in the "YYYY-MM-DD" format, and no field may contain ';' or a new
+        line (which would split the task's line in "tasks.txt"). Rows which fail any
+        check are not imported, and the others are.
+
+        All of the new tasks are then stored together (in a single write to the
+        journal), and the user index, task counts, date indexes and search index are
+        updated in a single pass over the new tasks. Like add_task(), all new tasks are
+        set to incomplete, and are assigned today unless an "assigned_date" is given.
+
+        Returns the number of tasks imported, and a list of an "InvalidImportRow" for
+        each row which was not imported.
+        """
+
+        """ ----------------------- Check each row of the file. --------------------- """
+
+        new_tasks = []
+        import_errors = []
+        today = date.today()
+
+        with self._changing():
+
+            for row_number, fields in read_import_file(import_file):
+
+                if fields is None:
+                    import_errors.append(InvalidImportRow(row_number, "The row is not a JSON object."))
+                    continue
+
+                # Read the fields as strings. (A missing field is empty.)
+                username, title, description, due_date, assigned_date = (
+                    str(fields.get(field) or "").strip()
+                    for field in ("username", "title", "description", "due_date", "assigned_date")
+                )
+
+                if not title or not due_date:
+                    import_errors.append(InvalidImportRow(row_number, "A title and due date are required."))
+                    continue
+
+                if username not in self.username_password:
+                    import_errors.append(InvalidImportRow(row_number, f"The user \"{username}\" is not registered."))
+                    continue
+
+                try:
+                    check_text("title", title)
+                    check_text("description", description)
+                except InvalidText as error:
+                    import_errors.append(InvalidImportRow(row_number, f"The {error.field_name} may not contain ';' or a new line."))
+                    continue
+
+                # The same few dates usually repeat many times within a file, so each
+                # date is only converted once (see parse_date()).
+                try:
+                    due_date = parse_date(due_date)
+                    assigned_date = parse_date(assigned_date) if assigned_date else today
+                except ValueError:
+                    import_errors.append(InvalidImportRow(row_number, "Dates must be in the format YYYY-MM-DD."))
+                    continue
+
+                new_tasks.append(Task(username, title, description, assigned_date, due_date))
+
+            if not new_tasks:
+                return 0, import_errors
+
+
+            """ ---------------------- Store all of the new tasks. ---------------------- """
+
+            first_task_number = len(self.master_task_list) + 1
+
+            # Add the new tasks to the "master_task_list", and to storage.
+            self.master_task_list.extend(new_tasks)
+            self._store_new_tasks(new_tasks, first_task_number)
+
+
+            """ ------------------ Update the indexes in a single pass. ----------------- """
+
+            due_entries = []
+            assigned_entries = []
+
+            for task_number, new_task in enumerate(new_tasks, first_task_number):
+
+                # The new tasks have the highest task numbers, so they go at the end of
+                # the users' lists of task numbers.
+                if self._user_task_numbers is not None:
+                    self._user_task_numbers.setdefault(new_task.username, []).append(task_number)
+
+                if self._counters is not None:
+                    self._counters.add_task(new_task.username, new_task.due_date, False)
+
+                due_entries.append((new_task.due_date.toordinal(), task_number))
+                assigned_entries.append((new_task.assigned_date.toordinal(), task_number))
+
+                if self._search_index is not None:
+                    self._search_index.add_task(task_number, new_task.title, new_task.description, keep_sorted=False)
+
+            # The new (incomplete) tasks are merged into the date indexes together.
+            if self._status_indexes is not None:
+                incomplete_index, completed_index = self._status_indexes
+                incomplete_index.add_many(due_entries)
+            if self._date_indexes is not None:
+                assigned_index, updated_index = self._date_indexes
+                assigned_index.add_many(assigned_entries)
+            if self._search_index is not None:
+                self._search_index.sort_words()
+                self._search_index_changed = True
+
+        return len(new_tasks), import_errors
+
+
+
+    def _store_new_tasks(self, new_tasks, first_task_number):
+        """
+        This method stores several newly added tasks, which have already been appended to
+        the "master_task_list", numbered from "first_task_number".
+
+        The records for all of the new tasks are written to the journal together.
+        """
+
+        self._write_journal_records([
+            ('A', task_number, format_task_line(new_task))
+            for task_number, new_task in enumerate(new_tasks, first_task_number)
+        ])
+
+        self._fold_full_journal()
+
+
+
+    def get_task(self, task_number):
+        """
+        This method returns the task with the given "task_number" from the
+        "master_task_list". Task numbers start at 1.
+
+        An "out_of_range" "NotInListError" is raised if the task number is not recognised.
+        """
+
+        if task_number - 1 not in range(len(self.master_task_list)):
+            raise NotInListError("out_of_range")
+
+        return self.master_task_list[task_number - 1]
+
+
+
+    def get_page(self, first_task_number, page_size):
+        """
+        This method returns a page of up to "page_size" tasks, starting with the task
+        numbered "first_task_number".
+
+        In lazy mode, only the tasks on the page are read from "tasks.txt" and parsed.
+
+        Like get_user_list(), it returns the list of tasks and the list of corresponding
+        task numbers.
+        """
+
+        # Find the position of the first task on the page.
+        start = max(first_task_number - 1, 0)
+
+        page_tasks = self.master_task_list[start:start + page_size]
+        task_numbers = list(range(start + 1, start + 1 + len(page_tasks)))
+
+        return page_tasks, task_numbers
+
+
+
+    def edit_task(self, task_number, mark_complete=False, new_assignee=None, new_due_date=None):
+        """
+        This method edits the task with the given "task_number" and returns the task.
+
+        Parameters:
+
+            "mark_complete" =       if True, the task is marked as complete
+
+            "new_assignee" =        if given, the task is assigned to this user
+
+            "new_due_date" =        if given, the due date of the task is changed to this
+                                    date (a datetime)
+
+        Only incomplete tasks may be edited. A "TaskAlreadyComplete" exception is raised
+        if the task has already been marked as complete, a "UserNotRecognised" exception
+        is raised if the "new_assignee" is not registered, and an "InvalidText" exception
+        is raised if the "new_assignee" contains a ';' or a new line.
+
+        The updated task is recorded in the journal.
+        """
+
+        with self._changing():
+
+            # Find the task to be edited in the "master_task_list".
+            edited_task = self.get_task(task_number)
+
+            # If the chosen task is already complete, raise a "TaskAlreadyComplete" Exception.
+            if edited_task.completed == True:
+                raise TaskAlreadyComplete
+
+            # Tasks may only be re-assigned to registered users. (The username is stored
+            # as a field of the task's line.)
+            if new_assignee is not None:
+                check_text("assignee", new_assignee)
+                if new_assignee not in self.username_password:
+                    raise UserNotRecognised(new_assignee)
+
+
+            """ -------------------- Apply the requested changes. ----------------------- """
+
+            # Remove the task from the task counts and the incomplete task index while it is
+            # changed.
+            if self._counters is not None:
+                self._counters.remove_task(edited_task.username, edited_task.due_date, edited_task.completed)
+            if self._status_indexes is not None:
+                incomplete_index, completed_index = self._status_indexes
+                incomplete_index.remove(edited_task.due_date.toordinal(), task_number)
+
+            # Mark a task as complete.
+            if mark_complete:
+                edited_task.completed = True
+
+            # Re-assign a task, and move it to the new assignee in the user index.
+            if new_assignee is not None:
+                self._move_in_user_index(task_number, edited_task.username, new_assignee)
+                edited_task.username = new_assignee
+
+            # Change the due date of a task.
+            if new_due_date is not None:
+                edited_task.due_date = new_due_date
+
+            # Count the changed task, and add it to the incomplete or completed task index.
+            if self._counters is not None:
+                self._counters.add_task(edited_task.username, edited_task.due_date, edited_task.completed)
+            if self._status_indexes is not None:
+                status_index = completed_index if edited_task.completed else incomplete_index
+                status_index.add(edited_task.due_date.toordinal(), task_number)
+
+            # Move the task to today's date in the index of updated tasks.
+            if self._date_indexes is not None:
+                assigned_index, updated_index = self._date_indexes
+                if edited_task.updated_date is not None:
+                    updated_index.remove(parse_date(edited_task.updated_date).toordinal(), task_number)
+                updated_index.add(date.today().toordinal(), task_number)
+
+            # Set the "updated_date" of the "edited_task".
+            edited_task.updated_date = date.today().strftime(DATETIME_STRING_FORMAT)
+
+            # Store the changed task.
+            self._store_edited_task(task_number, edited_task)
+
+            return edited_task
+
+
+
+    def _store_edited_task(self, task_number, edited_task):
+        """
+        This method stores an edited task.
+
+        The task is stored back into the "master_task_list" (a columnar task list stores
+        the task's fields in its columns, rather than the task itself), and a single
+        record for the task is written to the journal.
+        """
+
+        self.master_task_list[task_number - 1] = edited_task
+
+        self._write_journal_record('E', task_number, format_task_line(edited_task))
+
+        self._fold_full_journal()
+
+
+
+    def edit_tasks(self, task_numbers, mark_complete=False, new_assignee=None, new_due_date=None,
+                   shift_due_days=0):
+        """
+        This method applies the same changes to many tasks at once, and returns the list
+        of the task numbers of the edited tasks.
+
+        Parameters:
+
+            "task_numbers" =        the task numbers of the tasks to edit (e.g. the tasks
+                                    found by filter_tasks() or search_tasks())
+
+            "mark_complete" =       if True, the tasks are marked as complete
+
+            "new_assignee" =        if given, the tasks are assigned to this user
+
+            "new_due_date" =        if given, the due date of the tasks is changed to this
+                                    date (a datetime)
+
+            "shift_due_days" =      the number of days to move the due date of each task
+                                    by (e.g. 7 moves each due date a week later)
+
+        Only incomplete tasks may be edited, so any completed tasks are skipped. A
+        "UserNotRecognised" exception is raised if the "new_assignee" is not registered,
+        an "InvalidText" exception is raised if it contains a ';' or a new line, an
+        "out_of_range" "NotInListError" is raised if any task number is not recognised,
+        and an "InvalidDueDate" exception is raised if any due date would be moved past
+        the dates which can be stored. In each case, no tasks are changed.
+
+        Unlike calling edit_task() for each task, all of the edited tasks are stored
+        together (in a single write to the journal), and the user index, task counts and
+        date indexes are updated in a single pass.
+        """
+
+        with self._changing():
+
+            # Tasks may only be re-assigned to registered users. (The username is stored
+            # as a field of the task's line.)
+            if new_assignee is not None:
+                check_text("assignee", new_assignee)
+                if new_assignee not in self.username_password:
+                    raise UserNotRecognised(new_assignee)
+
+            # Find each incomplete task to be edited (once, even if its task number is
+            # given more than once).
+            edited_tasks = []
+            for task_number in dict.fromkeys(task_numbers):
+                edited_task = self.get_task(task_number)
+                if not edited_task.completed:
+                    edited_tasks.append((task_number, edited_task))
+
+            if not edited_tasks:
+                return []
+
+            # Work out the new due date of every task before any task is changed, so that
+            # no task is changed if any due date cannot be moved.
+            new_due_dates = []
+            for task_number, edited_task in edited_tasks:
+                due_date = new_due_date if new_due_date is not None else edited_task.due_date
+                try:
+                    new_due_dates.append(due_date + timedelta(days=shift_due_days))
+                except OverflowError:
+                    raise InvalidDueDate(task_number) from None
+
+
+            """ -------------------- Apply the requested changes. ----------------------- """
+
+            today = date.today()
+            updated_date = today.strftime(DATETIME_STRING_FORMAT)
+
+            # The entries to remove from and add to the date indexes, and the task numbers
+            # of the re-assigned tasks of each previous assignee.
+            old_due_entries = []
+            incomplete_due_entries = []
+            completed_due_entries = []
+            old_updated_entries = []
+            moved_task_numbers = {}
+
+            for (task_number, edited_task), edited_due_date in zip(edited_tasks, new_due_dates):
+
+                # Remove the task from the task counts while it is changed.
+                if self._counters is not None:
+                    self._counters.remove_task(edited_task.username, edited_task.due_date, False)
+                old_due_entries.append((edited_task.due_date.toordinal(), task_number))
+                if edited_task.updated_date is not None:
+                    old_updated_entries.append((parse_date(edited_task.updated_date).toordinal(), task_number))
+
+                # Mark the task as complete.
+                if mark_complete:
+                    edited_task.completed = True
+
+                # Re-assign the task.
+                if new_assignee is not None and edited_task.username != new_assignee:
+                    moved_task_numbers.setdefault(edited_task.username, []).append(task_number)
+                    edited_task.username = new_assignee
+
+                # Change or move the due date of the task.
+                edited_task.due_date = edited_due_date
+
+                edited_task.updated_date = updated_date
+
+                # Count the changed task again.
+                if self._counters is not None:
+                    self._counters.add_task(edited_task.username, edited_task.due_date, edited_task.completed)
+                due_entries = completed_due_entries if edited_task.completed else incomplete_due_entries
+                due_entries.append((edited_task.due_date.toordinal(), task_number))
+
+
+            """ ------------------- Update the indexes together. ------------------------ """
+
+            # Move the re-assigned tasks to the new assignee in the user index.
+            if self._user_task_numbers is not None and moved_task_numbers:
+                new_numbers = self._user_task_numbers.setdefault(new_assignee, [])
+                for old_username, task_numbers_moved in moved_task_numbers.items():
+                    moved = set(task_numbers_moved)
+                    self._user_task_numbers[old_username] = [
+                        number for number in self._user_task_numbers[old_username] if number not in moved
+                    ]
+                    new_numbers += task_numbers_moved
+                new_numbers.sort()
+
+            # Move the tasks within the incomplete and completed task indexes.
+            if self._status_indexes is not None:
+                incomplete_index, completed_index = self._status_indexes
+                incomplete_index.remove_many(old_due_entries)
+                incomplete_index.add_many(incomplete_due_entries)
+                completed_index.add_many(completed_due_entries)
+
+            # Move the tasks to today's date in the index of updated tasks.
+            if self._date_indexes is not None:
+                assigned_index, updated_index = self._date_indexes
+                updated_index.remove_many(old_updated_entries)
+                updated_index.add_many([(today.toordinal(), task_number) for task_number, edited_task in edited_tasks])
+
+            # Store all of the changed tasks.
+            self._store_edited_tasks(edited_tasks)
+
+        return [task_number for task_number, edited_task in edited_tasks]
+
+
+
+    def reassign_user_tasks(self, old_username, new_username):
+        """
+        This method assigns all of the incomplete tasks of one user (e.g. someone who has
+        left the team) to another user, and returns the list of the task numbers of the
+        re-assigned tasks (see edit_tasks()).
+        """
+
+        with self._changing():
+
+            return self.edit_tasks(
+                self.filter_tasks(completed=False, assignee=old_username)[1], new_assignee=new_username
+            )
+
+
+
+    def _store_edited_tasks(self, edited_tasks):
+        """
+        This method stores several edited tasks, given as (task number, task) pairs.
+       
+
+        The tasks are stored back into the "master_task_list", and the records for all of
+        the tasks are written to the journal together.
+        """
+
+        for task_number, edited_task in edited_tasks:
+            self.master_task_list[task_number - 1] = edited_task
+
+        self._write_journal_records([
+            ('E', task_number, format_task_line(edited_task)) for task_number, edited_task in edited_tasks
+        ])
+
+        self._fold_full_journal()
+
+
+
+    def _write_journal_record(self, record_type, key, value):
+        """
+        This method appends a single record to the end of the journal (see
+        format_journal_record()).
+        """
+
+        self._write_journal_records([(record_type, key, value)])
+
+
+
+    def _write_journal_records(self, journal_records):
+        """
+        This method appends a list of (record type, key, value) "journal_records" to the
+        end of the journal, with a single write.
+
+        The records are synced to disk along with any other records written since the
+        journal was last synced, once "sync_interval" seconds have passed since then.
+        """
+
+        # The records are checked (see format_journal_record()) before anything is written.
+        journal_data = "".join(format_journal_record(*journal_record) for journal_record in journal_records).encode("utf-8")
+
+        # Remove any incomplete or damaged record left at the end of the journal.
+        if self._journal_truncate_to is not None:
+            os.truncate(self.journal_file, self._journal_truncate_to)
+            self._journal_truncate_to = None
+
+        if self._journal is None:
+            self._journal = open(self.journal_file, 'ab')
+
+        self._journal.write(journal_data)
+        self._journal.flush()
+        self._journal_records += len(journal_records)
+
+        # The records do not need to be read back by refresh().
+        self._journal_position += len(journal_data)
+
+        # Sync the records written since the last sync, once the interval has passed.
+        self._journal_unsynced = True
+        if time.monotonic() - self._journal_synced_at >= self.sync_interval:
+            self.sync_journal()
+
+
+
+    def sync_journal(self):
+        """
+        This method syncs any records written to the journal since it was last synced to
+        disk. (Records are written to the journal file straight away, so they are only
+        lost if the computer, rather than just the program, stops before they are
+        synced.)
+        """
+
+        if self._journal_unsynced:
+            os.fsync(self._journal.fileno())
+            self._journal_unsynced = False
+            self._journal_synced_at = time.monotonic()
+
+
+
+    def _fold_full_journal(self):
+        """
+        This method folds the journal back into "tasks.txt" and "users.txt" once
+        "journal_threshold" records have been written to it, so that replaying the
+        journal never takes long.
+        """
+
+        if self._journal_records >= self.journal_threshold:
+            self.compact()
+
+
+
+    def _clear_journal(self):
+        """
+        This method removes the journal, once all of its records are included in
+        "tasks.txt" and "users.txt".
+        """
+
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+            self._journal_unsynced = False
+
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+
+        self._journal_records = 0
+        self._journal_user_records = 0
+        self._journal_truncate_to = None
+        self._journal_position = 0
+
+
+
+    def close(self):
+        """
+        This method syncs any records written to the journal to disk, and closes the
+        files kept open by the store.
+        """
+
+        self.sync_journal()
+
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+        if self._task_index is not None:
+            self._task_index.close()
+            self._task_index = None
+
+        self._file_lock.close()
+
+
+
+    def write_tasks_to_file(self):
+        """
+        This method overwrites the "tasks.txt" file with all tasks in the
+        "master_task_list", and clears the journal. If any users have been registered
+        since "users.txt" was written, "users.txt" is overwritten too.
+
+        The files are replaced safely (see replace_file()), so they are never left partly
+        written. The journal is only removed once the new files are in place. (Replaying
+        the journal again over the new files gives the same tasks and users.)
+        """
+
+        with self._changing():
+
+            """ ----------------- Create the list of lines to write. -------------------- """
+
+            # In lazy mode, tasks which have not been accessed keep their original lines.
+            if self.lazy:
+                overwrite_list = list(self.master_task_list.task_lines())
+            else:
+                overwrite_list = [format_task_line(task) for task in self.master_task_list]
+
+
+            """ ------------- Overwrite "overwrite_list" to "tasks.txt". ---------------- """
+
+            # The old "tasks.txt" must be closed before it can be replaced.
+            if self._task_index is not None:
+                self._task_index.close()
+
+            # Write all of the tasks in "overwrite_list", separated by new lines.
+            replace_file(self.tasks_file, "\n".join(overwrite_list))
+
+            # In lazy mode, read any tasks which have not been accessed from the new file.
+            if self._task_index is not None:
+                self._task_index = TaskFileIndex(self.tasks_file)
+                self.master_task_list.replace_source(self._task_index)
+
+            # The saved search index no longer matches the rewritten file (although the tasks
+            # are the same), so it is saved again.
+            if self._search_index is not None:
+                self._search_index_changed = True
+
+            # The users registered in the journal must be written to "users.txt" before the
+            # journal is removed.
+            if self._journal_user_records:
+                self._write_users_file()
+
+            # The changes in the journal are now included in the files.
+            self._clear_journal()
+
+            # The rewritten file does not contain any empty lines.
+            self._blank_task_lines = 0
+            self._tasks_end_with_newline = not overwrite_list
+
+            # The files have been rewritten by this process, so they do not need to be loaded
+            # again.
+            self._loaded_files_state = self._files_state()
+
+
+
+    def compact(self):
+        """
+        This method removes any empty lines from the "tasks.txt" and "users.txt" files,
+        and folds the journal back into the files.
+
+        The files are only rewritten if they actually contain empty lines or there are
+        changes in the journal. The method is called automatically once
+        "journal_threshold" changes have been recorded in the journal, and by add_task()
+        once "tasks.txt" contains "compact_threshold" empty lines. It can also be called
+        directly.
+
+        Returns True if either file was rewritten.
+        """
+
+        with self._changing():
+
+            compacted = False
+
+            # Rewrite "tasks.txt" (and "users.txt") without any empty lines and with the
+            # changes in the journal.
+            if self._blank_task_lines or self._journal_records:
+                self.write_tasks_to_file()
+                compacted = True
+
+            # Rewrite "users.txt" without its empty lines.
+            if self._blank_user_lines:
+                self._write_users_file()
+                compacted = True
+
+            return compacted
+
+
+
+    def get_user_list(self, user):
+        """
+        This method generates a list of all tasks assigned to a user.
+
+        The list retains the corresponding task numbers from the "master_task_list".
+        The index of each task in the "user_task_list" and the index of the corresponding
+        task number in "task_numbers" are the same index.
+
+        The task numbers are looked up in the user index, so only the user's own tasks
+        are read.
+        """
+
+        # Copy the user's task numbers from the user index.
+        task_numbers = self.get_user_task_numbers(user)
+
+        # Find each of the user's tasks in the "master_task_list".
+        user_task_list = [self.master_task_list[number - 1] for number in task_numbers]
+
+        return user_task_list, task_numbers
+
+
+
+    def get_user_task_numbers(self, user):
+        """
+        This method returns the sorted list of the task numbers of all tasks assigned to
+        a user, without reading the tasks themselves.
+        """
+
+        return list(self._get_user_index().get(user, []))
+
+
+
+    def _get_user_index(self):
+        """
+        This method returns the user index: a dictionary linking each username to the
+        sorted list of the task numbers of the tasks assigned to that user.
+
+        The index is built with a single pass over the tasks the first time it is needed.
+        It is then kept up to date by add_task() and edit_task().
+        """
+
+        if self._user_task_numbers is None:
+
+            user_task_numbers = {}
+
+            # Add the number of each task to the list of the user assigned to it.
+            for pos, username in enumerate(self._task_usernames()):
+                user_task_numbers.setdefault(username, []).append(pos+1)
+
+            self._user_task_numbers = user_task_numbers
+
+        return self._user_task_numbers
+
+
+
+    def _move_in_user_index(self, task_number, old_username, new_username):
+        """
+        This method moves a re-assigned task from one user's list of task numbers to
+        another user's list within the user index.
+        """
+
+        # There is nothing to update if the index has not been built yet.
+        if self._user_task_numbers is None or old_username == new_username:
+            return
+
+        # Remove the task number from the old assignee's sorted list.
+        remove_sorted(self._user_task_numbers.get(old_username, []), task_number)
+
+        # Insert the task number into the new assignee's sorted list.
+        insort(self._user_task_numbers.setdefault(new_username, []), task_number)
+
+
+
+    def _task_usernames(self):
+        """
+        This method yields the username of each task in the "master_task_list".
+
+        In lazy mode, the usernames are read without parsing the remaining tasks. In
+        columnar mode, they are read from the packed user codes.
+        """
+
+        if self.lazy or self.columnar:
+            return self.master_task_list.usernames()
+
+        return (task.username for task in self.master_task_list)
+
+
+
+    def _get_counters(self):
+        """
+        This method returns the live TaskCounters of the store.
+
+        The tasks are counted in a single pass the first time the counts are needed:
+        the overall totals and the totals for each user are counted at the same time.
+        The counts are then kept up to date by add_task(), edit_task() and
+        register_user().
+        """
+
+        if self._counters is None:
+
+            counters = TaskCounters()
+
+            # Add empty counts for each registered user.
+            for user in self.username_password:
+                counters.add_user(user)
+
+            # Count each group of tasks towards the overall totals and the totals of its
+            # assignee.
+            for username, due_date, completed, count in self._task_summary_counts():
+                counters.add_task(username, due_date, completed, amount=count)
+
+            self._counters = counters
+
+        return self._counters
+
+
+
+    def _task_summaries(self):
+        """
+        This method yields the username, due date and completion status of each task in
+        the "master_task_list".
+
+        In lazy mode, the tasks which have not been accessed yet are read without being
+        stored as Task records. In columnar mode, they are read from the packed columns.
+        """
+
+        if self.lazy or self.columnar:
+            return self.master_task_list.summaries()
+
+        return ((task.username, task.due_date, task.completed) for task in self.master_task_list)
+
+
+
+    def _get_status_indexes(self):
+        """
+        This method returns the status indexes: a DateIndex of the incomplete tasks and a
+        DateIndex of the completed tasks, each sorted by due date.
+
+        The indexes are built with a single pass over the tasks the first time they are
+        needed. They are then kept up to date by add_task() and edit_task().
+        """
+
+        if self._status_indexes is None:
+
+            incomplete_tasks = []
+            completed_tasks = []
+
+            # Sort each task into the completed or incomplete tasks.
+            for pos, (username, due_date, completed) in enumerate(self._task_summaries()):
+                if completed:
+                    completed_tasks.append((due_date.toordinal(), pos+1))
+                else:
+                    incomplete_tasks.append((due_date.toordinal(), pos+1))
+
+            self._status_indexes = DateIndex(incomplete_tasks), DateIndex(completed_tasks)
+
+        return self._status_indexes
+
+
+
+    def _get_due_index(self):
+        """
+        This method returns the due date index: the DateIndex of the incomplete tasks,
+        sorted by due date (see _get_status_indexes()).
+        """
+
+        incomplete_index, completed_index = self._get_status_indexes()
+
+        return incomplete_index
+
+
+
+    def _get_date_indexes(self):
+        """
+        This method returns a DateIndex of all tasks sorted by assigned date, and a
+        DateIndex of the tasks which have been updated, sorted by updated date.
+
+        The indexes are built with a single pass over the tasks the first time they are
+        needed. They are then kept up to date by add_task() and edit_task().
+        """
+
+        if self._date_indexes is None:
+
+            assigned_tasks = []
+            updated_tasks = []
+
+            for task_number, task in enumerate(self.master_task_list, 1):
+                assigned_tasks.append((task.assigned_date.toordinal(), task_number))
+                if task.updated_date is not None:
+                    updated_tasks.append((parse_date(task.updated_date).toordinal(), task_number))
+
+            self._date_indexes = DateIndex(assigned_tasks), DateIndex(updated_tasks)
+
+        return self._date_indexes
+
+
+
+    def get_tasks_due(self, first_due_date, last_due_date):
+        """
+        This method returns the incomplete tasks due between "first_due_date" and
+        "last_due_date" (inclusive), in order of due date.
+
+        The tasks are found with a binary search of the due date index, so only the
+        matching tasks are read.
+
+        Like get_user_list(), it returns the list of tasks and the list of corresponding
+        task numbers.
+        """
+
+        task_numbers = self._get_due_index().task_numbers(first_due_date.toordinal(), last_due_date.toordinal())
+        due_tasks = [self.master_task_list[number - 1] for number in task_numbers]
+
+        return due_tasks, task_numbers
+
+
+
+    def get_tasks_due_soon(self, days=7):
+        """
+        This method returns the incomplete tasks due from today up to "days" days from
+        today, in order of due date (see get_tasks_due()).
+        """
+
+        today = date.today()
+
+        return self.get_tasks_due(today, today + timedelta(days=days))
+
+
+
+    def get_overdue_tasks(self):
+        """
+        This method returns the incomplete tasks which are overdue (due before today),
+        in order of due date (see get_tasks_due()).
+        """
+
+        return self.get_tasks_due(date.min, date.today() - timedelta(days=1))
+
+
+
+    def count_overdue_tasks(self):
+        """
+        This method returns the number of incomplete tasks which are overdue, with a
+        binary search of the due date index.
+        """
+
+        return self._get_due_index().count_before(date.today().toordinal())
+
+
+
+    def _task_texts(self):
+        """
+        This method yields the title and description of each task in the
+        "master_task_list".
+
+        In lazy and columnar mode, the text is read without storing any Task records.
+        """
+
+        if self.lazy or self.columnar:
+            return self.master_task_list.texts()
+
+        return ((task.title, task.description) for task in self.master_task_list)
+
+
+
+    def _tasks_file_state(self):
+        """
+        This method returns the size and modification time of the "tasks.txt" file, which
+        change whenever the file is written to.
+        """
+
+        file_stats = os.stat(self.tasks_file)
+
+        return [file_stats.st_size, file_stats.st_mtime_ns]
+
+
+
+    def _get_search_index(self):
+        """
+        This method returns the SearchIndex of the task titles and descriptions.
+
+        The first time it is needed, the index is loaded from the "tasks.txt.search"
+        file if it was saved after "tasks.txt" was last written. Otherwise, it is built
+        with a single pass over the tasks and saved. It is then kept up to date by
+        add_task(). (Editing a task does not change its title or description.)
+        """
+
+        if self._search_index is None:
+
+            search_index = SearchIndex.load(self.search_file, self._tasks_file_state())
+
+            # Build the index again if it was not saved, or does not match the tasks.
+            if search_index is None or search_index.num_tasks != len(self.master_task_list):
+
+                search_index = SearchIndex()
+                for task_number, (title, description) in enumerate(self._task_texts(), 1):
+                    search_index.add_task(task_number, title, description, keep_sorted=False)
+                search_index.sort_words()
+                search_index.num_tasks = len(self.master_task_list)
+
+                self._search_index = search_index
+                self._search_index_changed = True
+                self.save_search_index()
+
+            self._search_index = search_index
+
+        return self._search_index
+
+
+
+    def save_search_index(self):
+        """
+        This method saves the search index to the "tasks.txt.search" file, if it has
+        been changed since it was last saved, so that it does not need to be built again
+        the next time the tasks are loaded.
+        """
+
+        if self._search_index is not None and self._search_index_changed:
+            self._search_index.save(self.search_file, self._tasks_file_state())
+            self._search_index_changed = False
+
+
+
+    def search_tasks(self, query):
+        """
+        This method returns the tasks whose title or description contains every word of
+        the "query", in order of task number (see SearchIndex.search()).
+
+        A word ending with '*' matches any word starting with the rest of the word.
+
+        Like filter_tasks(), it returns a TaskSelection of the matching tasks and the
+        list of corresponding task numbers.
+        """
+
+        task_numbers = self._get_search_index().search(query)
+
+        return TaskSelection(self.master_task_list, task_numbers), task_numbers
+
+
+
+    def filter_tasks(self, completed=None, assignee=None, due_from=None, due_to=None,
+                     assigned_from=None, assigned_to=None, updated_since=None):
+        """
+        This method returns the tasks which match all of the given filters, in order of
+        task number.
+
+        Parameters (each filter is only used if it is given):
+
+            "completed" =       True for completed tasks, or False for incomplete tasks
+
+            "assignee" =        the username of the person assigned to the tasks
+
+            "due_from" =        the earliest due date
+
+            "due_to" =          the latest due date
+
+            "assigned_from" =   the earliest assigned date
+
+            "assigned_to" =     the latest assigned date
+
+            "updated_since" =   the earliest date on which the tasks were last updated
+
+        The tasks matching each filter are found in an index (the user index, the status
+        indexes or the date indexes) rather than by reading every task, and only the task
+        numbers found in every index are kept.
+
+        It returns a TaskSelection of the matching tasks (so each task is only read when
+        it is accessed) and the list of corresponding task numbers.
+        """
+
+        # The task numbers matching each filter.
+        matches = []
+
+        if assignee is not None:
+            matches.append(self._get_user_index().get(assignee, []))
+
+        # Tasks are found by status and due date in the status indexes.
+        if completed is not None or due_from is not None or due_to is not None:
+            incomplete_index, completed_index = self._get_status_indexes()
+            first_ordinal = due_from.toordinal() if due_from is not None else None
+            last_ordinal = due_to.toordinal() if due_to is not None else None
+
+            status_matches = []
+            if completed is not True:
+                status_matches += incomplete_index.task_numbers(first_ordinal, last_ordinal)
+            if completed is not False:
+                status_matches += completed_index.task_numbers(first_ordinal, last_ordinal)
+            matches.append(status_matches)
+
+        if assigned_from is not None or assigned_to is not None:
+            assigned_index, updated_index = self._get_date_indexes()
+            matches.append(assigned_index.task_numbers(
+                assigned_from.toordinal() if assigned_from is not None else None,
+                assigned_to.toordinal() if assigned_to is not None else None,
+            ))
+
+        if updated_since is not None:
+            assigned_index, updated_index = self._get_date_indexes()
+            matches.append(updated_index.task_numbers(updated_since.toordinal()))
+
+        # Without any filters, every task matches.
+        if not matches:
+            task_numbers = list(range(1, len(self.master_task_list)+1))
+
+        # Otherwise, keep the task numbers found for every filter, starting with the
+        # filter with the fewest matches.
+        else:
+            matches.sort(key=len)
+            matching_numbers = set(matches[0])
+            for other_matches in matches[1:]:
+                matching_numbers.intersection_update(other_matches)
+            task_numbers = sorted(matching_numbers)
+
+        return TaskSelection(self.master_task_list, task_numbers), task_numbers
+
+
+
+    def _task_summary_counts(self):
+        """
+        This method yields each combination of username, due date and completion status
+        found among the tasks, with the number of tasks which have that combination.
+
+        In columnar mode, the tasks are grouped by a scan over the packed columns.
+        Otherwise, each task is yielded as a group of one.
+        """
+
+        if self.columnar:
+            return self.master_task_list.summary_counts()
+
+        return ((username, due_date, completed, 1) for username, due_date, completed in self._task_summaries())
+
+
+
+    def build_report(self):
+        """
+        This method returns the task and user statistics used in the reports as a
+        TaskReport.
+
+        The statistics are read from the live task counts (see _get_counters()), so
+        building a report takes time proportional to the number of users rather than
+        the number of tasks. If "numpy_reports" is set, they are calculated from all of
+        the tasks with NumPy instead (see _build_numpy_report()).
+        """
+
+        if self.numpy_reports:
+            return self._build_numpy_report()
+
+        counters = self._get_counters()
+
+        # The date is only checked once, so all tasks are compared with the same date.
+        today = date.today()
+        today_ordinal = today.toordinal()
+
+        report = TaskReport(today, len(self.username_password))
+
+        # Copy the overall totals.
+        report.total_tasks = counters.total
+        report.completed = counters.completed
+        report.overdue = counters.due.overdue(today_ordinal)
+        report.incomplete_overdue = counters.incomplete_due.overdue(today_ordinal)
+        report.aging = counters.incomplete_due.aging(today_ordinal)
+
+        # Copy the totals of each registered user, in order of registration. (Tasks
+        # assigned to a user who is not registered are only included in the overall
+        # totals.)
+        for user in self.username_password:
+
+            user_report = UserReport(user)
+            user_report.assigned = counters.user_assigned[user]
+            user_report.completed = counters.user_completed[user]
+            user_report.overdue = counters.user_due[user].overdue(today_ordinal)
+            user_report.incomplete_overdue = counters.user_incomplete_due[user].overdue(today_ordinal)
+            user_report.aging = counters.user_incomplete_due[user].aging(today_ordinal)
+
+            report.user_reports[user] = user_report
+
+        return report
+
+
+
+    def _build_numpy_report(self):
+        """
+        This method returns the same TaskReport as build_report(), calculated from all
+        of the tasks with vectorised NumPy operations.
+
+        The due dates are compared with today's date as a "datetime64[D]" array, and the
+        totals of each user are counted with numpy.bincount() over the user codes.
+        """
+
+        # The date is only checked once, so all tasks are compared with the same date.
+        today = date.today()
+
+        report = TaskReport(today, len(self.username_password))
+
+
+        """ ------------------- Read the task columns as arrays. -------------------- """
+
+        usernames, user_codes, due_ordinals, completed = self._task_columns()
+        num_codes = len(usernames)
+        num_ranges = len(AGING_RANGES)
+
+        # Convert the due dates from day ordinals into "datetime64[D]" dates.
+        due_dates = (due_ordinals.astype(numpy.int64) - date(1970, 1, 1).toordinal()).astype("datetime64[D]")
+
+        # The number of days that each task is overdue by (zero or less if it is not).
+        days_overdue = (numpy.datetime64(today, 'D') - due_dates).astype(numpy.int64)
+
+        overdue = days_overdue > 0
+        incomplete_overdue = overdue & ~completed
+
+
+        """ -------------------- Calculate the overall totals. ---------------------- """
+
+        report.total_tasks = len(user_codes)
+        report.completed = int(numpy.count_nonzero(completed))
+        report.overdue = int(numpy.count_nonzero(overdue))
+        report.incomplete_overdue = int(numpy.count_nonzero(incomplete_overdue))
+
+        # Find the aging range of each incomplete, overdue task.
+        upper_limits = [highest for lowest, highest in AGING_RANGES[:-1]]
+        task_ranges = numpy.searchsorted(upper_limits, days_overdue[incomplete_overdue])
+
+
+        """ ------------------- Calculate the totals of each user. ------------------ """
+
+        # Count the tasks of each user code.
+        user_assigned = numpy.bincount(user_codes, minlength=num_codes)
+        user_completed = numpy.bincount(user_codes[completed], minlength=num_codes)
+        user_overdue = numpy.bincount(user_codes[overdue], minlength=num_codes)
+        user_incomplete_overdue = numpy.bincount(user_codes[incomplete_overdue], minlength=num_codes)
+
+        # Count the incomplete, overdue tasks of each user code within each aging range.
+        user_aging = numpy.bincount(
+            user_codes[incomplete_overdue] * num_ranges + task_ranges,
+            minlength=num_codes * num_ranges,
+        ).reshape(num_codes, num_ranges)
+
+        report.aging = user_aging.sum(axis=0).tolist()
+
+        # Find the user code of each registered user. (Tasks assigned to a user who is not
+        # registered are only included in the overall totals.)
+        user_codes_by_name = {username: code for code, username in enumerate(usernames)}
+
+        for user in self.username_password:
+
+            user_report = UserReport(user)
+            report.user_reports[user] = user_report
+
+            # A user without a user code has not been assigned any tasks.
+            code = user_codes_by_name.get(user)
+            if code is None:
+                continue
+
+            user_report.assigned = int(user_assigned[code])
+            user_report.completed = int(user_completed[code])
+            user_report.overdue = int(user_overdue[code])
+            user_report.incomplete_overdue = int(user_incomplete_overdue[code])
+            user_report.aging = user_aging[code].tolist()
+
+        return report
+
+
+
+    def _task_columns(self):
+        """
+        This method returns the usernames, and NumPy arrays of the user code, due date
+        (as a day ordinal) and completion status of each task, for _build_numpy_report().
+
+        "usernames" lists the username of each user code. In columnar mode, the arrays
+        are read straight from the packed columns.
+        """
+
+        num_tasks = len(self.master_task_list)
+
+        if self.columnar:
+            usernames, user_ids, due, completed_bits = self.master_task_list.columns()
+
+            completed = numpy.unpackbits(
+                numpy.frombuffer(completed_bits, dtype=numpy.uint8), bitorder="little"
+            )[:num_tasks].astype(bool)
+
+            return (usernames, numpy.frombuffer(user_ids, dtype=numpy.intc),
+                    numpy.frombuffer(due, dtype=numpy.intc), completed)
+
+        # Number the registered users first, then any other usernames as they are found.
+        user_codes = {user: code for code, user in enumerate(self.username_password)}
+        usernames = list(user_codes)
+
+        user_ids = numpy.empty(num_tasks, dtype=numpy.intc)
+        due = numpy.empty(num_tasks, dtype=numpy.intc)
+        completed = numpy.empty(num_tasks, dtype=bool)
+
+        for pos, (username, due_date, task_completed) in enumerate(self._task_summaries()):
+
+            code = user_codes.get(username)
+            if code is None:
+                code = user_codes[username] = len(usernames)
+                usernames.append(username)
+
+            user_ids[pos] = code
+            due[pos] = due_date.toordinal()
+            completed[pos] = task_completed
+
+        return usernames, user_ids, due, completed
+
+
+
+    def generate_reports(self):
+        """
+        This method generates reports on all of the tasks stored in the Task Manager.
+
+        The reports are separated into two sections:
+            - Task Overview,
+            - User Overview.
+
+        The method stores the reports within similarly named text files:
+            - "task_overview.txt",
+            - "user_overview.txt".
+
+        It returns the TaskReport that the reports were generated from, so that they can
+        also be displayed (see format_task_overview() and format_user_overview()).
+        """
+
+        report = self.build_report()
+
+        # Write the Task Overview into the "task_overview.txt" file.
+        write_report_file("task_overview.txt", "Task Overview", format_task_overview(report))
+
+        # Write the User Overview into the "user_overview.txt" file.
+        write_report_file("user_overview.txt", "User Overview", format_user_overview(report))
+
+        return report
+
+
+
+    def display_statistics(self):
+        """
+        This method returns statistics about the number of users and tasks without
+        generating full reports, as a tuple of (total_users, total_tasks).
+
+        The statistics are the number of users and tasks loaded from the "users.txt" and
+        "tasks.txt" files (including any added since), so the files do not need to be
+        read again. (To count the users or tasks in a file without loading a store, see
+        count_records().)
+        """
+
+        # Calculate the total number of users and tasks loaded into the store.
+        total_users = len(self.username_password)
+        total_tasks = len(self.master_task_list)
+
+        return total_users, total_tasks
+
+
+
+
+
+
+
+# ---------------------------------- Defining functions. --------------------------------
+
+# The number of tasks displayed on each page when viewing a list of tasks.
+TASKS_PER_PAGE = 20
+
+
+
+
+def count_occurrences(list_of_tasks, key, condition):
+    """
+    This function counts the occurrences of a given value within a list of tasks.
+
+    Parameters:
+
+        "condition" =       a task field value of which the occurrences are to be
+                            counted
+
+        "key" =             the name of the task field of the "condition" to be
+                            counted
+
+        "list_of_tasks" =   the list to be searched for "condition" occurrences
+    """
+
+    # A columnar task list counts the occurrences from its packed columns.
+    if isinstance(list_of_tasks, ColumnarTaskList):
+        return list_of_tasks.count_occurrences(key, condition)
+
+    # Count each task in which an instance of the "condition" is identified.
+    occurrence_count = sum(1 for task in list_of_tasks if getattr(task, key) == condition)
+
+    # Return the result.
+    return occurrence_count
+
+
+
+
+def format_task_overview(report):
+    """
+    This function generates the list of statements making up the Task Overview from a
+    TaskReport.
+
+    Task Overview displays:
+        - the total number of tasks that have been generated and tracked by the Task
+          Manager,
+        - the total number of completed tasks,
+        - the total number of incomplete tasks,
+        - the total number of tasks that are incomplete and overdue,
+        - the percentage of all tasks that are incomplete,
+        - the percentage of all tasks that are overdue,
+        - the number of incomplete, overdue tasks by how many days they are overdue.
+    """
+
+    # Store each statement within a "task_overview_list".
+    task_overview_list = [
+
+        # Total tasks.
+        f"The total number of tasks that have been generated is: \t\t\t{report.total_tasks}",
+
+        # Completed tasks.
+        f"The total number of completed tasks is: \t\t\t\t{report.completed}",
+
+        # Incomplete tasks.
+        f"The total number of incomplete tasks is: \t\t\t\t{report.incomplete}",
+
+        # Incomplete and overdue tasks.
+        f"The total number of tasks that are incomplete and overdue is: \t\t{report.incomplete_overdue}",
+
+        # Percentage incomplete.
+        f"The percentage of tasks that are incomplete is: \t\t\t{percentage(report.incomplete, report.total_tasks)}%",
+
+        # Percentage overdue.
+        f"The percentage of tasks that are overdue is: \t\t\t\t{percentage(report.overdue, report.total_tasks)}%"
+    ]
+
+    # Incomplete and overdue tasks, by the number of days they are overdue.
+    for pos, count in enumerate(report.aging):
+        statement = f"The number of incomplete tasks overdue by {aging_label(pos)} is: "
+        # Line up the counts with the statements above (tab stops are 8 characters apart).
+        task_overview_list.append(statement + "\t"*(9 - len(statement)//8) + f"{count}")
+
+    return task_overview_list
+
+
+
+
+def format_user_overview(report):
+    """
+    This function generates the list of statements making up the User Overview from a
+    TaskReport.
+
+    User Overview displays:
+        - the total number of users that are registered in the Task Manager,
+        - the total number of tasks that have been generated and tracked by the Task
+          Manager,
+        - a breakdown report for each user including:
+            - the total number of tasks assigned to the user,
+            - the percentage of total tasks assigned to the user,
+            - the percentage of the user's tasks that are complete,
+            - the percentage of the user's tasks that are incomplete,
+            - the percentage of the user's tasks that are incomplete and overdue.
+    """
+
+    # Store each statement within a "user_overview_list".
+    user_overview_list = [
+
+        # Total users.
+        f"The total number of users that are registered in the Task Manager is:\t{report.total_users}",
+
+        # Total tasks.
+        f"The total number of tasks that have been generated is:\t\t\t{report.total_tasks}",
+
+        "\n\n"
+    ]
+
+    # For each registered user:
+    for user_report in report.user_reports.values():
+
+        user_subheading = ("-"*15 + f" User Stats - {user_report.username} "+ "-"*15 + "\n")
+
+        # Store each statement within a "user_sublist".
+        user_sublist = [
+
+            # Include a subheading for the user.
+            user_subheading,
+
+            # Assigned tasks.
+            f"The total number of assigned tasks is: \t\t\t\t\t{user_report.assigned}",
+
+            # Percentage of total tasks (0 for users without any tasks).
+            f"As a percentage of all tasks this is: \t\t\t\t\t{percentage(user_report.assigned, report.total_tasks) if user_report.assigned else 0}%",
+
+            # Percentage of tasks complete.
+            f"The percentage of tasks that are complete is: \t\t\t\t{percentage(user_report.completed, user_report.assigned)}%",
+
+            # Percentage of tasks incomplete.
+            f"The percentage of tasks that are incomplete is: \t\t\t{percentage(user_report.incomplete, user_report.assigned)}%",
+
+            # Percentage of tasks that are incomplete and overdue.
+            f"The percentage of tasks that are incomplete and overdue is: \t\t{percentage(user_report.incomplete_overdue, user_report.assigned)}%\n"
+        ]
+
+        # Append the "user_sublist" to the "user_overview_list".
+        user_overview_list.extend(user_sublist)
+
+    return user_overview_list
+
+
+
+
+# A new line character which is followed by an empty line (or a line containing only
+# "\r" characters).
+_EMPTY_LINE_PATTERN = re.compile(rb"\n(?=\r*\n)")
+
+
+def count_records(file_name, buffer_size=1 << 20):
+    """
+    This function counts the records (the non-empty lines) in a file such as "tasks.txt"
+    or "users.txt".
+
+    The file is read in blocks of "buffer_size" bytes, so even a very large file is
+    counted without reading it all into memory or creating a string for every line.
+    Empty lines are not counted.
+    """
+
+    records = 0
+
+    # Whether the line which is currently being read is empty so far.
+    line_empty = True
+
+    with open(file_name, 'rb') as file:
+        while True:
+
+            block = file.read(buffer_size)
+            if not block:
+                break
+
+            first_newline = block.find(b"\n")
+
+            # If the block does not finish the current line, just check if the line is
+            # still empty.
+            if first_newline == -1:
+                line_empty = line_empty and not block.strip(b"\r")
+                continue
+
+            # Count every line which ends within the block...
+            records += block.count(b"\n")
+
+            # ...except the line continued from the previous block, if it is empty...
+            if line_empty and not block[:first_newline].strip(b"\r"):
+                records -= 1
+
+            # ...and any other empty lines.
+            records -= len(_EMPTY_LINE_PATTERN.findall(block))
+
+            # Check if the unfinished line at the end of the block is empty so far.
+            line_empty = not block[block.rfind(b"\n") + 1:].strip(b"\r")
+
+    # Count a non-empty last line which does not end with a new line.
+    if not line_empty:
+        records += 1
+
+    return records
+
+
+
+
+def write_report_file(file_name, heading, statements):
+    """
+    This function writes a report to a text file, with a heading, and with each
+    statement on a new line.
+    """
+
+    # Build the whole report, so that the file is written in a single write.
+    report_text = f"-------------------------------- {heading} --------------------------------\n\n"
+    report_text += "".join(statement + "\n" for statement in statements)
+
+    with open(file_name, 'w', encoding="utf-8") as file:
+        file.write(report_text)
+
+
+
+
+def reg_user(store):
+    """
+    This function registers a new user to the Task Manager.
+
+    The function is called when the user selects 'r' at the Main Menu.
+
+    The new user is added to the "users.txt" file.
+    The new user is also added to the "username_password" dictionary which stores all
+    current users.
+    """
+
+    """ ------------------------ Display section title. ----------------------------- """
+
+    print("-"*100)
+    print("REGISTER A NEW USER\n")
+
+
+    """ ---------------------------- Get username. ---------------------------------- """
+
+    # Request input of a username for the new user.
+    new_username = input("Enter a username:\t\t")
+
+    # If the chosen username is already registered, or cannot be stored (see
+    # check_text()), show an error message.
+    while new_username in store.username_password or ';' in new_username:
+        if ';' in new_username:
+            print(InvalidText("username"), "\n")
+        else:
+            print("\n\t** Sorry, that username is already taken. **\n")
+        # Ask the user to choose another username.
+        new_username = input("Choose another username:\t")
+
+
+    """ ---------------------------- Get password. ---------------------------------- """
+
+    # Request input of a password for the new user.
+    new_password = input("\nChoose your password:\t\t")
+
+    # Request input of the password again to confirm.
+    confirm_password = input("Confirm password:\t\t")
+
+    # While the "new_password" and "confirm_password" inputs don't match, or the
+    # password cannot be stored:
+    while new_password != confirm_password or ';' in new_password:
+
+        # Show an error message.
+        if ';' in new_password:
+            print(InvalidText("password"), "\n")
+        else:
+            print("\n\t **Passwords do not match. Please try again. **\n")
+
+        # Request input of a password for the new user.
+        new_password = input("Choose your password:\t\t")
+
+        # Request input of the password again to confirm.
+        confirm_password = input("Confirm password:\t\t")
+
+
+    """ ------------------------------ Add user.  ----------------------------------- """
+
+    # Add the new user to the Task Manager. (Another user of the Task Manager may have
+    # registered the same username since it was checked.)
+    try:
+        store.register_user(new_username, new_password)
+    except UsernameTaken as error:
+        print(error)
+        return
+
+    # Display a confirmation message for the user.
+    print(f"\nNew user \"{new_username}\" added successfully.")
+
+
+
+
+def add_task(store):
+    """
+    This function adds a new task to the Task Manager.
+
+    The function is called when the user selects 'a' at the Main Menu.
+
+    To add a task, a user must enter:
+        - the name of the person assigned to the task,
+        - a task title,
+        - a task description,
+        - a task due date.
+
+    The task store also automatically records the date the task was assigned, and sets a
+    completion status for the new task. (All new tasks are initially set to incomplete.)
+
+    The new task is added to the "tasks.txt" file.
+    The new task is also added to the "master_task_list" which stores all current tasks.
+    """
+
+    """ ------------------------ Display section title. ----------------------------- """
+
+    print("-"*100)
+    print("ADD A NEW TASK\n")
+
+
+
+    """ ----------------- Gather information about the new task. -------------------- """
+
+
+    """ Assigned user.
+    """
+    # Request input of the "assigned_user" for the new task.
+    assigned_user = input("Please enter the username of person assigned to this task:\t\t")
+
+    # While the input for "assigned_user" is not a registered username:
+    while assigned_user not in store.username_password.keys():
+        # Show an error message.
+        print("\n\t**User not recognised. **\n")
+        # Ask the user to input another username until a registered user is chosen.
+        assigned_user = input("Please enter the username of person assigned to this task:\t\t")
+
+
+    """ Task title.
+    """
+    # Request input of the "task_title" for the new task, until it can be stored (see
+    # check_text()).
+    while True:
+        try:
+            task_title = input("\nPlease enter a Task Title:\t\t\t\t\t\t")
+            check_text("title", task_title)
+            break
+        except InvalidText as error:
+            print(error)
+
+
+    """ Task decription.
+    """
+    # Request input of the "task_description" for the new task, until it can be stored.
+    while True:
+        try:
+            task_description = input("\nPlease enter a Task Description:\t\t\t\t\t")
+            check_text("description", task_description)
+            break
+        except InvalidText as error:
+            print(error)
+
+
+    """ Due date.
+    """
+    # Request input of the "due_date" for the new task.
+    while True:
+        # Perform input validation with try-except block.
+        try:
+            input_date = input("\nPlease enter the Due Date of the task (Format: YYYY-MM-DD):\t\t")
+
+            # Store the date in the correct format in "due_date".
+            due_date = parse_date(input_date)
+
+            # Break the parent while-loop when a valid date is entered.
+            break
+
+        # If a date is entered in an incorrect format, show an error message.
+        except ValueError:
+            print("\n\t** Invalid date-time format. Please use the format specified. **")
+
+
+
+    """ ------------------------ Store the new task. -------------------------------- """
+
+    # Add the new task to the "master_task_list" and to the "tasks.txt" file.
+    store.add_task(assigned_user, task_title, task_description, due_date)
+
+    # Display a confirmation message for the user.
+    print(f"\nTask \"{task_title}\" successfully added.")
+
+
+
+
+def view_all(store, login_username):
+    """
+    This function displays all of the tasks listed in the "tasks.txt" file.
+
+    The function is called when the user selects "va" at the Main Menu.
+
+    All tasks are printed to the console in a readable format.
+    Each task is displayed with a corresponding number to identify the task.
+    """
+
+    """ ------------------------ Display section title. ----------------------------- """
+
+    print("-"*100)
+    print("VIEW ALL TASKS\n")
+
+
+    """ ---------------------------- Display tasks. --------------------------------- """
+
+    display_task_list("va", store.master_task_list, "number sublist not required")
+
+
+    """ -------- Allow the "admin" user to edit all tasks from this view. ----------- """
+
+    if login_username == "admin":
+        # Create a range of task numbers to give as argument to the edit_task() function.
+        # (A range does not store every number, and checks if it contains a number
+        # straight away.)
+        task_numbers = range(1, len(store.master_task_list)+1)
+        # Allow the user to edit tasks if desired.
+        edit_task(store, store.master_task_list, task_numbers)
+
+
+
+
+def view_mine(store, login_username):
+    """
+    This function displays all of the tasks assigned to the user who is currently logged
+    in to the program.
+
+    The function is called when the user selects "vm" at the Main Menu.
+
+    Each task is displayed with a corresponding number to identify the task.
+    The specific task numbers for each of the user's tasks are drawn directly from the
+    "master_task_list" for better organisation and display of tasks. This avoids changing
+    task numbers in different list displays which may result in user confusion when
+    selecting task numbers to edit.
+
+    The user can choose to edit their tasks if they wish.
+
+    """
+
+    """ ------------------------ Display section title. ----------------------------- """
+
+    print("-"*100)
+    print("VIEW MY TASKS\n")
+
+
+    """ ------------------ Create a sublist of the user's tasks. -------------------- """
+
+    # Store the current user's "task_numbers", and a list of the corresponding tasks. Each
+    # task is only read when it is displayed.
+    task_numbers = store.get_user_task_numbers(login_username)
+    user_task_list = TaskSelection(store.master_task_list, task_numbers)
+
+
+    """ ------------------- For users without any assigned tasks. ------------------- """
+
+    # Display a message to inform the user that they do not have any assigned tasks.
+    if not user_task_list:
+        print("\nYou do not currently have any assigned tasks.")
+
+        # Exit the function, return to Main Menu.
+        return
+
+
+        """ ------------------ For users with assigned tasks. ----------------------- """
+
+    else:
+        # Display a list of the user's tasks for the user to review.
+        display_task_list("vm", user_task_list, task_numbers)
+
+        # Allow the user to edit their tasks if desired.
+        edit_task(store, user_task_list, task_numbers)
+
+
+
+
+def view_due(store, login_username):
+    """
+    This function displays the incomplete tasks which are due soon, in order of due date,
+    along with the number of incomplete tasks which are already overdue.
+
+    The function is called when the user selects "vd" at the Main Menu.
+
+    The user chooses how many days ahead to look (7 days by default). The tasks are found
+    with the due date index of the task store (see TaskStore.get_tasks_due_soon()), so
+    only the tasks which are due soon are read.
+
+    The "admin" user can edit the displayed tasks from this view.
+    """
+
+    """ ------------------------ Display section title. ----------------------------- """
+
+    print("-"*100)
+    print("VIEW TASKS DUE SOON\n")
+
+
+    """ ------------------ Ask how many days ahead to look. ------------------------- """
+
+    while True:
+        try:
+
+            # Request input of a number of days. An empty input keeps the default.
+            days_input = input("How many days ahead would you like to view? (Press Enter for 7 days):\t")
+            days = int(days_input) if days_input.strip() else 7
+
+            # The number of days must not be negative.
+            if days < 0:
+                raise ValueError
+
+            break
+
+        except ValueError:
+            print("\n\t** Please enter a positive number of days only. **\n")
+
+
+    """ ---------------------- Display the tasks due soon. -------------------------- """
+
+    # Display the number of incomplete tasks which are already overdue.
+    print(f"\nThe number of incomplete tasks that are overdue is: \t{store.count_overdue_tasks()}")
+
+    # Store a list of the tasks due soon and store the corresponding "task_numbers".
+    due_task_list, task_numbers = store.get_tasks_due_soon(days)
+
+    if not due_task_list:
+        print(f"\nThere are no incomplete tasks due within the next {days} days.")
+
+        # Exit the function, return to Main Menu.
+        return
+
+    display_task_list("vd", due_task_list, task_numbers)
+
+
+    """ -------- Allow the "admin" user to edit the tasks from this view. ----------- """
+
+    if login_username == "admin":
+        edit_task(store, due_task_list, task_numbers)
+
+
+
+
+def view_filtered(store, login_username):
+    """
+    This function displays the tasks which match a set of filters chosen by the user.
+
+    The function is called when the user selects "vf" at the Main Menu.
+
+    The user can filter the tasks by:
+        - status (completed or incomplete),
+        - assigned person (the "admin" user only - other users only see their own tasks),
+        - due date range,
+        - assigned date range,
+        - the date they were last updated.
+
+    The matching tasks are found with the indexes of the task store (see
+    TaskStore.filter_tasks()). Each task is displayed with its task number from the
+    "master_task_list", so the tasks can be edited by the same numbers as in the other
+    views.
+    """
+
+    """ ------------------------ Display section title. ----------------------------- """
+
+    print("-"*100)
+    print("VIEW FILTERED TASKS\n")
+    print("Press Enter to skip any filter.\n")
+
+
+    """ ------------------------- Request the filters. ------------------------------ """
+
+    # Status filter.
+    status_choice = input("Enter 'c' to view completed tasks or 'i' to view incomplete tasks:\t").lower()
+    while status_choice not in ['c', 'i', '']:
+        print("\n\t** That choice is not a recognised option. **\n")
+        status_choice = input("Enter 'c' to view completed tasks or 'i' to view incomplete tasks:\t").lower()
+
+    completed = {'c': True, 'i': False, '': None}[status_choice]
+
+    # Assigned person filter. Users other than "admin" may only view their own tasks.
+    if login_username == "admin":
+        assignee = input("Enter the username of the person assigned to the tasks:\t")
+        while assignee and assignee not in store.username_password.keys():
+            print("\n\t** User not recognised. **\n")
+            assignee = input("Enter the username of the person assigned to the tasks:\t")
+        assignee = assignee or None
+    else:
+        assignee = login_username
+
+    # Date filters.
+    due_from = request_optional_date("Enter the earliest Due Date")
+    due_to = request_optional_date("Enter the latest Due Date")
+    assigned_from = request_optional_date("Enter the earliest date assigned")
+    assigned_to = request_optional_date("Enter the latest date assigned")
+    updated_since = request_optional_date("Enter the earliest date last updated")
+
+
+    """ ----------------------- Display the matching tasks. ------------------------- """
+
+    # Find the matching tasks, and the corresponding "task_numbers".
+    filtered_task_list, task_numbers = store.filter_tasks(
+        completed=completed,
+        assignee=assignee,
+        due_from=due_from,
+        due_to=due_to,
+        assigned_from=assigned_from,
+        assigned_to=assigned_to,
+        updated_since=updated_since,
+    )
+
+    if not task_numbers:
+        print("\nThere are no tasks matching these filters.")
+
+        # Exit the function, return to Main Menu.
+        return
+
+    print(f"\nThe number of tasks matching these filters is: \t{len(task_numbers)}")
+
+    # Display the tasks with their task numbers from the "master_task_list".
+    display_task_list("vm", filtered_task_list, task_numbers)
+
+    # Allow the user to edit the matching tasks if desired.
+    edit_task(store, filtered_task_list, task_numbers)
+
+
+
+
+def search_tasks(store, login_username):
+    """
+    This function displays the tasks whose title or description contains all of the words
+    entered by the user.
+
+    The function is called when the user selects 's' at the Main Menu.
+
+    A word ending with '*' matches any word starting with the rest of the word. The tasks
+    are found with the search index of the task store (see TaskStore.search_tasks()),
+    and are displayed with their task numbers from the "master_task_list".
+
+    The "admin" user can edit the displayed tasks from this view.
+    """
+
+    """ ------------------------ Display section title. ----------------------------- """
+
+    print("-"*100)
+    print("SEARCH TASKS\n")
+
+
+    """ -------------------------- Request the search. ------------------------------ """
+
+    query = input("Please enter the words to search for (end a word with '*' to match the start of a word):\t")
+    while not query.strip():
+        print("\n\t** Please enter at least one word. **\n")
+        query = input("Please enter the words to search for (end a word with '*' to match the start of a word):\t")
+
+
+    """ ----------------------- Display the matching tasks. ------------------------- """
+
+    found_task_list, task_numbers = store.search_tasks(query)
+
+    if not task_numbers:
+        print("\nNo tasks were found.")
+
+        # Exit the function, return to Main Menu.
+        return
+
+    print(f"\nThe number of tasks found is: \t{len(task_numbers)}")
+
+    display_task_list("vm", found_task_list, task_numbers)
+
+    if login_username == "admin":
+        edit_task(store, found_task_list, task_numbers)
+
+
+
+
+def request_optional_date(prompt):
+    """
+    This function requests input of a date in the format "YYYY-MM-DD", using the given
+    "prompt".
+
+    It returns the date as a datetime, or None if the user presses Enter without typing
+    a date.
+    """
+
+    while True:
+        try:
+
+            input_date = input(f"{prompt} (Format: YYYY-MM-DD):\t")
+
+            # An empty input skips the date.
+            if not input_date:
+                return None
+
+            return parse_date(input_date)
+
+        except ValueError:
+            print("\n\t** Invalid date-time format. Please use the format specified. **\n")
+
+
+
+
+def display_task_list(mode, list_to_display, corresponding_numbers, page_size=TASKS_PER_PAGE):
+    """
+    This function displays a given list of tasks in a readable format, one page at a time.
+
+    The function is called within the view_all(), view_mine(), view_due(),
+    view_filtered() and search_tasks() functions.
+
+    Parameters:
+
+        "mode" =                    the function calling display_task_list():
+                                        - "va" = view_all()
+                                        - "vm" = view_mine() (and view_filtered(),
+                                          search_tasks())
+                                        - "vd" = view_due()
+
+        "list_to_display" =         the list of tasks to be displayed
+
+        "corresponding_numbers" =   the list of task numbers corresponding to the tasks
+                                    within the "list_to_display"
+
+        "page_size" =               the number of tasks displayed on each page
+                                    (default: "TASKS_PER_PAGE")
+
+    Only the tasks on the current page are read from the "list_to_display", and each page
+    is printed all at once. If there is more than one page, the user can move to the
+    next or previous page or jump to a page number, until they choose to stop viewing.
+    """
+
+    # The total number of pages (at least one).
+    num_pages = max((len(list_to_display) + page_size - 1) // page_size, 1)
+
+    # Start from the first page.
+    page = 0
+
+    while True:
+
+        # Find the position of the first and last tasks on the current page.
+        start = page * page_size
+        stop = start + page_size
+
+        # Read only the tasks on the current page.
+        page_tasks = list_to_display[start:stop]
+
+
+        """ -------------------- Mode "va" - VIEW ALL TASKS. ------------------------ """
+
+        # The "list_to_display" takes the "master_task_list" as an argument.
+        # The "corresponding_numbers" are sourced by enumerating "master_task_list".
+
+        if mode == "va":
+            page_numbers = range(start + 1, start + 1 + len(page_tasks))
+
+
+            """ ---------------- Mode "vm" - VIEW MY TASKS. ------------------------- """
+
+            # The "list_to_display" takes the "user_task_list" as an argument.
+            # The "corresponding_numbers" list receives the "task_numbers" list which
+            # contains only the corresponding task numbers for the "user_task_list".
+            # (The "task_numbers" list is generated by the get_user_task_numbers() method
+            # called by the view_mine() function.)
+            # Mode "vd" (VIEW TASKS DUE SOON) displays a list of tasks due soon in the same
+            # way.
+
+        elif mode == "vm" or mode == "vd":
+            page_numbers = corresponding_numbers[start:stop]
+
+
+        """ ------------------- Display the page of tasks. -------------------------- """
+
+        # There is nothing to display for an empty list.
+        if not page_tasks:
+            return
+
+        # Join each task and its corresponding task number into the text of the page.
+        page_text = "\n".join(
+            format_task(task_number, task) for task_number, task in zip(page_numbers, page_tasks)
+        )
+
+        # Show the page number if there is more than one page.
+        if num_pages > 1:
+            page_text += f"\nPage {page + 1} of {num_pages}"
+
+        # Display the whole page at once.
+        print(page_text)
+
+        # A single page does not need to be navigated.
+        if num_pages == 1:
+            return
+
+
+        """ ---------------------- Choose the next page to view. -------------------- """
+
+        page = choose_page(page, num_pages)
+
+        # Stop viewing the list if the user chooses to.
+        if page is None:
+            return
+
+
+
+
+def choose_page(page, num_pages):
+    """
+    This function asks the user which page of a list of tasks to view next.
+
+    Parameters:
+
+        "page" =        the current page (the first page is page 0)
+
+        "num_pages" =   the total number of pages
+
+    It returns the next page to view, or None if the user chooses to stop viewing.
+    """
+
+    while True:
+
+        # Request input of the next page.
+        page_choice = input(
+            "\nEnter 'n' for the next page, 'p' for the previous page, a page number to "
+            "jump to that page, or 'q' to stop viewing:\n\n"
+            ).lower()
+
+        # Next page.
+        if page_choice == 'n' and page + 1 < num_pages:
+            return page + 1
+
+        # Previous page.
+        if page_choice == 'p' and page > 0:
+            return page - 1
+
+        # Stop viewing.
+        if page_choice == 'q':
+            return None
+
+        # Jump to a page number.
+        if page_choice.isdigit() and 1 <= int(page_choice) <= num_pages:
+            return int(page_choice) - 1
+
+        # Show an error message if the choice is not a valid page.
+        print("\n\t** That choice is not a recognised option. **")
+
+
+
+
+def format_task(task_number, task_to_display):
+    """
+    This function returns a single task as a string in a readable format, between two
+    dividers.
+
+    Each "task_to_display" is shown with the corresponding "task_number".
+    """
+
+    """ -------------- Generate a string containing the task details. --------------- """
+
+    # Task title.
+    task_details = f"Task {task_number}: \t\t {task_to_display.title}\n"
+
+    # Assigned person.
+    task_details += f"Assigned to: \t\t {task_to_display.username}\n"
+
+    # Date assigned.
+    task_details += f"Date assigned: \t\t {task_to_display.assigned_date.strftime(DATETIME_STRING_FORMAT)}\n"
+
+    # Due date.
+    task_details += f"Due Date: \t\t {task_to_display.due_date.strftime(DATETIME_STRING_FORMAT)}\n"
+
+    # Updated date - may not be present for all tasks.
+    if task_to_display.updated_date is not None:
+        task_details += f"Last updated: \t\t {task_to_display.updated_date}\n"
+    else:
+        pass
+
+    # Current status.
+    if task_to_display.completed == True:
+        task_details += "Current status: \t Completed\n"
+    elif task_to_display.completed == False:
+        task_details += "Current status: \t Incomplete\n"
+
+    # Task description.
+    task_details += f"Task Description: \n {task_to_display.description}"
+
+
+    """ ------------- Add a divider before and after the task for readability. ------- """
+
+    return "-"*40 + "\n" + task_details + "\n" + "-"*40
+
+
+
+
+def display_task(task_number, task_to_display):
+    """
+    This function displays a single task in a readable format.
+
+    The function is called by edit_task() to display the task being edited.
+
+    Each "task_to_display" is printed with the corresponding "task_number" (see
+    format_task()).
+    """
+
+    print(format_task(task_number, task_to_display))
+
+
+
+
+def edit_task(store, display_list, task_numbers):
+    """
+    This function allows the user to edit the tasks that are assigned to them if desired.
+    The user may select "-1" from within the Edit Task Menu to return to the Main Menu.
+
+    When the user chooses to edit a task, they can choose to:
+        - mark the task as complete,
+        - amend the task (e.g. update assigned person, update due date).
+
+    Each chosen task number is checked against the "task_numbers" of the displayed
+    tasks, and the task is then read from the store by its task number, so choosing a
+    task takes the same time however many tasks are displayed.
+    """
+
+    # Store the "task_numbers" as a set, so that each choice is checked straight away.
+    # (A range already checks if it contains a number straight away.)
+    if not isinstance(task_numbers, range):
+        task_numbers = set(task_numbers)
+
+    # Allow the user to edit tasks until they choose to exit.
+    while True:
+
+        # Print a divider for ease-of-reading.
+        print("-"*100)
+
+
+        """ ------------- Ask the user if they wish to edit a task. ----------------- """
+
+        # Until the user enters their choice, "awaiting_choice" remains True.
+        awaiting_choice = True
+        while awaiting_choice:
+
+            # Request user input of choice to edit a task or to exit.
+            continue_choice = input("Would you like to edit a task? (Enter 'y' or 'n'):\n\n").lower()
+
+            # If the user selects a valid option, break while-loop.
+            if continue_choice == 'y' or continue_choice == 'n':
+                awaiting_choice = False
+                break
+
+            # If the user does not select a valid option, show an error message.
+            print("\n\t** That choice is not a recognised option. **\n")
+
+
+        """ --------------- If user does not wish to edit tasks. -------------------- """
+
+        if continue_choice == 'n':
+            # Return from the edit_task() function to the Main Menu.
+            return
+
+
+        """ ------------------ If user chooses to edit tasks. ----------------------- """
+
+        # Only incomplete tasks within the user's task list may be edited by the user.
         # The "admin" user can edit tasks that are not assigned to them through the VIEW
         # ALL TASKS menu option.
 
@@ -651,27 +5292,27 @@ def edit_task(full_list, display_list, task_numbers):
 
                         # Request input of either a task number to edit, or "-1" to exit.
                         edit_choice = int(input("\nPlease select a task to edit (e.g. to select Task 1, enter '1') or enter '-1' to return to the Main Menu:\n\n"))
-                        
+
                         # If user selects "-1", return from the function to the Main Menu.
                         if int(edit_choice) == -1:
                             return
-                        
+
                         # If the user does not select one of their own tasks:
                         if int(edit_choice) not in task_numbers:
 
                             # If the choice is recognised in the "master_task_list":
-                            if int(edit_choice)-1 in range(len(full_list)):
+                            if int(edit_choice)-1 in range(len(store.master_task_list)):
                                 # Raise an "in_range" "NotInListError" Exception.
                                 raise NotInListError("in_range")
-                            
+
                             # If the choice is not recognised in the "master_task_list":
                             else:
                                 # Raise an "out_of_range" "NotInListError" Exception.
                                 raise NotInListError("out_of_range")
-           
+
                         # Break the nested try-except when all conditions are satisfied.
                         break
-                            
+
                     except ValueError:
                         print("\n\t** Please enter a number only. **")
 
@@ -680,791 +5321,1001 @@ def edit_task(full_list, display_list, task_numbers):
                         print(error)
 
 
-                # Find the list index of the selected task.
-                index_of_choice = task_numbers.index(edit_choice)
-
-                # If the chosen task is already complete:
-                if display_list[index_of_choice]["completed"] == True:
+                # If the chosen task is already complete (the task is read from the store,
+                # so that any edits made since the list was displayed are included):
+                if store.get_task(edit_choice).completed == True:
                     # Raise a "TaskAlreadyComplete" Exception.
                     raise TaskAlreadyComplete
-                
+
                 # Break parent try-except when all conditions are satisfied.
                 break
 
-            except TaskAlreadyComplete as error:
+            except TaskAlreadyComplete as error:
+                print(error)
+
+
+        """ ------------------ Display EDIT TASK section heading. ------------------- """
+
+        print("-"*100)
+        print(f"EDIT TASK {edit_choice}\n")
+
+
+        """ --------------------- Display the selected task. ------------------------ """
+
+        # Display the selected task for ease of user review.
+        display_task(edit_choice, store.get_task(edit_choice))
+
+
+        """ ------------------- Present a menu of edit options. --------------------- """
+
+        # Request input of a selected menu option by the user.
+        option_selection = input(
+            "Please select an option:\n"
+                "\nmc - mark task as complete\n"
+                "a - assign task to a different user\n"
+                "d - update Due Date\n\n"
+            ).lower()
+
+        # Perform input validation.
+        while option_selection not in ["mc", 'a', 'd']:
+
+            # Show an error message if the "option_selection" is not "mc", 'a', or 'd'.
+            print("\n\t** That choice is not a recognised option. **")
+
+            # Request input of another option until the user chooses a correct option.
+            option_selection = input(
+                "\nPlease select an option:\n"
+                    "\nmc - mark task as complete\n"
+                    "a - assign task to a different user\n"
+                    "d - update due date\n\n"
+                ).lower()
+
+
+        """ ---------------- Option "mc" - Mark a task as complete. ----------------- """
+
+        if option_selection == "mc":
+
+            # Mark the selected task as complete and record the update. (Another user
+            # of the Task Manager may have completed the task since it was displayed.)
+            try:
+                store.edit_task(edit_choice, mark_complete=True)
+            except TaskAlreadyComplete as error:
+                print(error)
+            else:
+                # Display an update message for the user.
+                print("\nThis task has been marked as complete.")
+
+
+            """ ---------------- Option 'a' - Re-assign a task. --------------------- """
+
+        elif option_selection == 'a':
+
+            """ Get the username of the "new_assignee".
+            """
+            # Request input of the username of the "new_assignee".
+            new_assignee = input("\nPlease enter the username of the person you wish to assign to this task:\t")
+
+            # Perform input validation to ensure the username is a registered user.
+            while new_assignee not in store.username_password.keys():
+
+                # Display an error message if the username is not registered.
+                print("\n\t** User not recognised. **")
+
+                # Ask the user to input a correct, registered username.
+                new_assignee = input("\nPlease enter the username of the person you wish to assign to this task:\t")
+
+            """ Re-assign the task.
+            """
+            # Assign the "new_assignee" to the selected task and record the update.
+            # (Another user of the Task Manager may have completed the task since it was
+            # displayed.)
+            try:
+                store.edit_task(edit_choice, new_assignee=new_assignee)
+            except (TaskAlreadyComplete, UserNotRecognised) as error:
+                print(error)
+            else:
+                # Display an update messagee for the user.
+                print(f"\nThis task has been successfully assigned to {new_assignee}.")
+
+
+            """ ---------- Option 'd' - Change the due date of a task. -------------- """
+
+        elif option_selection == 'd':
+
+            # Perform input validation using a try-except block.
+            while True:
+                try:
+
+                    # Request input of a new due date for the task.
+                    input_date = input("\nPlease enter a new Due Date for the task (Format: YYYY-MM-DD): ")
+
+                    # Store the "new_due_date" in the correct format.
+                    new_due_date = parse_date(input_date)
+
+                    # Break the try-except block once the date format is correct.
+                    break
+
+                except ValueError:
+                    print("\n\t** Invalid date-time format. Please use the format specified. **")
+
+            # Assign the "new_due_date" to the selected task and record the update.
+            # (Another user of the Task Manager may have completed the task since it was
+            # displayed.)
+            try:
+                store.edit_task(edit_choice, new_due_date=new_due_date)
+            except TaskAlreadyComplete as error:
+                print(error)
+            else:
+                # Display an update message for the user.
+                print(f"\nThis task is now due on {new_due_date.strftime(DATETIME_STRING_FORMAT)}.")
+
+
+
+
+def bulk_edit(store, login_username):
+    """
+    This function permits the "admin" user to make the same change to many tasks at once
+    (e.g. to re-assign all of the tasks of someone who has left the team).
+
+    The function is called when the user selects "be" at the Main Menu.
+
+    The tasks are chosen either by filters (assigned person and due date range) or by a
+    list of task numbers. Only incomplete tasks are changed. The chosen tasks can then be:
+        - marked as complete,
+        - assigned to a different user,
+        - given due dates a number of days later (or earlier).
+
+    All of the chosen tasks are changed and stored together (see TaskStore.edit_tasks()).
+    """
+
+    """ ------------------------ Display section title. ----------------------------- """
+
+    print("-"*100)
+    print("BULK EDIT TASKS\n")
+
+
+    """ ------------------ If the user is not the "admin" user. ----------------------"""
+
+    if login_username != "admin":
+
+        # Show an error message to the user.
+        print("Sorry, you are not authorised to edit tasks in bulk.")
+
+        # Return to the Main Menu.
+        return
+
+
+    """ ------------------------- Choose the tasks to edit. ------------------------- """
+
+    select_choice = input("Enter 'f' to choose tasks by filters or 'n' to enter a list of task numbers:\t").lower()
+    while select_choice not in ['f', 'n']:
+        print("\n\t** That choice is not a recognised option. **\n")
+        select_choice = input("Enter 'f' to choose tasks by filters or 'n' to enter a list of task numbers:\t").lower()
+
+    # Choose the incomplete tasks matching the filters.
+    if select_choice == 'f':
+        print("Press Enter to skip any filter.\n")
+
+        assignee = input("Enter the username of the person assigned to the tasks:\t")
+        while assignee and assignee not in store.username_password.keys():
+            print("\n\t** User not recognised. **\n")
+            assignee = input("Enter the username of the person assigned to the tasks:\t")
+
+        due_from = request_optional_date("Enter the earliest Due Date")
+        due_to = request_optional_date("Enter the latest Due Date")
+
+        task_numbers = store.filter_tasks(completed=False, assignee=assignee or None,
+                                          due_from=due_from, due_to=due_to)[1]
+
+    # Choose the tasks with the given task numbers.
+    else:
+        while True:
+            try:
+                number_input = input("Enter the task numbers, separated by commas (e.g. '1, 4, 7'):\t")
+                task_numbers = [int(number) for number in number_input.split(',')]
+
+                # Every task number must be recognised.
+                for task_number in task_numbers:
+                    store.get_task(task_number)
+
+                break
+
+            except ValueError:
+                print("\n\t** Please enter numbers only. **\n")
+
+            except NotInListError as error:
+                print(error)
+
+    # Only incomplete tasks may be edited.
+    task_numbers = [task_number for task_number in task_numbers if not store.get_task(task_number).completed]
+
+    if not task_numbers:
+        print("\nThere are no incomplete tasks to edit.")
+
+        # Exit the function, return to Main Menu.
+        return
+
+    print(f"\nThe number of incomplete tasks chosen is: \t{len(task_numbers)}\n")
+
+
+    """ ------------------- Present a menu of edit options. ------------------------- """
+
+    option_selection = input(
+        "Please select an option:\n"
+            "\nmc - mark tasks as complete\n"
+            "a - assign tasks to a different user\n"
+            "d - move Due Dates by a number of days\n\n"
+        ).lower()
+
+    while option_selection not in ["mc", 'a', 'd']:
+        print("\n\t** That choice is not a recognised option. **")
+        option_selection = input(
+            "\nPlease select an option:\n"
+                "\nmc - mark tasks as complete\n"
+                "a - assign tasks to a different user\n"
+                "d - move Due Dates by a number of days\n\n"
+            ).lower()
+
+
+    """ ------------------------- Apply the change. --------------------------------- """
+
+    # Mark the chosen tasks as complete.
+    if option_selection == "mc":
+        edited_numbers = store.edit_tasks(task_numbers, mark_complete=True)
+        print(f"\n{len(edited_numbers)} tasks have been marked as complete.")
+
+    # Re-assign the chosen tasks.
+    elif option_selection == 'a':
+        new_assignee = input("\nPlease enter the username of the person you wish to assign to these tasks:\t")
+        while new_assignee not in store.username_password.keys():
+            print("\n\t** User not recognised. **")
+            new_assignee = input("\nPlease enter the username of the person you wish to assign to these tasks:\t")
+
+        edited_numbers = store.edit_tasks(task_numbers, new_assignee=new_assignee)
+        print(f"\n{len(edited_numbers)} tasks have been successfully assigned to {new_assignee}.")
+
+    # Move the due dates of the chosen tasks.
+    elif option_selection == 'd':
+        while True:
+            try:
+                shift_due_days = int(input("\nPlease enter the number of days to move the Due Dates by (e.g. '7', or '-7' for earlier):\t"))
+                edited_numbers = store.edit_tasks(task_numbers, shift_due_days=shift_due_days)
+                break
+            except ValueError:
+                print("\n\t** Please enter a number only. **")
+
+            # No task has been changed if any due date cannot be moved that far.
+            except InvalidDueDate as error:
                 print(error)
 
+        print(f"\nThe Due Dates of {len(edited_numbers)} tasks have been moved by {shift_due_days} days.")
 
-        """ ------------------ Display EDIT TASK section heading. ------------------- """
-
-        print("-"*100)
-        print(f"EDIT TASK {edit_choice}\n")
 
 
-        """ ------------ Store the current values for the selected task. ------------ """
 
-        # Store the task to be edited in a temporary dictionary.
-        edited_task = display_list[index_of_choice]
+def generate_reports(store):
+    """
+    This function displays reports on all of the tasks stored in the Task Manager.
 
-        # Store the index of the "edited_task" from the "master_task_list".
-        editing_index = full_list.index(edited_task)
+    The function is called when the user selects "gr" at the Main Menu.
 
+    The reports are generated by the task store (see TaskStore.generate_reports()),
+    and are printed in a user-friendly, readable manner. They are separated into two
+    sections:
+        - Task Overview,
+        - User Overview.
 
-        """ --------------------- Display the selected task. ------------------------ """
-        
-        # Display the selected task for ease of user review.
-        display_task(edit_choice, display_list[index_of_choice])
+    The reports are also stored separately within similarly named text files:
+        - "task_overview.txt",
+        - "user_overview.txt".
+    """
 
+    """ ------------------------ Display section title. ----------------------------- """
 
-        """ ------------------- Present a menu of edit options. --------------------- """
+    print("-"*100)
+    print("GENERATE REPORTS\n")
 
-        # Request input of a selected menu option by the user.
-        option_selection = input(
-            "Please select an option:\n"
-                "\nmc - mark task as complete\n"
-                "a - assign task to a different user\n"
-                "d - update Due Date\n\n"
-            ).lower()
-        
-        # Perform input validation.
-        while option_selection not in ["mc", 'a', 'd']:
 
-            # Show an error message if the "option_selection" is not "mc", 'a', or 'd'.
-            print("\n\t** That choice is not a recognised option. **")
+    """ ------------------------ Generate the reports. ------------------------------ """
 
-            # Request input of another option until the user chooses a correct option.
-            option_selection = input(
-                "\nPlease select an option:\n"
-                    "\nmc - mark task as complete\n"
-                    "a - assign task to a different user\n"
-                    "d - update due date\n\n"
-                ).lower()
+    report = store.generate_reports()
 
 
-        """ ---------------- Option "mc" - Mark a task as complete. ----------------- """
+    """ ------------------ Display the Task Overview for the user. ------------------ """
 
-        if option_selection == "mc":
+    # Display sub-section heading.
+    print("-"*80)
+    print("***** Task Overview *****\n")
 
-            # Change the value of "completed" to True in the "edited_task".
-            edited_task["completed"] = True
+    # Display the Task Overview for the user.
+    for statement in format_task_overview(report):
+        print(statement)
 
-            # Display an update message for the user.
-            print("\nThis task has been marked as complete.")
+    # Print a divider.
+    print("-"*80 + "\n")
 
 
-            """ ---------------- Option 'a' - Re-assign a task. --------------------- """
+    """ ------------------ Display the User Overview for the user. ------------------ """
 
-        elif option_selection == 'a':
+    # Display sub-section heading.
+    print("-"*80)
+    print("***** User Overview *****\n")
 
-            """ Get the username of the "new_assignee".
-            """
-            # Request input of the username of the "new_assignee".
-            new_assignee = input("\nPlease enter the username of the person you wish to assign to this task:\t")
-            
-            # Perform input validation to ensure the username is a registered user.
-            while new_assignee not in username_password.keys():
+    for statement in format_user_overview(report):
+        print(statement)
 
-                # Display an error message if the username is not registered.
-                print("\n\t** User not recognised. **")
+    # Print a divider.
+    print("-"*80)
 
-                # Ask the user to input a correct, registered username.
-                new_assignee = input("\nPlease enter the username of the person you wish to assign to this task:\t")
-    
-            """ Re-assign the task.
-            """
-            # Assign the "new_assignee" to the "edited_task".
-            edited_task["username"] = new_assignee
 
-            # Display an update messagee for the user.
-            print(f"\nThis task has been successfully assigned to {new_assignee}.")
 
 
-            """ ---------- Option 'd' - Change the due date of a task. -------------- """
+def display_statistics(store, login_username):
+    '''
+    This function permits the "admin" user to display statistics about the number of
+    users and tasks without generating full reports.
 
-        elif option_selection == 'd':
+    The statistics are provided by the task store (see TaskStore.display_statistics()).
+    '''
 
-            # Perform input validation using a try-except block.
-            while True:
-                try:
+    """ Display a section heading.
+    """
+    print("-"*100)
+    print("DISPLAY STATISTICS\n")
 
-                    # Request input of a new due date for the task.
-                    input_date = input("\nPlease enter a new Due Date for the task (Format: YYYY-MM-DD): ")
 
-                    # Store the "new_due_date" in the correct format.
-                    new_due_date = datetime.strptime(input_date, DATETIME_STRING_FORMAT)
+    """ ------------------ If the user is not the "admin" user. ----------------------"""
 
-                    # Break the try-except block once the date format is correct.
-                    break
+    if login_username != "admin":
 
-                except ValueError:
-                    print("\n\t** Invalid date-time format. Please use the format specified. **")
-            
-            # Assign the "new_due_date" to the "edited_task".
-            edited_task["due_date"] = new_due_date
+        # Show an error message to the user.
+        print("Sorry, you are not authorised to display statistics.")
 
-            # Display an update message for the user.
-            print(f"\nThis task is now due on {new_due_date.strftime(DATETIME_STRING_FORMAT)}.")
+        # Return to the Main Menu.
+        return
 
 
-        """ --------- If a task has been updated, set an "updated" status. ---------- """
+        """ ---------------- If the user is the "admin" user. ------------------------"""
 
-        # Set an "updated" key status for the "edited_task".
-        edited_task["updated"] = True
+    elif login_username == "admin":
 
-        # Add an "updated_date" to the "edited_task" dictionary.
-        edited_task["updated_date"] = date.today().strftime(DATETIME_STRING_FORMAT)
+        # Calculate the total number of users and tasks.
+        total_users, total_tasks = store.display_statistics()
 
+        # Display the statistics for the user in a readable format.
+        print("------------------------------------")
+        print(f"Total number of users: \t\t {total_users}")
+        print(f"Total number of tasks: \t\t {total_tasks}")
+        print("------------------------------------")
 
-        """ ---------- Update the "master_task_list" and "user_task_list". ---------- """
 
-        # Assign the "edited_task" dictionary to the appropriate index in both the
-        # "full_list" and to the "display_list".
 
-        # Updating the "full_list" updates the "master_task_list".
-        full_list[editing_index] = edited_task
 
-        # Updating the "display_list" updates the "user_task_list" if the Edit Task Menu
-        # has been accessed through the view_mine() function.
-        display_list[index_of_choice] = edited_task
 
 
-        """ -------------- Write all updates to the "tasks.txt" file. --------------- """
 
-        write_tasks_to_file(full_list)
+# ----------------------------- Requesting user login. ----------------------------------
 
+def login(store):
+    '''
+    This function controls user login, and returns the "login_username" of the user who
+    has logged in.
 
+    The user is requested to enter their "login_username" and "login_password". The
+    input is compared against the registered users in the task store, and if the input
+    is recognised, the user is granted login. Otherwise, the user will be prompted to
+    re-enter the correct details.
 
+    The "login_username" is passed to the Main Menu functions as a means of determining
+    the current user's access privileges.
+    '''
 
-def generate_reports():
-    """
-    This function generates reports on all of the tasks stored in the Task Manager.
+    # Initial login state is set to False.
+    logged_in = False
 
-    The function is called when the user selects "gr" at the Main Menu.
+    # Show LOGIN menu to user until successful login with recognised values.
+    while not logged_in:
 
-    The reports are printed in a user-friendly, readable manner and are separated into
-    two sections:
-        - Task Overview,
-        - User Overview.
-    
-    The function also stores the reports separately within similarly named text files:
-        - "task_overview.txt",
-        - "user_overview.txt".
+        # Print a divider and menu message for readability.
+        print("-"*100)
+        print("LOGIN\n")
 
-    Task Overview displays:
-        - the total number of tasks that have been generated and tracked by the Task
-          Manager,
-        - the total number of completed tasks,
-        - the total number of incomplete tasks,
-        - the total number of tasks that are incomplete and overdue,
-        - the percentage of all tasks that are incomplete,
-        - the percentage of all tasks that are overdue.
+        # Ask the user to input their username.
+        login_username = input("Username:\t")
 
-    User Overview displays:
-        - the total number of users that are registered in the Task Manager,
-        - the total number of tasks that have been generated and tracked by the Task
-          Manager,
-        - a breakdown report for each user including:
-            - the total number of tasks assigned to the user,
-            - the percentage of total tasks assigned to the user,
-            - the percentage of the user's tasks that are complete,
-            - the percentage of the user's tasks that are incomplete,
-            - the percentage of the user's tasks that are incomplete and overdue.
-    """
+        # If the username input is not found in the "users.txt" file, display error message.
+        if login_username not in store.username_password.keys():
+            print("\n\t** That user does not exist. **")
+            # Proceed to display LOGIN menu again, and ask for re-input of username.
+            continue
 
-    """ ------------------------ Display section title. ----------------------------- """
+        # Ask the user to input their password.
+        login_password = input("Password:\t")
 
-    print("-"*100)
-    print("GENERATE REPORTS\n")
+        # If the password does not match the username, display an error message.
+        if not store.check_password(login_username, login_password):
+            print("\n\t** Incorrect password. **")
+            # Proceed to LOGIN menu again, to ask for re-input of username and password.
+            continue
 
+        # Login is successful if the username and password are recognised as matching.
+        else:
+            print("\nLogin successful!")
+            logged_in = True
 
+    return login_username
 
-    """ -*-*-*-*-*-*-*-*-*-*-*-* Generate Task Overview. *-*-*-*-*-*-*-*-*-*-*-*-*-*- """
 
-    """ Display sub-section heading.
-    """
-    print("-"*80)
-    print("***** Task Overview *****\n")
 
 
-    """ ------------------ Calculate the total number of tasks. --------------------- """
 
-    total_num_tasks = len(master_task_list)
 
 
-    """ ----------------- If there are tasks in the Task Manager. ------------------- """
+# ------------------------------ Displaying Main Menu. ----------------------------------
 
-    if total_num_tasks:
+def main_menu(store, login_username):
+    """
+    This function presents the Main Menu to the user.
+    The menu will continue to be presented until the user chooses option 'e' to exit.
+    """
 
-        """ Calculate the total number of completed tasks.
-        """ # Count completed tasks in "master_task_list".
-        completed_tasks = (
-            count_occurrences(master_task_list, "completed", True)
-        )
+    # Initialise "done" variable for later control of program exit.
+    done = False
 
-        """ Calculate the total number of incomplete tasks.
-        """ # Count incomplete tasks in "master_task_list".
-        incomplete_tasks = (
-            count_occurrences(master_task_list, "completed", False)
-        )
+    while not done:
 
-        """ Calculate the total number of overdue tasks and total number of tasks that
-            are both incomplete and overdue.
-        """
-        # Initialise empty lists to count the relevant occurrences.
-        overdue = []
-        incomplete_overdue = []
+        # Make sure that any changes made with the last option are synced to disk.
+        store.sync_journal()
 
-        # Iterate through all of the tasks in the Task Manager.
-        for task in master_task_list:
-            
-            # If a task is overdue, add a counter 'x' to the list "overdue".
-            if (task["due_date"]).date() < (date.today()):
-                overdue.append('x')
+        # Apply any changes made by other users of the Task Manager since the last option,
+        # so they are shown in the lists and reports.
+        store.refresh()
 
-                # If the task is also incomplete, add a counter 'x' to the list "incomplete_overdue".
-                if (task["completed"] == False):
-                    incomplete_overdue.append('x')
 
-        # Count the number of overdue tasks.
-        overdue_tasks = len(overdue)
+        """ ----------------------- Request user menu choice. ----------------------- """
 
-        # Count the number of tasks that are both incomplete and overdue.
-        incomplete_overdue_tasks = len(incomplete_overdue)
-        
-        """ Calculate the percentage of tasks that are incomplete.
-        """
-        percent_incomplete = round((incomplete_tasks / total_num_tasks)*100, 2)
+        print("-"*100)
+        print("Welcome to the Main Menu!")
+
+        # User input is converted to lowercase.
+        menu_choice = input(
+            "Please select one of the following options:\n"
+                "\nr - registering a user\n"
+                "a - adding a task\n"
+                "va - view all tasks\n"
+                "vm - view my tasks\n"
+                "vd - view tasks due soon\n"
+                "vf - view filtered tasks\n"
+                "s - search tasks\n"
+                "gr - generate reports\n"
+                "ds - display statistics\n"
+                "be - bulk edit tasks\n"
+                "e - exit\n\n"
+            ).lower()
 
-        """ Calculate the percentage of tasks that are overdue.
-        """
-        percent_overdue = round((overdue_tasks / total_num_tasks)*100, 2)
 
+        """ ---------------------- Option 'r' - add new user. ----------------------- """
 
-        """ ------------- If there no tasks found in the Task Manager. -------------- """
+        if menu_choice == 'r':
+            reg_user(store)
 
-    else:
-        # Set values for the required variables to avoid zero division errors.
-        completed_tasks = 0
-        incomplete_tasks = 0
-        incomplete_overdue_tasks = 0
-        percent_incomplete = 0
-        percent_overdue = 0
 
+            """ ------------------ Option 'a' - add new task. ----------------------- """
 
-    """ ------------------ Display the Task Overview for the user. ------------------ """
+        elif menu_choice == 'a':
+            add_task(store)
 
-    # Store each statement within a "task_overview_list".
-    task_overview_list = [
 
-        # Total tasks.
-        f"The total number of tasks that have been generated is: \t\t\t{total_num_tasks}",
+            """ ----------------- Option "va" - view all tasks. --------------------- """
 
-        # Completed tasks.
-        f"The total number of completed tasks is: \t\t\t\t{completed_tasks}",
+        elif menu_choice == 'va':
+            view_all(store, login_username)
 
-        # Incomplete tasks.
-        f"The total number of incomplete tasks is: \t\t\t\t{incomplete_tasks}",
 
-        # Incomplete and overdue tasks.
-        f"The total number of tasks that are incomplete and overdue is: \t\t{incomplete_overdue_tasks}",
+            """ ------------------ Option "vm" - view my tasks. --------------------- """
 
-        # Percentage incomplete.
-        f"The percentage of tasks that are incomplete is: \t\t\t{percent_incomplete}%",
+        elif menu_choice == 'vm':
+            view_mine(store, login_username)
 
-        # Percentage overdue.
-        f"The percentage of tasks that are overdue is: \t\t\t\t{percent_overdue}%"
-    ]
 
-    # Display the Task Overview for the user.
-    for statement in task_overview_list:
-        print(statement)
+            """ --------------- Option "vd" - view tasks due soon. ------------------ """
 
-    # Print a divider.
-    print("-"*80 + "\n")
+        elif menu_choice == 'vd':
+            view_due(store, login_username)
 
 
-    """ --------- Write the Task Overview to the "task_overview.txt" file. ---------- """
-    
-    # Generate the "task_overview.txt" file and add a heading.
-    with open("task_overview.txt", 'w',  encoding="utf-8") as file:
-        file.write("-------------------------------- Task Overview --------------------------------\n\n")
+            """ ---------------- Option "vf" - view filtered tasks. ----------------- """
 
-    # Write the Task Overview into the "task_overview.txt" file.
-    for statement in task_overview_list:
-        with open("task_overview.txt", 'a',  encoding="utf-8") as file:
-            file.write(statement)
-            # End each statement with a new line character.
-            file.write("\n")
-    
+        elif menu_choice == 'vf':
+            view_filtered(store, login_username)
 
 
-    """ -*-*-*-*-*-*-*-*-*-*-*-* Generate User Overview. *-*-*-*-*-*-*-*-*-*-*-*-*-*- """
+            """ ------------------- Option 's' - search tasks. ---------------------- """
 
-    """ Display sub-section heading.
-    """
-    print("-"*80)
-    print("***** User Overview *****\n")
+        elif menu_choice == 's':
+            search_tasks(store, login_username)
 
 
-    """ -------------- Calculate the total number of registered users. -------------- """
-    
-    total_users = len(username_password)
+            """ ----------------- Option "gr" - generate reports. ------------------- """
 
-  
-    """ ---------------- Generate text to display in User Overview. ----------------- """
-    
-    # Store each statement within a "task_overview_list".
-    user_overview_list = [
+        elif menu_choice == "gr":
+            generate_reports(store)
 
-        # Total users.
-        f"The total number of users that are registered in the Task Manager is:\t{total_users}",
 
-        # Total tasks.
-        f"The total number of tasks that have been generated is:\t\t\t{total_num_tasks}",
+            """ ---------------- Option "ds" - display statistics. ------------------ """
 
-        "\n\n"
-    ]
-    
+        elif menu_choice == "ds":
+            display_statistics(store, login_username)
 
-    """ ------------------------ For each registered user: -------------------------- """
 
-    for user in username_password.keys():
+            """ ----------------- Option "be" - bulk edit tasks. -------------------- """
 
-        # Calculate the total number of assigned tasks.
-        user_tasks, task_nums = get_user_list(user)
-        assigned_tasks = len(user_tasks)
+        elif menu_choice == "be":
+            bulk_edit(store, login_username)
 
-        """ ------------------- If the user has assigned tasks. --------------------- """
 
-        if assigned_tasks:
-            
-            # Calculate the total number of completed tasks.
-            tasks_complete = count_occurrences(user_tasks, "completed", True)
+            """ ------------------- Option 'e' - exit program. ---------------------- """
 
-            # Calculate the total number of incomplete tasks.
-            tasks_incomplete = count_occurrences(user_tasks, "completed", False)
+        elif menu_choice == 'e':
 
-            # Calculate the percentage of tasks assigned to the user.
-            percent_of_total = round((assigned_tasks / total_num_tasks)*100, 2)
+            # Save the search index, so that it does not need to be built again.
+            store.save_search_index()
 
-            # Calculate the percentage of the user's tasks which are complete.
-            percent_complete = round((tasks_complete / assigned_tasks)*100, 2)
+            # Sync any changes to disk, and close the store's files.
+            store.close()
 
-            # Calculate the percentage of the user's tasks which are incomplete.
-            percent_incomplete_user = round((tasks_incomplete / assigned_tasks)*100, 2)
+            # Display exit message.
+            print('-'*100)
+            print("Goodbye!\n")
 
-            # Calculate the number of tasks that are both incomplete and overdue.
-            # Initialise a list to count the occurrences.
-            incomplete_overdue_count = []
-            # Iterate through all of the tasks assigned to the user.
-            for task in user_tasks:
-                # If a task is overdue, check if it's also incomplete.
-                if (task["due_date"]).date() < (date.today()):
-                    if (task["completed"] == False):
-                        # If the task is both incomplete and overdue, add a counter 'x' to the list.
-                        incomplete_overdue_count.append('x')
-            # Count the number of tasks that are both incomplete and overdue.
-            incomplete_overdue_user = len(incomplete_overdue_count)
+            # Set "done" to True to exit the Main Menu while-loop and exit the program.
+            done = True
 
-            # Calculate the percentage of the user's tasks that are both incomplete and overdue.
-            percent_incomplete_overdue = round((incomplete_overdue_user / assigned_tasks)*100, 2)
-            
 
-            """ -------------- If the user does not have any tasks. ----------------- """
+            """ ----------------------- Input validation. --------------------------- """
 
         else:
-            # Set values for the required variables to avoid zero division errors.
-            assigned_tasks = 0
-            tasks_complete = 0
-            tasks_incomplete = 0
-            percent_of_total = 0
-            percent_complete = 0
-            percent_incomplete_user = 0
-            percent_incomplete_overdue = 0
+            # Display error message for invalid menu choices.
+            print("\n\t** You have made an invalid choice. Please try again. **")
 
-        
-        """ ----------------- Generate text to display for each user. --------------- """
 
-        user_subheading = ("-"*15 + f" User Stats - {user} "+ "-"*15 + "\n")
-
-        # Store each statement within a "user_sublist".
-        user_sublist = [
 
-            # Include a subheading for the user.
-            user_subheading,
 
-            # Assigned tasks.
-            f"The total number of assigned tasks is: \t\t\t\t\t{assigned_tasks}",
 
-            # Percentage of total tasks.
-            f"As a percentage of all tasks this is: \t\t\t\t\t{percent_of_total}%",
 
-            # Percentage of tasks complete.
-            f"The percentage of tasks that are complete is: \t\t\t\t{percent_complete}%",
 
-            # Percentage of tasks incomplete.
-            f"The percentage of tasks that are incomplete is: \t\t\t{percent_incomplete_user}%",
+# ---------------------------------- Running commands. ----------------------------------
 
-            # Percentage of tasks that are incomplete and overdue.
-            f"The percentage of tasks that are incomplete and overdue is: \t\t{percent_incomplete_overdue}%\n"
-        ]
+# The default SQLite database of the SQLite task store (see sqlite_task_store.py), and
+# the default task file of the binary task store (see binary_task_store.py).
+DATABASE_FILE = "tasks.db"
+BINARY_FILE = "tasks.bin"
 
-        # Append the "user_sublist" to the "user_overview_list".
-        for statement in user_sublist:
-            user_overview_list.append(statement)
-        
 
-    """ ------------------ Display the User Overview for the user. ------------------ """
 
-    for statement in user_overview_list:
-        print(statement)
 
-    # Print a divider.
-    print("-"*80)
+def open_task_store(lazy=True):
+    """
+    This function opens the task store used by the program, and returns it.
 
+    Once the tasks have been migrated, the SQLite database is used, and once they have
+    been converted, the binary task file is used. Otherwise, the tasks and users are
+    loaded from "tasks.txt" and "users.txt":
 
-    """ -------- Write the User Overview to the "user_overview.txt" file. ----------- """
+        - in lazy mode (the default), each task is only parsed when it is first used, so
+          the store opens straight away,
+        - otherwise, all tasks are loaded into packed columns, so that reports and
+          filters over all of the tasks are quick (reports are built with NumPy if it is
+          installed).
+    """
 
-    # Generate the "user_overview.txt" file and add a heading.
-    with open("user_overview.txt", 'w',  encoding="utf-8") as file:
-        file.write("-------------------------------- User Overview --------------------------------\n\n")
+    # The storage backends are only imported when they are used. (They import this
+    # module, so they cannot be imported at the top of it.)
 
-    # Write the User Overview into the "user_overview.txt" file.
-    for statement in user_overview_list:
-        with open("user_overview.txt", 'a',  encoding="utf-8") as file:
-            file.write(statement)
-            # End each statement with a new line character.
-            file.write("\n")
-    
+    # Once the tasks have been migrated, use the SQLite database.
+    if os.path.exists(DATABASE_FILE):
+        from sqlite_task_store import SQLiteTaskStore
+        return SQLiteTaskStore()
 
+    # Once the tasks have been converted, use the binary task file.
+    if os.path.exists(BINARY_FILE):
+        from binary_task_store import BinaryTaskStore
+        return BinaryTaskStore()
 
+    if lazy:
+        return TaskStore(lazy=True)
 
-def count_occurrences(list_of_dictionaries, key, condition):
-    """
-    This function counts the occurrences of a given value within a list that contains
-    list items in the form of dictionaries.
+    return TaskStore(columnar=True, numpy_reports=numpy is not None)
 
-    Parameters:
 
-        "condition" =               a dictionary value of which the occurrences are to be
-                                    counted
 
-        "key" =                     the corresponding dictionary key of the "condition"
-                                    to be counted
 
-        "list_of_dictionaries" =    the list to be searched for "condition" occurrences
+def command_date(date_string):
+    """
+    This function converts a "YYYY-MM-DD" date given to a command into a datetime.
     """
 
-    # Initialise a list to count the occurrences of the given "condition".
-    occurrences = []
+    try:
+        return parse_date(date_string)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{date_string}' is not a date in the format YYYY-MM-DD")
 
-    # Iterate through all sub-dictionaries in the "list_of_dictionaries".
-    for dictionary in list_of_dictionaries:
-        
-        # If an instance of the "condition" is identified:
-        if dictionary[key] == condition:
-            # Append a counter 'x' to the list "occurrences".
-            occurrences.append('x')
-    
-    # Calculate the total number of occurrences.
-    occurrence_count = len(occurrences)
 
-    # Return the result.
-    return occurrence_count
 
 
+def build_argument_parser():
+    """
+    This function returns the parser of the command-line arguments of the program.
 
+    Each command is run without any input from the user, e.g. by a script:
 
-def display_statistics():
-    '''
-    This function permits the "admin" user to display statistics about the number of
-    users and tasks without generating full reports.
+        python task_manager.py --username admin add --assignee admin --title Title --due 2030-01-01
 
-    The statistics that are generated are read from the "tasks.txt" and "users.txt" files
-    as per the Project Instructions.
-    These files are initialised when the program starts.
-    '''
-    
-    """ Display a section heading.
+    Commands which read or change the tasks need a login. The username and password are
+    given with "--username" and "--password", or in the TASK_MANAGER_USERNAME and
+    TASK_MANAGER_PASSWORD environment variables. Without a command, the program shows
+    the interactive login and Main Menu.
     """
-    print("-"*100)
-    print("DISPLAY STATISTICS\n")
 
+    parser = argparse.ArgumentParser(
+        prog="task_manager.py",
+        description="Manage the tasks of a team. Run without a command to use the interactive menu.",
+    )
+    parser.add_argument("--username", default=os.environ.get("TASK_MANAGER_USERNAME"),
+                        help="the username to log in with (default: $TASK_MANAGER_USERNAME)")
+    parser.add_argument("--password", default=os.environ.get("TASK_MANAGER_PASSWORD"),
+                        help="the password to log in with (default: $TASK_MANAGER_PASSWORD, which "
+                             "other users of the computer cannot see)")
+
+    commands = parser.add_subparsers(dest="command", metavar="command")
+
+    # Adding a task.
+    add_parser = commands.add_parser("add", help="add a new task")
+    add_parser.add_argument("--assignee", required=True, help="the username of the person assigned to the task")
+    add_parser.add_argument("--title", required=True, help="the task title")
+    add_parser.add_argument("--description", default="", help="the task description")
+    add_parser.add_argument("--due", required=True, type=command_date, help="the due date (YYYY-MM-DD)")
+
+    # Listing tasks.
+    list_parser = commands.add_parser("list", help="list the tasks matching the given filters")
+    list_parser.add_argument("--status", choices=["complete", "incomplete"], help="only list tasks with this status")
+    list_parser.add_argument("--assignee", help="only list the tasks of this user")
+    list_parser.add_argument("--due-from", type=command_date, help="the earliest due date (YYYY-MM-DD)")
+    list_parser.add_argument("--due-to", type=command_date, help="the latest due date (YYYY-MM-DD)")
+    list_parser.add_argument("--assigned-from", type=command_date, help="the earliest date assigned (YYYY-MM-DD)")
+    list_parser.add_argument("--assigned-to", type=command_date, help="the latest date assigned (YYYY-MM-DD)")
+    list_parser.add_argument("--updated-since", type=command_date, help="the earliest date last updated (YYYY-MM-DD)")
+    list_parser.add_argument("--json", action="store_true", help="list the tasks as JSON")
+
+    # Marking tasks as complete.
+    complete_parser = commands.add_parser("complete", help="mark tasks as complete")
+    complete_parser.add_argument("task_numbers", nargs="+", type=int, metavar="task_number")
+
+    # Re-assigning tasks.
+    reassign_parser = commands.add_parser("reassign", help="assign tasks to a different user")
+    reassign_parser.add_argument("task_numbers", nargs="*", type=int, metavar="task_number")
+    reassign_parser.add_argument("--from", dest="old_assignee",
+                                 help="re-assign all incomplete tasks of this user (admin only)")
+    reassign_parser.add_argument("--to", dest="new_assignee", required=True, help="the user to assign the tasks to")
+
+    # Reports and statistics.
+    commands.add_parser("report", help="generate the task and user overview reports")
+    stats_parser = commands.add_parser("stats", help="display the number of users and tasks (admin only)")
+    stats_parser.add_argument("--json", action="store_true", help="display the statistics as JSON")
+
+    # Adding, copying and converting the stored tasks.
+    import_parser = commands.add_parser("import", help="add the tasks listed in a CSV or JSONL file (admin only)")
+    import_parser.add_argument("file", help="the CSV or JSONL file")
+    commands.add_parser("migrate", help=f"copy the tasks and users into a new SQLite database ('{DATABASE_FILE}')")
+    commands.add_parser("convert-binary", help=f"copy the tasks into a new binary task file ('{BINARY_FILE}')")
+
+    return parser
+
+
+
+
+def run_command(arguments):
+    """
+    This function runs the command given in the command-line "arguments" (see
+    build_argument_parser()).
 
-    """ ------------------ If the user is not the "admin" user. ----------------------"""
+    Each command only loads what it needs: commands which change or count tasks open
+    the store in lazy mode, so only the tasks they change are read, while commands which
+    read every task ("list", "report" and "reassign --from") load all tasks into packed
+    columns. Each mode keeps its own snapshot, so neither needs to parse "tasks.txt"
+    again while it is unchanged.
 
-    if login_username != "admin":
+    Any error is reported with a message, and the program exits with a non-zero status.
+    """
 
-        # Show an error message to the user.
-        print("Sorry, you are not authorised to display statistics.")
+    """ ------------------- Commands which copy the stored tasks. ------------------- """
 
-        # Return to the Main Menu.
+    # "migrate" copies the tasks and users from "tasks.txt" and "users.txt" into a new
+    # SQLite database ("tasks.db").
+    if arguments.command == "migrate":
+        from sqlite_task_store import migrate_to_sqlite
+        try:
+            num_users, num_tasks = migrate_to_sqlite()
+        except (FileExistsError, ValueError) as error:
+            sys.exit(f"The tasks could not be copied: {error}")
+        print(f"Copied {num_users} users and {num_tasks} tasks into '{DATABASE_FILE}'.")
         return
-    
-
-        """ ---------------- If the user is the "admin" user. ------------------------"""
-
-    elif login_username == "admin":
-
-        # Calculate the total number of users from the number of lines in "users.txt".
-        with open("users.txt", 'r', encoding="utf-8") as file:
-            total_users = len(file.readlines())
-
-        # Calculate the total number of tasks from the number of lines in "tasks.txt".
-        with open("tasks.txt", 'r', encoding="utf-8") as file:
-            total_tasks = len(file.readlines())
-
-        # Display the statistics for the user in a readable format.
-        print("------------------------------------")
-        print(f"Total number of users: \t\t {total_users}")
-        print(f"Total number of tasks: \t\t {total_tasks}")
-        print("------------------------------------")  
-
 
+    # "convert-binary" copies the tasks from "tasks.txt" into a new binary task file
+    # ("tasks.bin").
+    if arguments.command == "convert-binary":
+        from binary_task_store import convert_to_binary
+        try:
+            num_tasks = convert_to_binary()
+        except (FileExistsError, ValueError) as error:
+            sys.exit(f"The tasks could not be copied: {error}")
+        print(f"Copied {num_tasks} tasks into '{BINARY_FILE}'.")
+        return
 
 
+    """ ------------------------ Open the store and log in. ------------------------- """
 
+    reads_all_tasks = (arguments.command in ["list", "report"]
+                       or (arguments.command == "reassign" and arguments.old_assignee is not None))
 
-# ----------------------------- Initialising task storage. ------------------------------
-"""
-The "tasks.txt" file stores all of the task-related information for the program. It is
-structured similarly to a .csv file.
-The "tasks.txt" file is initialised when the program starts.
+    try:
+        store = open_task_store(lazy=not reads_all_tasks)
+    except JournalDamaged as error:
+        sys.exit(str(error).strip())
 
-If the file does not exist already from a previous use of the program, a new, empty
-"tasks.txt" file is created. An existing "tasks.txt" file can be reopened by the program.
+    try:
+        if arguments.username is None or arguments.password is None:
+            sys.exit("Please give a username and password with --username and --password, or in the "
+                     "TASK_MANAGER_USERNAME and TASK_MANAGER_PASSWORD environment variables.")
 
-The current, complete list of tasks is also stored within a variable "master_task_list",
-which is used by the program to display tasks, add tasks, modify tasks, and generate
-reports on current task status.
-"""
+        if not store.check_password(arguments.username, arguments.password):
+            sys.exit("Incorrect username or password.")
 
+        COMMANDS[arguments.command](store, arguments.username, arguments)
 
-# Create "tasks.txt" if it doesn't already exist.
-if not os.path.exists("tasks.txt"):
-    with open("tasks.txt", 'w', encoding="utf-8") as default_file:
-        pass
+    # The store is closed (so that every change is synced to disk) even if the command
+    # fails.
+    finally:
+        store.close()
 
-# Read a list of "task_data" from the "tasks.txt" file for later use in the program.
-with open("tasks.txt", 'r', encoding="utf-8") as task_file:
-    
-    # Store the "task_data" for all tasks as a list. Remove "\n".
-    task_data = task_file.read().split("\n")
 
-    # Remove any empty lines from the list.
-    task_data = [line for line in task_data if line != '']
 
-# Overwrite the "tasks.txt" file with all empty lines removed.
-with open("tasks.txt", 'w', encoding="utf-8") as task_file:
-    task_file.write("\n".join(task_data))
 
+def check_admin(login_username):
+    """
+    This function stops a command which only the "admin" user may run.
+    """
 
-# Initialise a master list which will store dictionary items containing each individual task.
-master_task_list = []
+    if login_username != "admin":
+        sys.exit("Sorry, only the admin user may run this command.")
 
 
-# Populate the "master_task_list" by iterating through the "task_data" list items.
-for each_task in task_data:
 
-    # Split "each_task" by ';' into a list of "task_components".
-    task_components = each_task.split(';')
 
-    # Initialise an empty dictionary to store the "task_components" for the "current_task".
-    current_task = {}
+def check_own_tasks(store, login_username, task_numbers):
+    """
+    This function stops a command if any of the "task_numbers" is not recognised, or
+    (for users other than "admin") is not assigned to the user.
+    """
 
-    # Add each task component to the "current_task" dictionary.
-    current_task["username"] = task_components[0]
-    current_task["title"] = task_components[1]
-    current_task["description"] = task_components[2]
-    current_task["assigned_date"] = datetime.strptime(task_components[3], DATETIME_STRING_FORMAT)
-    current_task["due_date"] = datetime.strptime(task_components[4], DATETIME_STRING_FORMAT)
-    current_task["completed"] = True if task_components[5] == "Yes" else False
-    # If a task has been previously updated, add this date as another task component.
-    if (len(task_components) >= 7):
-        current_task["updated_date"] = task_components[6]
+    for task_number in task_numbers:
+        try:
+            task = store.get_task(task_number)
+        except NotInListError as error:
+            sys.exit(f"Task {task_number}: {str(error).strip()}")
 
-    # Append each populated "current_task" dictionary to the "master_task_list".
-    master_task_list.append(current_task)
+        if login_username != "admin" and task.username != login_username:
+            sys.exit(f"Task {task_number}: {str(NotInListError('in_range')).strip()}")
 
 
 
 
+def command_add(store, login_username, arguments):
+    """
+    This function runs the "add" command, which adds a new task.
+    """
 
+    try:
+        store.add_task(arguments.assignee, arguments.title, arguments.description, arguments.due)
+    except (UserNotRecognised, InvalidText) as error:
+        sys.exit(str(error).strip())
 
+    print(f"Added task {len(store.master_task_list)}.")
 
-# ----------------------------- Requesting user login. ----------------------------------
-'''
-This code section controls user login.
 
-First, if the file does not exist already from a previous use of the program, a new
-"users.txt" file is created containing a default admin account.
-An existing "users.txt" file can be reopened by the program.
 
-Second, the user is requested to enter their "login_username" and "login_password". The
-input is compared against the registered users in the "users.txt" file, and if the input
-is recognised, the user is granted login. Otherwise, the user will be prompted to
-re-enter the correct details.
 
-This code block is included within the main body of the program, rather than contained
-within a separate function, to ensure that the variable "login_username" remains
-accessible throughout the program as a means of determining the current user's access
-privileges.
+def command_list(store, login_username, arguments):
+    """
+    This function runs the "list" command, which lists the tasks matching the given
+    filters (see TaskStore.filter_tasks()), either in a readable format or as JSON.
 
-Additionally, the "username_password" dictionary stores a current list of all users and
-passwords, which is used later in the program.
+    Users other than "admin" may only list their own tasks.
+    """
 
-'''
+    # Users other than "admin" may only view their own tasks.
+    assignee = arguments.assignee
+    if login_username != "admin":
+        if assignee not in [None, login_username]:
+            sys.exit("Sorry, you may only list your own tasks.")
+        assignee = login_username
+
+    task_list, task_numbers = store.filter_tasks(
+        completed={"complete": True, "incomplete": False, None: None}[arguments.status],
+        assignee=assignee,
+        due_from=arguments.due_from,
+        due_to=arguments.due_to,
+        assigned_from=arguments.assigned_from,
+        assigned_to=arguments.assigned_to,
+        updated_since=arguments.updated_since,
+    )
+
+    # List each task as a JSON object, with its task number and dates as strings.
+    if arguments.json:
+        json.dump([
+            {
+                "task_number": task_number,
+                "username": task.username,
+                "title": task.title,
+                "description": task.description,
+                "assigned_date": task.assigned_date.strftime(DATETIME_STRING_FORMAT),
+                "due_date": task.due_date.strftime(DATETIME_STRING_FORMAT),
+                "completed": task.completed,
+                "updated_date": task.updated_date,
+            }
+            for task_number, task in zip(task_numbers, task_list)
+        ], sys.stdout, indent=2)
+        print()
+
+    # Otherwise, display each task in a readable format.
+    else:
+        for task_number, task in zip(task_numbers, task_list):
+            print(format_task(task_number, task))
+        print(f"{len(task_numbers)} tasks.")
 
-# If no "users.txt" file currently exists, write one with a default "admin" account.
-if not os.path.exists("users.txt"):
-    with open("users.txt", 'w', encoding="utf-8") as default_file:
-        default_file.write("admin;password")
 
 
-# Read a list of "user_data" from the "users.txt" file for later use within the program.
-with open("users.txt", 'r', encoding="utf-8") as user_file:
 
-    # Store "user_data" as a list containing linked usernames and passwords as strings.
-    user_data = user_file.read().split("\n")
+def command_complete(store, login_username, arguments):
+    """
+    This function runs the "complete" command, which marks tasks as complete. Users
+    other than "admin" may only complete their own tasks.
+    """
 
-    # Remove any empty lines from the list.
-    user_data = [user for user in user_data if user != '']
+    check_own_tasks(store, login_username, arguments.task_numbers)
 
-# Overwrite the "users.txt" file with any empty lines removed.
-with open("users.txt", 'w', encoding="utf-8") as user_file:
-    user_file.write("\n".join(user_data))
+    edited_numbers = store.edit_tasks(arguments.task_numbers, mark_complete=True)
 
+    print(f"Marked {len(edited_numbers)} tasks as complete.")
 
-# Initialise a "username_password" dictionary to store paired usernames and passwords.
-username_password = {}
 
-# Populate the "username_password" dictionary by iterating through the "user_data" items.
-for each_user in user_data:
-    # Split "each_user" by ';' into "username" and "password".
-    username, password = each_user.split(';')
-    # Store the "username" and "password" as a key:value pair within "username_password".
-    username_password[username] = password
 
 
-# Initial login state is set to False.
-logged_in = False
+def command_reassign(store, login_username, arguments):
+    """
+    This function runs the "reassign" command, which assigns tasks to a different user:
+    either the given tasks, or (for the "admin" user) all incomplete tasks of the user
+    given with "--from". Users other than "admin" may only re-assign their own tasks.
+    """
 
-# Show LOGIN menu to user until successful login with recognised values.
-while not logged_in:
+    if (arguments.old_assignee is None) == (not arguments.task_numbers):
+        sys.exit("Please give either the task numbers or --from, but not both.")
 
-    # Print a divider and menu message for readability.
-    print("-"*100)
-    print("LOGIN\n")
+    try:
+        # Re-assign all of a user's incomplete tasks.
+        if arguments.old_assignee is not None:
+            check_admin(login_username)
+            edited_numbers = store.reassign_user_tasks(arguments.old_assignee, arguments.new_assignee)
 
-    # Ask the user to input their username.
-    login_username = input("Username:\t")
+        # Re-assign the given tasks.
+        else:
+            check_own_tasks(store, login_username, arguments.task_numbers)
+            edited_numbers = store.edit_tasks(arguments.task_numbers, new_assignee=arguments.new_assignee)
 
-    # If the username input is not found in the "users.txt" file, display error message.
-    if login_username not in username_password.keys():
-        print("\n\t** That user does not exist. **")
-        # Proceed to display LOGIN menu again, and ask for re-input of username.
-        continue
+    except (UserNotRecognised, InvalidText) as error:
+        sys.exit(str(error).strip())
 
-    # Ask the user to input their password.
-    login_password = input("Password:\t")
+    print(f"Assigned {len(edited_numbers)} tasks to {arguments.new_assignee}.")
 
-    # If the password does not match the username, display an error message.
-    if username_password[login_username] != login_password:
-        print("\n\t** Incorrect password. **")
-        # Proceed to LOGIN menu again, to ask for re-input of username and password.
-        continue
 
-    # Login is successful if the username and password are recognised as matching.
-    else:
-        print("\nLogin successful!")
-        logged_in = True
 
-# After login is confirmed, initialise "done" variable for later control of program exit.
-done = False
 
+def command_report(store, login_username, arguments):
+    """
+    This function runs the "report" command, which generates and displays the reports
+    (see generate_reports()).
+    """
 
+    generate_reports(store)
 
 
 
 
+def command_stats(store, login_username, arguments):
+    """
+    This function runs the "stats" command, which displays the number of users and
+    tasks. Only the "admin" user may display statistics.
+    """
 
-# ------------------------------ Displaying Main Menu. ----------------------------------
-"""
-This block of code presents the Main Menu to the user.
-The menu will continue to be presented until the user chooses option 'e' to exit.
-"""
+    check_admin(login_username)
 
-while not done:
+    total_users, total_tasks = store.display_statistics()
 
-    """ ----------------------- Request user menu choice. --------------------------- """
+    if arguments.json:
+        print(json.dumps({"total_users": total_users, "total_tasks": total_tasks}))
+    else:
+        print(f"Total number of users: \t\t {total_users}")
+        print(f"Total number of tasks: \t\t {total_tasks}")
 
-    print("-"*100)
-    print("Welcome to the Main Menu!")
-
-    # User input is converted to lowercase.
-    menu_choice = input(
-        "Please select one of the following options:\n"
-            "\nr - registering a user\n"
-            "a - adding a task\n"
-            "va - view all tasks\n"
-            "vm - view my tasks\n"
-            "gr - generate reports\n"
-            "ds - display statistics\n"
-            "e - exit\n\n"
-        ).lower()
 
 
-    """ ---------------------- Option 'r' - add new user. --------------------------- """
 
-    if menu_choice == 'r':
-        reg_user()
+def command_import(store, login_username, arguments):
+    """
+    This function runs the "import" command, which adds all of the tasks listed in a CSV
+    or JSONL file (see TaskStore.import_tasks()), and reports any rows which could not
+    be imported. Only the "admin" user may import tasks.
+    """
 
+    check_admin(login_username)
 
-        """ ------------------ Option 'a' - add new task. --------------------------- """
+    try:
+        num_tasks, import_errors = store.import_tasks(arguments.file)
+    except (OSError, UnicodeDecodeError, csv.Error) as error:
+        sys.exit(str(error))
 
-    elif menu_choice == 'a':
-        add_task()
+    # Report each row which could not be imported.
+    for error in import_errors:
+        print(error)
 
+    print(f"Imported {num_tasks} tasks ({len(import_errors)} rows skipped).")
 
-        """ ----------------- Option "va" - view all tasks. ------------------------- """
 
-    elif menu_choice == 'va':
-        view_all(master_task_list)
-            
 
-        """ ------------------ Option "vm" - view my tasks. ------------------------- """
 
-    elif menu_choice == 'vm':
-        view_mine()
+# The function which runs each command (other than the commands which copy the stored
+# tasks - see run_command()).
+COMMANDS = {
+    "add": command_add,
+    "list": command_list,
+    "complete": command_complete,
+    "reassign": command_reassign,
+    "report": command_report,
+    "stats": command_stats,
+    "import": command_import,
+}
 
 
-        """ ----------------- Option "gr" - generate reports. ----------------------- """
-    
-    elif menu_choice == "gr":
-        generate_reports()
 
 
-        """ ---------------- Option "ds" - display statistics. ---------------------- """
 
-    elif menu_choice == "ds":
-        display_statistics()
 
 
-        """ ------------------- Option 'e' - exit program. -------------------------- """
+# --------------------------------- Running the program. --------------------------------
 
-    elif menu_choice == 'e':
+if __name__ == "__main__":
 
-        # Display exit message.
-        print('-'*100)
-        print("Goodbye!\n")
+    # The storage backends import this module as "task_manager". Register the running
+    # program under that name too, so that they use its classes and exceptions rather
+    # than loading a second copy of the module.
+    sys.modules.setdefault("task_manager", sys.modules[__name__])
 
-        # Set "done" to True to exit the Main Menu while-loop and exit the program.
-        done = True
+    arguments = build_argument_parser().parse_args()
 
+    # Run a single command without any input from the user, e.g. from a script.
+    if arguments.command is not None:
+        run_command(arguments)
+        sys.exit()
 
-        """ ----------------------- Input validation. ------------------------------- """
+    # Otherwise, load the tasks and users for the interactive Main Menu. Tasks are parsed
+    # when they are first used, so that the login prompt is shown quickly.
+    try:
+        task_store = open_task_store()
+    except JournalDamaged as error:
+        sys.exit(str(error).strip())
 
-    else:
-        # Display error message for invalid menu choices.
-        print("\n\t** You have made an invalid choice. Please try again. **")
+    # Request user login.
+    login_username = login(task_store)
 
+    # Present the Main Menu until the user chooses to exit.
+    main_menu(task_store, login_username)
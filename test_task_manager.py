@@ -0,0 +1,509 @@
+# ------------------------------- Testing the Task Manager. -----------------------------
+
+# Run the tests with "python -m pytest" from the folder containing task_manager.py.
+# Each test runs in its own empty folder (see the "task_folder" fixture), so the
+# "tasks.txt" and "users.txt" files of the program are never changed.
+
+import multiprocessing
+from datetime import datetime
+
+import pytest
+
+import task_manager
+from task_manager import (TaskStore, JournalDamaged, format_journal_record, parse_journal_record,
+                          build_argument_parser, run_command, open_task_store)
+from sqlite_task_store import SQLiteTaskStore, migrate_to_sqlite
+from binary_task_store import BinaryTaskStore, convert_to_binary
+
+
+# The due date used for the tasks added by the tests.
+DUE_DATE = datetime(2030, 1, 1)
+
+
+
+
+@pytest.fixture
+def task_folder(tmp_path, monkeypatch):
+    """
+    This fixture runs a test in an empty folder, containing a "users.txt" file with the
+    users "admin" and "alice".
+    """
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "users.txt").write_text("admin;password\nalice;secret")
+
+    return tmp_path
+
+
+
+
+# ------------------------------------ The journal. -------------------------------------
+
+def test_journal_record_round_trip():
+    record = format_journal_record('A', 7, "alice;Title;Description;2030-01-01;2030-02-01;No")
+
+    assert record.endswith("\n")
+    assert parse_journal_record(record[:-1].encode("utf-8")) == (
+        'A', 7, "alice;Title;Description;2030-01-01;2030-02-01;No"
+    )
+    assert parse_journal_record(format_journal_record('U', "bob", "pw")[:-1].encode("utf-8")) == ('U', "bob", "pw")
+
+
+
+
+@pytest.mark.parametrize("record", [
+    ('A', 1, "alice;Title\nmore;Description;2030-01-01;2030-02-01;No"),
+    ('A', 1, "alice;Title;Description"),
+    ('U', "bob", "p;w"),
+    ('U', "b;ob", "pw"),
+])
+def test_journal_records_are_checked_when_written(record):
+    with pytest.raises(ValueError):
+        format_journal_record(*record)
+
+
+
+
+def test_journal_is_replayed(task_folder):
+    store = TaskStore(journal_threshold=100)
+    store.add_task("alice", "First", "One", DUE_DATE)
+    store.add_task("admin", "Second", "Two", DUE_DATE)
+    store.edit_task(1, mark_complete=True)
+    store.register_user("bob", "pw")
+    store.close()
+
+    # The changes are only in the journal until it is folded back into the files.
+    assert (task_folder / "tasks.txt.journal").exists()
+
+    for mode in [{}, {"lazy": True}, {"columnar": True}]:
+        reloaded = TaskStore(**mode)
+        assert [task.title for task in reloaded.master_task_list] == ["First", "Second"]
+        assert reloaded.get_task(1).completed
+        assert reloaded.username_password["bob"] == "pw"
+        reloaded.close()
+
+
+
+
+def test_torn_last_record_is_removed(task_folder):
+    store = TaskStore(journal_threshold=100)
+    store.add_task("alice", "First", "One", DUE_DATE)
+    store.add_task("alice", "Second", "Two", DUE_DATE)
+    store.close()
+
+    # Cut the last record short, as if the program had stopped while writing it.
+    journal_file = task_folder / "tasks.txt.journal"
+    journal_data = journal_file.read_bytes()
+    journal_file.write_bytes(journal_data[:-10])
+
+    store = TaskStore()
+    assert [task.title for task in store.master_task_list] == ["First"]
+
+    # The incomplete record is removed before the next record is written.
+    store.add_task("alice", "Third", "Three", DUE_DATE)
+    store.close()
+
+    store = TaskStore()
+    assert [task.title for task in store.master_task_list] == ["First", "Third"]
+    store.close()
+
+
+
+
+def test_damaged_record_in_the_middle_is_kept(task_folder):
+    store = TaskStore(journal_threshold=100)
+    for title in ["First", "Second", "Third"]:
+        store.add_task("alice", title, "Text", DUE_DATE)
+    store.close()
+
+    # Change a byte of the first record, which has valid records after it.
+    journal_file = task_folder / "tasks.txt.journal"
+    damaged_data = bytearray(journal_file.read_bytes())
+    damaged_data[12] ^= 1
+    journal_file.write_bytes(bytes(damaged_data))
+
+    with pytest.raises(JournalDamaged):
+        TaskStore()
+
+    # The journal is left as it is, so that it can be repaired.
+    assert journal_file.read_bytes() == bytes(damaged_data)
+
+
+
+
+# ------------------------- Adding tasks from several processes. ------------------------
+
+# How to open the store of each backend, once its files have been created from the text
+# files by "create".
+BACKENDS = {
+    "text": {"open": TaskStore, "create": None},
+    "lazy": {"open": lambda: TaskStore(lazy=True), "create": None},
+    "sqlite": {"open": SQLiteTaskStore, "create": migrate_to_sqlite},
+    "binary": {"open": BinaryTaskStore, "create": convert_to_binary},
+}
+
+
+
+
+def add_tasks(backend, name, num_tasks):
+    """
+    This function adds "num_tasks" tasks to the store of a "backend", with titles
+    starting with "name". It is run in a separate process.
+    """
+
+    store = BACKENDS[backend]["open"]()
+    for number in range(num_tasks):
+        store.add_task("alice", f"{name}-{number}", "Text", DUE_DATE)
+    store.close()
+
+
+
+
+@pytest.fixture(params=list(BACKENDS))
+def backend(request, task_folder):
+    """
+    This fixture runs a test with each backend, in an empty folder (see "task_folder").
+    """
+
+    if BACKENDS[request.param]["create"] is not None:
+        BACKENDS[request.param]["create"]()
+
+    return request.param
+
+
+
+
+def test_two_stores_add_tasks(backend):
+    first_store = BACKENDS[backend]["open"]()
+    second_store = BACKENDS[backend]["open"]()
+
+    # Build the user index of the first store before the other store adds a task.
+    assert first_store.get_user_task_numbers("alice") == []
+
+    first_store.add_task("alice", "First", "Text", DUE_DATE)
+    second_store.add_task("alice", "Second", "Text", DUE_DATE)
+    first_store.add_task("alice", "Third", "Text", DUE_DATE)
+
+    # Each store sees the tasks added by the other, with the same task numbers.
+    for store in [first_store, second_store]:
+        store.refresh()
+        assert [store.get_task(number).title for number in [1, 2, 3]] == ["First", "Second", "Third"]
+        assert store.get_user_task_numbers("alice") == [1, 2, 3]
+        store.close()
+
+
+
+
+def test_two_processes_add_tasks(backend):
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=add_tasks, args=(backend, name, 50)) for name in ["a", "b"]]
+
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    # No task has been written over by the other process.
+    store = BACKENDS[backend]["open"]()
+    titles = sorted(task.title for task in store.master_task_list)
+    assert titles == sorted(f"{name}-{number}" for name in ["a", "b"] for number in range(50))
+    store.close()
+
+
+
+
+def test_binary_store_keeps_new_users(task_folder):
+    convert_to_binary()
+
+    store = BinaryTaskStore()
+    store.register_user("bob", "pw")
+    store.add_task("bob", "Title", "Text", DUE_DATE)
+    store.close()
+
+    store = BinaryTaskStore()
+    assert store.username_password["bob"] == "pw"
+    assert store.get_task(1).username == "bob"
+    store.close()
+
+
+
+
+def test_failed_migration_leaves_no_database(task_folder):
+    (task_folder / "tasks.txt").write_text(
+        "alice;Good;Text;2030-01-01;2030-02-01;No\n"
+        "alice;Bad date;Text;2030-01-01;not a date;No\n"
+    )
+
+    with pytest.raises(ValueError):
+        migrate_to_sqlite()
+
+    # The program keeps using the text files, which still hold every task.
+    assert sorted(path.name for path in task_folder.iterdir() if path.name.startswith("tasks.db")) == []
+    store = open_task_store()
+    assert type(store) is TaskStore
+    assert len(store.master_task_list) == 2
+    store.close()
+
+
+
+
+# ----------------------------------- Importing tasks. ----------------------------------
+
+def test_import_checks_each_csv_row(task_folder):
+    (task_folder / "import.csv").write_text(
+        "username,title,description,due_date,assigned_date\n"
+        "alice,Good,Text,2030-01-01,\n"
+        "nobody,Unknown user,Text,2030-01-01,\n"
+        "alice,,No title,2030-01-01,\n"
+        "alice,Bad date,Text,01/01/2030,\n"
+        "alice,Semi;colon,Text,2030-01-01,\n"
+        "alice,\"Two\nlines\",Text,2030-01-01,\n"
+        "admin,Also good,Text,2030-02-01,2029-12-01\n"
+    )
+
+    store = TaskStore()
+    num_tasks, import_errors = store.import_tasks("import.csv")
+
+    assert num_tasks == 2
+    assert [error.row_number for error in import_errors] == [3, 4, 5, 6, 8]
+    assert [task.title for task in store.master_task_list] == ["Good", "Also good"]
+    assert store.get_task(2).assigned_date == datetime(2029, 12, 1)
+    store.close()
+
+
+
+
+def test_import_checks_each_jsonl_row(task_folder):
+    (task_folder / "import.jsonl").write_text(
+        '{"username": "alice", "title": "Good", "due_date": "2030-01-01"}\n'
+        '["not", "an", "object"]\n'
+        'not JSON\n'
+        '{"username": "alice", "title": "No due date"}\n'
+        '{"username": "alice", "title": "Good too", "description": "Text", "due_date": "2030-01-02"}\n'
+    )
+
+    store = TaskStore()
+    num_tasks, import_errors = store.import_tasks("import.jsonl")
+
+    assert num_tasks == 2
+    assert [error.row_number for error in import_errors] == [2, 3, 4]
+    assert [task.title for task in store.master_task_list] == ["Good", "Good too"]
+    store.close()
+
+
+
+
+# ---------------------------------- Editing many tasks. --------------------------------
+
+@pytest.fixture
+def edit_store(task_folder):
+    """
+    This fixture returns a store with four tasks: tasks 1 to 3 are assigned to "alice",
+    and task 4 to "admin". Task 2 is complete. The user index, task counts and date
+    indexes are built, so that the tests check that they are kept up to date.
+    """
+
+    store = TaskStore()
+    store.add_task("alice", "First", "Text", datetime(2030, 1, 1))
+    store.add_task("alice", "Second", "Text", datetime(2030, 1, 2))
+    store.add_task("alice", "Third", "Text", datetime(9999, 12, 1))
+    store.add_task("admin", "Fourth", "Text", datetime(2030, 1, 4))
+    store.edit_task(2, mark_complete=True)
+
+    store.get_user_task_numbers("alice")
+    store.build_report()
+    store.get_tasks_due(datetime(2000, 1, 1), datetime(9999, 12, 31))
+
+    yield store
+    store.close()
+
+
+
+
+def stored_tasks():
+    """
+    This function returns the tasks as they are stored, by loading the store again.
+    """
+
+    store = TaskStore()
+    tasks = list(store.master_task_list)
+    store.close()
+
+    return tasks
+
+
+
+
+def report_counts(store):
+    """
+    This function returns the number of tasks and of completed tasks, and the number of
+    tasks and of completed tasks of each user, from the live task counts.
+    """
+
+    report = store.build_report()
+    user_counts = {user: (user_report.assigned, user_report.completed)
+                   for user, user_report in report.user_reports.items()}
+
+    return report.total_tasks, report.completed, user_counts
+
+
+
+
+def test_edit_tasks_reassigns_and_skips_completed_tasks(edit_store):
+    assert edit_store.edit_tasks([1, 2, 4], new_assignee="admin") == [1, 4]
+
+    assert [task.username for task in stored_tasks()] == ["admin", "alice", "alice", "admin"]
+    assert edit_store.get_user_task_numbers("alice") == [2, 3]
+    assert edit_store.get_user_task_numbers("admin") == [1, 4]
+    assert report_counts(edit_store) == (4, 1, {"admin": (2, 0), "alice": (2, 1)})
+
+
+
+
+def test_edit_tasks_completes_tasks(edit_store):
+    assert edit_store.edit_tasks([1, 3], mark_complete=True) == [1, 3]
+
+    assert [task.completed for task in stored_tasks()] == [True, True, True, False]
+    assert report_counts(edit_store) == (4, 3, {"admin": (1, 0), "alice": (3, 3)})
+
+
+
+
+def test_edit_tasks_shifts_due_dates(edit_store):
+    assert edit_store.edit_tasks([1, 2, 4], shift_due_days=-1) == [1, 4]
+
+    assert [task.due_date for task in stored_tasks()] == [
+        datetime(2029, 12, 31), datetime(2030, 1, 2), datetime(9999, 12, 1), datetime(2030, 1, 3)
+    ]
+    assert edit_store.get_tasks_due(datetime(2029, 12, 31), datetime(2030, 1, 3))[1] == [1, 4]
+
+
+
+
+@pytest.mark.parametrize("changes, error", [
+    ({"task_numbers": [1, 3], "shift_due_days": 60}, task_manager.InvalidDueDate),
+    ({"task_numbers": [1, 99], "mark_complete": True}, task_manager.NotInListError),
+    ({"task_numbers": [1, 3], "new_assignee": "nobody"}, task_manager.UserNotRecognised),
+])
+def test_edit_tasks_changes_nothing_on_error(edit_store, changes, error):
+    tasks_before = [task_manager.format_task_line(task) for task in stored_tasks()]
+    due_before = edit_store.get_tasks_due(datetime(2000, 1, 1), datetime(9999, 12, 31))[1]
+
+    with pytest.raises(error):
+        edit_store.edit_tasks(**changes)
+
+    # Neither the tasks in memory, the stored tasks nor the indexes have changed.
+    assert [task_manager.format_task_line(task) for task in edit_store.master_task_list] == tasks_before
+    assert [task_manager.format_task_line(task) for task in stored_tasks()] == tasks_before
+    assert edit_store.get_user_task_numbers("alice") == [1, 2, 3]
+    assert edit_store.get_tasks_due(datetime(2000, 1, 1), datetime(9999, 12, 31))[1] == due_before
+    assert report_counts(edit_store) == (4, 1, {"admin": (1, 0), "alice": (3, 1)})
+
+
+
+
+def test_reassign_user_tasks(edit_store):
+    assert edit_store.reassign_user_tasks("alice", "admin") == [1, 3]
+
+    assert [task.username for task in stored_tasks()] == ["admin", "alice", "admin", "admin"]
+    assert edit_store.get_user_task_numbers("alice") == [2]
+
+    with pytest.raises(task_manager.UserNotRecognised):
+        edit_store.reassign_user_tasks("admin", "nobody")
+    assert [task.username for task in stored_tasks()] == ["admin", "alice", "admin", "admin"]
+
+
+
+
+# ---------------------------------- Running commands. ----------------------------------
+
+def run(*arguments):
+    """
+    This function runs a command with the command-line "arguments", and returns the
+    exit status of the program (0 if the command succeeded).
+    """
+
+    try:
+        run_command(build_argument_parser().parse_args(list(arguments)))
+    except SystemExit as error:
+        # A message given to sys.exit() exits with the status 1.
+        return error.code if isinstance(error.code, int) else 1
+
+    return 0
+
+
+
+
+@pytest.fixture
+def command_folder(task_folder, monkeypatch):
+    """
+    This fixture runs a command test in an empty folder (see "task_folder"), without
+    any login in the environment variables.
+    """
+
+    monkeypatch.delenv("TASK_MANAGER_USERNAME", raising=False)
+    monkeypatch.delenv("TASK_MANAGER_PASSWORD", raising=False)
+
+    return task_folder
+
+
+
+
+def test_commands_succeed(command_folder):
+    admin = ["--username", "admin", "--password", "password"]
+
+    assert run(*admin, "add", "--assignee", "alice", "--title", "Title", "--due", "2030-01-01") == 0
+    assert run("--username", "alice", "--password", "secret", "complete", "1") == 0
+    assert run(*admin, "stats", "--json") == 0
+    assert run(*admin, "list", "--json") == 0
+
+    store = TaskStore()
+    assert store.get_task(1).completed
+    store.close()
+
+
+
+
+@pytest.mark.parametrize("arguments", [
+    ["add", "--assignee", "alice", "--title", "Title", "--due", "2030-01-01"],
+    ["--username", "admin", "--password", "wrong", "stats"],
+    ["--username", "alice", "--password", "secret", "stats"],
+    ["--username", "admin", "--password", "password", "add", "--assignee", "nobody", "--title", "Title",
+     "--due", "2030-01-01"],
+    ["--username", "admin", "--password", "password", "add", "--assignee", "alice", "--title", "Semi;colon",
+     "--due", "2030-01-01"],
+    ["--username", "admin", "--password", "password", "complete", "1"],
+    ["--username", "admin", "--password", "password", "import", "missing.csv"],
+])
+def test_failed_commands_exit_with_an_error(command_folder, arguments):
+    assert run(*arguments) == 1
+
+    # Nothing has been added.
+    store = TaskStore()
+    assert len(store.master_task_list) == 0
+    store.close()
+
+
+
+
+def test_bad_arguments_exit_with_a_usage_error(command_folder):
+    assert run("--username", "admin", "--password", "password", "add", "--assignee", "alice",
+               "--title", "Title", "--due", "01/01/2030") == 2
+    assert run("unknown-command") == 2
+
+
+
+
+def test_damaged_journal_stops_commands(command_folder):
+    admin = ["--username", "admin", "--password", "password"]
+    for title in ["First", "Second"]:
+        assert run(*admin, "add", "--assignee", "alice", "--title", title, "--due", "2030-01-01") == 0
+
+    journal_file = command_folder / "tasks.txt.journal"
+    damaged_data = bytearray(journal_file.read_bytes())
+    damaged_data[12] ^= 1
+    journal_file.write_bytes(bytes(damaged_data))
+
+    assert run(*admin, "stats") == 1
+    assert journal_file.read_bytes() == bytes(damaged_data)